@@ -25,6 +25,7 @@ from librar.bot.handlers.inline import build_inline_handler
 from librar.bot.handlers.settings import build_settings_conversation_handler
 from librar.bot.handlers.upload import build_upload_handler
 from librar.bot.repository import BotRepository
+from librar.bot.search_service import warm_up_semantic_search
 
 
 logging.basicConfig(
@@ -121,6 +122,7 @@ async def run_bot(settings: BotSettings) -> None:
     try:
         # Initialize application
         await application.initialize()
+        warm_up_semantic_search()
         logger.info("Bot initialized. Starting polling...")
 
         # Start polling with explicit allowed updates
@@ -13,7 +13,8 @@ import sys
 
 from librar.hybrid.query import HybridQueryService, HybridSearchHit, build_llm_context
 from librar.semantic.config import SemanticSettings
-from librar.semantic.openrouter import OpenRouterGenerator
+from librar.semantic.openrouter import EmbeddingRequestError, OpenRouterGenerator
+from librar.semantic.query import shared_embedder
 
 
 DEFAULT_SEARCH_TIMEOUT_SECONDS = 25.0
@@ -381,6 +382,21 @@ async def answer_question(
     return AnswerResult(answer=answer_text, sources=sources, is_confirmed=True, prompt=prompt)
 
 
+def warm_up_semantic_search() -> None:
+    """Create the process-wide query embedder now when ``SEMANTIC_WARMUP`` is set.
+
+    In-process searches reuse it, so the first one skips connection setup.
+    Configuration errors are left for that search to report.
+    """
+
+    try:
+        settings = SemanticSettings.from_env()
+        if settings.warmup_on_start:
+            shared_embedder(settings)
+    except (ValueError, EmbeddingRequestError) as exc:
+        logger.info("Semantic warmup skipped: %s", exc)
+
+
 async def search_hybrid_cli(
     *,
     query: str,
@@ -3,14 +3,71 @@
 from __future__ import annotations
 
 import argparse
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
 import json
+import multiprocessing
+import os
 import sqlite3
+from typing import Iterator
 
 from librar.search.schema import apply_runtime_pragmas, ensure_schema
-from librar.timeline.extractor import extract_temporal_spans
+from librar.timeline.extractor import TemporalSpan, extract_temporal_spans
 from librar.timeline.timeline_repository import TimelineRepository
 
 
+def _book_events(
+    chunks: list[tuple[int, str]],
+    min_confidence: float,
+) -> list[tuple[int | None, TemporalSpan]]:
+    """Spans at or above *min_confidence* for ``(chunk_id, raw_text)`` pairs."""
+
+    return [
+        (chunk_id, span)
+        for chunk_id, raw_text in chunks
+        for span in extract_temporal_spans(raw_text)
+        if span.confidence >= min_confidence
+    ]
+
+
+def _book_chunks(conn: sqlite3.Connection, book_id: int) -> list[tuple[int, str]]:
+    rows = conn.execute(
+        "SELECT id, raw_text FROM chunks WHERE book_id = ? ORDER BY chunk_no",
+        (book_id,),
+    ).fetchall()
+    return [(row["id"], row["raw_text"]) for row in rows]
+
+
+def _iter_book_events(
+    conn: sqlite3.Connection,
+    books: list[sqlite3.Row],
+    *,
+    min_confidence: float,
+    workers: int,
+) -> Iterator[tuple[sqlite3.Row, list[tuple[int | None, TemporalSpan]]]]:
+    """Yield each book with its events, in order, extracting on *workers* processes."""
+
+    if workers == 1:
+        for book in books:
+            yield book, _book_events(_book_chunks(conn, book["id"]), min_confidence)
+        return
+
+    # Spawned workers take whole books; chunks are read and events written
+    # on the caller's connection.
+    context = multiprocessing.get_context("spawn")
+    pending: deque[tuple[sqlite3.Row, Future[list[tuple[int | None, TemporalSpan]]]]] = deque()
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context) as pool:
+        for book in books:
+            pending.append((book, pool.submit(_book_events, _book_chunks(conn, book["id"]), min_confidence)))
+            # Bound the number of books held in memory awaiting their write.
+            while len(pending) > 2 * workers:
+                done_book, future = pending.popleft()
+                yield done_book, future.result()
+        while pending:
+            done_book, future = pending.popleft()
+            yield done_book, future.result()
+
+
 def main(argv: list[str] | None = None) -> int:
     parser = argparse.ArgumentParser(
         description="Extract and store timeline events from indexed books"
@@ -26,7 +83,16 @@ def main(argv: list[str] | None = None) -> int:
         default=0.6,
         help="Minimum confidence threshold for a temporal span (default: 0.6)",
     )
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=1,
+        help="Parallel extraction workers; writes stay on one connection (0 = one per CPU)",
+    )
     args = parser.parse_args(argv)
+    if args.jobs < 0:
+        parser.error("--jobs cannot be negative")
+    workers = args.jobs or os.cpu_count() or 1
 
     conn = sqlite3.connect(args.db_path)
     conn.row_factory = sqlite3.Row
@@ -38,25 +104,13 @@ def main(argv: list[str] | None = None) -> int:
     total_events = 0
     results = []
 
-    for book in books:
-        book_id = book["id"]
-        chunks = conn.execute(
-            "SELECT id, raw_text FROM chunks WHERE book_id = ? ORDER BY chunk_no",
-            (book_id,),
-        ).fetchall()
-
-        book_events: list[tuple[int | None, object]] = []
-        for chunk in chunks:
-            chunk_id = chunk["id"]
-            spans = extract_temporal_spans(chunk["raw_text"])
-            for span in spans:
-                if span.confidence >= args.min_confidence:
-                    book_events.append((chunk_id, span))
-
-        count = timeline_repo.replace_book_events(book_id, book_events)
+    for book, book_events in _iter_book_events(
+        conn, books, min_confidence=args.min_confidence, workers=workers
+    ):
+        count = timeline_repo.replace_book_events(book["id"], book_events)
         total_events += count
         results.append(
-            {"book_id": book_id, "title": book["title"], "events": count}
+            {"book_id": book["id"], "title": book["title"], "events": count}
         )
 
     conn.close()
@@ -4,6 +4,7 @@ from __future__ import annotations
 
 import argparse
 import json
+import os
 
 from librar.search.indexer import SearchIndexer
 
@@ -12,9 +13,18 @@ def main(argv: list[str] | None = None) -> int:
     parser = argparse.ArgumentParser(description="Index books into SQLite FTS5 storage")
     parser.add_argument("--books-path", default="books", help="Directory containing books to index")
     parser.add_argument("--db-path", default=".librar-search.db", help="SQLite database path")
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=1,
+        help="Parallel extraction/lemmatization workers; writes stay on one connection (0 = one per CPU)",
+    )
     args = parser.parse_args(argv)
+    if args.jobs < 0:
+        parser.error("--jobs cannot be negative")
+    workers = args.jobs or os.cpu_count() or 1
 
-    with SearchIndexer.from_db_path(args.db_path) as indexer:
+    with SearchIndexer.from_db_path(args.db_path, workers=workers) as indexer:
         stats = indexer.index_books(args.books_path)
 
     print(json.dumps(stats.to_dict(), ensure_ascii=True, indent=2))
@@ -16,13 +16,25 @@ def main(argv: list[str] | None = None) -> int:
     parser = argparse.ArgumentParser(description="Index semantic embeddings into a FAISS vector store")
     parser.add_argument("--db-path", default=".librar-search.db", help="SQLite database path")
     parser.add_argument("--index-path", default=".librar-semantic.faiss", help="FAISS index file path")
-    parser.add_argument("--batch-size", type=int, default=32, help="Embedding batch size")
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=None,
+        help="Chunks per embedding request (default: the provider maximum)",
+    )
+    parser.add_argument(
+        "--quantize",
+        choices=("none", "sq8"),
+        default="none",
+        help="Store the HNSW graph of large indexes as 8-bit codes (default: none)",
+    )
     args = parser.parse_args(argv)
 
     with SemanticIndexer.from_db_path(
         db_path=args.db_path,
         index_path=args.index_path,
         batch_size=args.batch_size,
+        quantize=args.quantize,
     ) as indexer:
         stats = indexer.index_chunks()
 
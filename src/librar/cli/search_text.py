@@ -37,7 +37,9 @@ def main(argv: list[str] | None = None) -> int:
         "limit": safe_limit,
         "results": [hit.to_dict() for hit in hits],
     }
-    print(json.dumps(payload, ensure_ascii=True, indent=2))
+    # Compact and unescaped: Cyrillic excerpts as raw UTF-8 are about a third
+    # the size of \uXXXX escapes.
+    print(json.dumps(payload, ensure_ascii=False, separators=(",", ":")))
     return 0
 
 
@@ -14,11 +14,11 @@ from librar.hybrid.scoring import (
     order_fused_scores,
     filter_relevant_scores,
 )
+from librar.search.normalize import fold_case
 from librar.search.query import SearchFilters, SearchHit, search_chunks
 from librar.search.repository import SearchRepository
 from librar.semantic.config import SemanticSettings
-from librar.semantic.openrouter import OpenRouterEmbedder
-from librar.semantic.query import SemanticQueryService, SemanticSearchHit
+from librar.semantic.query import SemanticQueryService, SemanticSearchHit, shared_embedder, shared_query_cache
 from librar.semantic.semantic_repository import SemanticRepository
 from librar.semantic.vector_store import FaissVectorStore
 
@@ -178,12 +178,12 @@ def _display_text(hit: SearchHit | SemanticSearchHit, *, excerpt: str) -> str:
 
 
 def _exact_match_ids(text_hits: list[SearchHit], *, query: str, phrase_mode: bool) -> set[int]:
-    normalized_query = query.lower().replace("ё", "е").strip()
+    normalized_query = fold_case(query).strip()
     terms = [term for term in _WORD_RE.findall(normalized_query) if term]
     exact_ids: set[int] = set()
 
     for hit in text_hits:
-        haystack = hit.excerpt.lower().replace("ё", "е")
+        haystack = fold_case(hit.excerpt)
         if phrase_mode:
             if normalized_query and normalized_query in haystack:
                 exact_ids.add(hit.chunk_id)
@@ -311,13 +311,21 @@ class HybridQueryService:
                 f"indexed='{index_state.model}', configured='{resolved_settings.model}'. "
                 "Reindex with `python -m librar.cli.index_semantic`."
             )
-        vector_store = FaissVectorStore(index_path, dimension=index_state.dimension, metric=index_state.metric)
-        embedder = OpenRouterEmbedder(resolved_settings)
+        query_cache = (
+            shared_query_cache(index_path, model=index_state.model) if resolved_settings.enable_query_cache else None
+        )
+        vector_store = FaissVectorStore(
+            index_path,
+            dimension=index_state.dimension,
+            metric=index_state.metric,
+            read_only=True,
+        )
         semantic_service = SemanticQueryService(
             search_repository=search_repository,
             semantic_repository=semantic_repository,
             vector_store=vector_store,
-            embedder=embedder,
+            embedder=shared_embedder(resolved_settings),
+            query_cache=query_cache,
         )
         return cls(
             search_repository=search_repository,
@@ -69,11 +69,14 @@ class PDFAdapter:
         extracted_blocks: list[DocumentBlock] = []
 
         for page_index, page in enumerate(doc, start=1):
-            result = extract_page_text(page, page_index)
+            # One TextPage per page: the OCR coverage probe and block extraction
+            # share it, so font/cmap decoding runs once instead of twice.
+            textpage = page.get_textpage(flags=pymupdf.TEXTFLAGS_BLOCKS)
+            result = extract_page_text(page, page_index, textpage=textpage)
 
             if result.status == OcrStatus.EMBEDDED:
                 # Use original block-level extraction to preserve reading order
-                page_blocks = page.get_text("blocks")
+                page_blocks = page.get_text("blocks", textpage=textpage)
                 ordered_blocks = sorted(page_blocks, key=lambda row: (row[1], row[0], row[5]))
                 page_char_offset = 0
 
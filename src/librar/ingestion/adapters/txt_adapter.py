@@ -3,12 +3,33 @@
 from __future__ import annotations
 
 from pathlib import Path
+import re
 
 from charset_normalizer import from_bytes
 
 from librar.ingestion.models import DocumentBlock, ExtractedDocument, ExtractedMetadata, SourceRef
 from librar.ingestion.normalization import normalize_whitespace
 
+_BOM_ENCODINGS = (
+    (b"\xef\xbb\xbf", "utf-8-sig"),
+    (b"\xff\xfe", "utf-16"),
+    (b"\xfe\xff", "utf-16"),
+)
+
+# Byte classes for the cp1251 heuristic.  In cp1251 lowercase Cyrillic sits in
+# 0xE0-0xFF and uppercase in 0xC0-0xDF (plus Ё/ё at 0xA8/0xB8); KOI8-R swaps the
+# two bands, so running text with more "lowercase" bytes points to cp1251.
+_HIGH_BYTES = bytes(range(0x80, 0x100))
+_CP1251_UPPER = bytes(range(0xC0, 0xE0)) + b"\xa8"
+_CP1251_LOWER = bytes(range(0xE0, 0x100)) + b"\xb8"
+_HEURISTIC_SAMPLE_BYTES = 64 * 1024
+_CP1251_MIN_CYRILLIC_SHARE = 0.9
+# cp1252/latin-1 accented lowercase letters (é, ü, ö, ...) also sit in 0xE0-0xFF,
+# but one at a time between ASCII letters. Russian words are runs of such
+# bytes, so most high bytes must fall in runs of at least three.
+_CP1251_WORD_RE = re.compile(rb"[\xa8\xb8\xc0-\xff]{3,}")
+_CP1251_MIN_WORD_SHARE = 0.6
+
 _HEADER_FIELDS = {
     "title": "title",
     "author": "author",
@@ -17,6 +38,18 @@ _HEADER_FIELDS = {
 }
 
 
+def _looks_like_cp1251(data: bytes) -> bool:
+    high = len(data) - len(data.translate(None, _HIGH_BYTES))
+    if not high:
+        return False
+    upper = len(data) - len(data.translate(None, _CP1251_UPPER))
+    lower = len(data) - len(data.translate(None, _CP1251_LOWER))
+    if (upper + lower) / high < _CP1251_MIN_CYRILLIC_SHARE or lower < upper:
+        return False
+    in_words = sum(len(word) for word in _CP1251_WORD_RE.findall(data))
+    return in_words / high >= _CP1251_MIN_WORD_SHARE
+
+
 class TXTAdapter:
     """Extract plain-text books with robust charset handling."""
 
@@ -39,8 +72,7 @@ class TXTAdapter:
         from librar.ingestion.language_detection import detect_language
 
         raw = path.read_bytes()
-        encoding = self._detect_encoding(raw)
-        text = raw.decode(encoding)
+        text = self._decode(raw)
         metadata = self._extract_metadata(text, path)
         blocks = self._build_blocks(text)
 
@@ -55,6 +87,19 @@ class TXTAdapter:
 
         return ExtractedDocument(source_path=str(path), metadata=metadata, blocks=blocks)
 
+    def _decode(self, raw: bytes) -> str:
+        fast = self._detect_encoding_fast(raw)
+        if fast is not None:
+            try:
+                return raw.decode(fast)
+            except UnicodeDecodeError:
+                # The cp1251 guess only saw a sample. If the whole file still
+                # reads as cp1251 Russian, replace the bytes cp1251 leaves
+                # unassigned; otherwise let the full detector decide.
+                if fast == "cp1251" and _looks_like_cp1251(raw):
+                    return raw.decode("cp1251", errors="replace")
+        return raw.decode(self._detect_encoding(raw))
+
     def _detect_encoding(self, raw: bytes) -> str:
         best = from_bytes(raw).best()
         if best and best.encoding:
@@ -71,6 +116,27 @@ class TXTAdapter:
                 continue
         raise ValueError("Could not detect TXT encoding")
 
+    def _detect_encoding_fast(self, raw: bytes) -> str | None:
+        """Resolve the common cases (BOM, UTF-8, cp1251 Russian) without charset_normalizer.
+
+        The cp1251 answer is a guess from the first ``_HEURISTIC_SAMPLE_BYTES``;
+        ``_decode`` checks it against the whole file.
+        """
+
+        for bom, encoding in _BOM_ENCODINGS:
+            if raw.startswith(bom):
+                return encoding
+
+        try:
+            raw.decode("utf-8")
+            return "utf-8"
+        except UnicodeDecodeError:
+            pass
+
+        if _looks_like_cp1251(raw[:_HEURISTIC_SAMPLE_BYTES]):
+            return "cp1251"
+        return None
+
     def _extract_metadata(self, text: str, path: Path) -> ExtractedMetadata:
         title: str | None = None
         author: str | None = None
@@ -97,6 +97,7 @@ def extract_page_text(
     page_index: int,
     *,
     coverage_threshold: float = DEFAULT_COVERAGE_THRESHOLD,
+    textpage: pymupdf.TextPage | None = None,
 ) -> PageOcrResult:
     """Return text for one page, falling back to OCR when embedded text is absent.
 
@@ -115,10 +116,14 @@ def extract_page_text(
     coverage_threshold:
         Minimum chars/pt² ratio to consider a page as having real embedded
         text.  Below this value OCR is attempted.
+    textpage:
+        Optional pre-built ``pymupdf.TextPage`` for *page*.  Callers that
+        extract text from the same page again should pass one so fonts and
+        glyphs are decoded only once.
     """
     global _tesseract_available
 
-    embedded_text = page.get_text("text")
+    embedded_text = page.get_text("text", textpage=textpage)
 
     if not _is_scanned_page(page, embedded_text, threshold=coverage_threshold):
         return PageOcrResult(
@@ -0,0 +1,83 @@
+"""Frequent-lemma bigram index backing phrase-mode search.
+
+Phrases made of common lemmas ("книга", "история") walk long FTS5 posting
+lists. Adjacent lemma pairs that touch a frequent lemma are indexed as single
+``left_right`` tokens in ``chunks_bigram_fts``, whose posting lists are short.
+The index stays empty until ``refresh_bigram_index`` selects the frequent
+lemmas, so plain indexing pays nothing for it.
+"""
+
+from __future__ import annotations
+
+import sqlite3
+from typing import Iterable
+
+
+FREQUENT_LEMMA_LIMIT = 5000
+
+_BIGRAM_JOINER = "_"
+
+
+def load_frequent_lemmas(connection: sqlite3.Connection) -> frozenset[str]:
+    """Return the current frequent-lemma set (empty until refreshed)."""
+
+    rows = connection.execute("SELECT lemma FROM frequent_lemmas").fetchall()
+    return frozenset(row[0] for row in rows)
+
+
+def lemma_bigrams(lemmas: list[str], frequent: frozenset[str]) -> list[str]:
+    """Adjacent ``left_right`` pairs where at least one side is frequent."""
+
+    return [
+        f"{left}{_BIGRAM_JOINER}{right}"
+        for left, right in zip(lemmas, lemmas[1:])
+        if left in frequent or right in frequent
+    ]
+
+
+def index_chunk_bigrams(
+    connection: sqlite3.Connection,
+    chunks: Iterable[tuple[int, str]],
+    frequent: frozenset[str],
+) -> None:
+    """Insert bigram documents for ``(chunk_id, lemma_text)`` pairs."""
+
+    connection.executemany(
+        "INSERT INTO chunks_bigram_fts(rowid, bigrams) VALUES(?, ?)",
+        (
+            (chunk_id, " ".join(bigrams))
+            for chunk_id, lemma_text in chunks
+            if (bigrams := lemma_bigrams(lemma_text.split(), frequent))
+        ),
+    )
+
+
+def refresh_bigram_index(connection: sqlite3.Connection, *, limit: int = FREQUENT_LEMMA_LIMIT) -> None:
+    """Recompute the frequent lemmas from chunk document frequency and reindex."""
+
+    connection.execute(
+        "CREATE VIRTUAL TABLE IF NOT EXISTS temp.chunks_fts_vocab USING fts5vocab(main, chunks_fts, 'col')"
+    )
+    with connection:
+        connection.execute("DELETE FROM frequent_lemmas")
+        connection.execute(
+            """
+            INSERT INTO frequent_lemmas(lemma)
+            SELECT term FROM temp.chunks_fts_vocab
+            WHERE col = 'lemma_text'
+            ORDER BY doc DESC, term ASC
+            LIMIT ?
+            """,
+            (limit,),
+        )
+        connection.execute("DELETE FROM chunks_bigram_fts")
+        frequent = load_frequent_lemmas(connection)
+        if frequent:
+            rows = connection.execute("SELECT id, lemma_text FROM chunks ORDER BY id")
+            index_chunk_bigrams(connection, rows, frequent)
+
+
+def build_bigram_match(lemma_terms: list[str], frequent: frozenset[str]) -> str:
+    """FTS5 expression requiring every frequent-touching pair, or "" if none."""
+
+    return " AND ".join(f'"{bigram}"' for bigram in lemma_bigrams(lemma_terms, frequent))
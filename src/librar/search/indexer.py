@@ -2,15 +2,22 @@
 
 from __future__ import annotations
 
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+import contextlib
 from dataclasses import dataclass, field
 import hashlib
+import multiprocessing
+import os
 from pathlib import Path
+import threading
 import time
 
 from librar.ingestion.adapters import build_default_adapters
-from librar.ingestion.ingestor import DocumentIngestor, IngestionError
+from librar.ingestion.ingestor import DocumentIngestor, IngestionError, IngestionResult
 from librar.search.normalize import normalize_text
-from librar.search.repository import ChunkRow, SearchRepository
+from librar.search.repository import ChunkRow, IndexStateRow, SearchRepository
+from librar.search.schema import apply_indexing_pragmas, has_planner_stats
 
 _SUPPORTED_SUFFIXES = {".pdf", ".epub", ".fb2", ".fbz", ".txt"}
 
@@ -44,11 +51,35 @@ def _is_supported(path: Path) -> bool:
     return suffixes[-2:] == [".fb2", ".zip"]
 
 
-def _collect_inputs(target: Path) -> list[Path]:
-    if target.is_file():
-        return [target]
-    if target.is_dir():
-        return sorted(path for path in target.rglob("*") if path.is_file() and _is_supported(path))
+def _scan_tree(directory: str) -> list[tuple[Path, os.stat_result]]:
+    """Walk *directory* with ``os.scandir``, keeping each file's stat result.
+
+    ``DirEntry`` carries the file type from the directory read and caches its
+    stat, so each file costs one stat call instead of ``is_file()`` plus a
+    later ``stat()``. Symlinked files are followed; symlinked directories are
+    not descended into.
+    """
+
+    found: list[tuple[Path, os.stat_result]] = []
+    with os.scandir(directory) as entries:
+        for entry in entries:
+            if entry.is_dir(follow_symlinks=False):
+                found.extend(_scan_tree(entry.path))
+            elif entry.is_file():
+                path = Path(entry.path)
+                if _is_supported(path):
+                    found.append((path, entry.stat()))
+    return found
+
+
+def _collect_inputs(target: Path) -> list[tuple[Path, os.stat_result]]:
+    try:
+        if target.is_dir():
+            return sorted(_scan_tree(str(target)), key=lambda item: item[0])
+        if target.is_file():
+            return [(target, target.stat())]
+    except OSError:
+        pass
     return []
 
 
@@ -56,20 +87,53 @@ def _fingerprint(raw_bytes: bytes) -> str:
     return hashlib.sha256(raw_bytes).hexdigest()
 
 
+def _normalize_chunk_texts(texts: list[str], language: str) -> list[str]:
+    """Lemmatize one book's chunks; module-level so process pools can pickle it."""
+
+    return [normalize_text(text, language=language) for text in texts]
+
+
+@dataclass(slots=True)
+class _PreparedBook:
+    """Outcome of the read/hash/ingest stage for one source file."""
+
+    source_path: str
+    mtime_ns: int = 0
+    file_size: int = 0
+    fingerprint: str | None = None
+    ingested: IngestionResult | None = None
+    unchanged: bool = False
+    touched: bool = False
+    error: str | None = None
+
+
 class SearchIndexer:
-    """Indexes source books into SQLite chunks + FTS with incremental updates."""
+    """Indexes source books into SQLite chunks + FTS with incremental updates.
+
+    With ``workers > 1`` reading and hashing run on a thread pool, extraction
+    runs on those threads one book at a time, and lemmatization runs on a
+    process pool; all writes stay on this thread's connection, applied in
+    input order. At most ``2 * workers`` books are in flight at once.
+    """
 
-    def __init__(self, repository: SearchRepository, ingestor: DocumentIngestor) -> None:
+    def __init__(self, repository: SearchRepository, ingestor: DocumentIngestor, *, workers: int = 1) -> None:
+        if workers < 1:
+            raise ValueError("workers must be positive")
         self._repository = repository
         self._ingestor = ingestor
+        self._workers = workers
+        # PyMuPDF is not thread-safe and the ingestor's fingerprint registry
+        # is shared state, so extraction runs one book at a time.
+        self._ingest_lock = threading.Lock()
 
     @classmethod
-    def from_db_path(cls, db_path: str | Path) -> "SearchIndexer":
+    def from_db_path(cls, db_path: str | Path, *, workers: int = 1) -> "SearchIndexer":
         repository = SearchRepository(db_path)
+        apply_indexing_pragmas(repository.connection)
         ingestor = DocumentIngestor()
         for name, adapter in build_default_adapters().items():
             ingestor.register_adapter(name, adapter)
-        return cls(repository=repository, ingestor=ingestor)
+        return cls(repository=repository, ingestor=ingestor, workers=workers)
 
     def close(self) -> None:
         self._repository.close()
@@ -83,50 +147,161 @@ class SearchIndexer:
     def index_books(self, books_path: str | Path) -> IndexRunStats:
         started = time.perf_counter()
         stats = IndexRunStats()
-        files = _collect_inputs(Path(books_path))
-        stats.scanned = len(files)
+        inputs = _collect_inputs(Path(books_path))
+        stats.scanned = len(inputs)
+        states = [self._repository.get_index_state(str(file_path)) for file_path, _ in inputs]
 
-        for file_path in files:
-            source_path = str(file_path)
-            try:
-                raw_bytes = file_path.read_bytes()
-                fingerprint = _fingerprint(raw_bytes)
-                mtime_ns = file_path.stat().st_mtime_ns
-                state = self._repository.get_index_state(source_path)
-                if state is not None and state.fingerprint == fingerprint:
-                    stats.skipped_unchanged += 1
-                    continue
-
-                ingested = self._ingestor.ingest(file_path)
-                book_language = ingested.document.metadata.language or "ru"
-                chunk_rows = [
-                    ChunkRow(
-                        chunk_no=chunk_no,
-                        raw_text=chunk.text,
-                        lemma_text=normalize_text(chunk.text, language=book_language),
-                        page=chunk.source.page,
-                        chapter=chunk.source.chapter,
-                        item_id=chunk.source.item_id,
-                        char_start=chunk.source.char_start,
-                        char_end=chunk.source.char_end,
-                    )
-                    for chunk_no, chunk in enumerate(ingested.chunks)
-                ]
-
-                self._repository.replace_book_chunks(
-                    source_path=source_path,
-                    title=ingested.document.metadata.title,
-                    author=ingested.document.metadata.author,
-                    format_name=ingested.document.metadata.format_name,
-                    language=ingested.document.metadata.language,
-                    fingerprint=fingerprint,
-                    mtime_ns=mtime_ns,
-                    chunks=chunk_rows,
-                )
-                stats.indexed += 1
-            except (IngestionError, OSError) as exc:
-                stats.errors += 1
-                stats.error_details.append({"source_path": source_path, "error": str(exc)})
+        # First load into an empty index: one FTS rebuild beats per-row trigger updates.
+        bulk = bool(inputs) and self._repository.wants_bulk_load()
+        with self._repository.bulk_load() if bulk else contextlib.nullcontext():
+            if self._workers == 1:
+                for prepared in map(self._prepare_book, inputs, states):
+                    lemmas = None
+                    if prepared.ingested is not None:
+                        lemmas = _normalize_chunk_texts(*self._normalize_args(prepared.ingested))
+                    self._apply_prepared(prepared, lemmas, stats)
+            else:
+                self._index_parallel(inputs, states, stats)
+
+        if stats.indexed and not has_planner_stats(self._repository.connection):
+            # First heavy write: seed planner stats once; close() keeps them fresh.
+            self._repository.run_maintenance("analyze")
 
         stats.duration_ms = int((time.perf_counter() - started) * 1000)
         return stats
+
+    def _index_parallel(
+        self,
+        inputs: list[tuple[Path, os.stat_result]],
+        states: list[IndexStateRow | None],
+        stats: IndexRunStats,
+    ) -> None:
+        # Spawned workers: forking a process that already runs I/O threads is unsafe.
+        context = multiprocessing.get_context("spawn")
+        # Books move from `preparing` (read/hash/extract) to `normalizing`
+        # (lemmatization) to their write; both windows together hold at most
+        # 2 * workers books, so extracted text never piles up for the library.
+        preparing: deque[Future[_PreparedBook]] = deque()
+        normalizing: deque[tuple[_PreparedBook, Future[list[str]] | None]] = deque()
+        with (
+            ThreadPoolExecutor(max_workers=self._workers) as io_pool,
+            ProcessPoolExecutor(max_workers=self._workers, mp_context=context) as cpu_pool,
+        ):
+            for scanned, state in zip(inputs, states):
+                while len(preparing) + len(normalizing) >= 2 * self._workers:
+                    self._advance(preparing, normalizing, cpu_pool, stats)
+                preparing.append(io_pool.submit(self._prepare_book, scanned, state))
+            while preparing or normalizing:
+                self._advance(preparing, normalizing, cpu_pool, stats)
+
+    def _advance(
+        self,
+        preparing: deque[Future[_PreparedBook]],
+        normalizing: deque[tuple[_PreparedBook, Future[list[str]] | None]],
+        cpu_pool: ProcessPoolExecutor,
+        stats: IndexRunStats,
+    ) -> None:
+        """Hand the oldest prepared book to the process pool, or write the oldest normalized one."""
+
+        if preparing and len(normalizing) < self._workers:
+            prepared = preparing.popleft().result()
+            future = None
+            if prepared.ingested is not None:
+                future = cpu_pool.submit(_normalize_chunk_texts, *self._normalize_args(prepared.ingested))
+            normalizing.append((prepared, future))
+        else:
+            self._drain_one(normalizing, stats)
+
+    def _drain_one(
+        self,
+        pending: deque[tuple[_PreparedBook, Future[list[str]] | None]],
+        stats: IndexRunStats,
+    ) -> None:
+        prepared, future = pending.popleft()
+        lemmas = None
+        if future is not None:
+            try:
+                lemmas = future.result()
+            except Exception as exc:
+                prepared.error = f"Normalization failed: {exc}"
+        self._apply_prepared(prepared, lemmas, stats)
+
+    def _prepare_book(
+        self,
+        scanned: tuple[Path, os.stat_result],
+        state: IndexStateRow | None,
+    ) -> _PreparedBook:
+        """Hash and extract one scanned file; safe to run off the writer thread."""
+
+        file_path, stat_result = scanned
+        prepared = _PreparedBook(source_path=str(file_path))
+        try:
+            prepared.mtime_ns = stat_result.st_mtime_ns
+            prepared.file_size = stat_result.st_size
+            if state is not None and state.mtime_ns == prepared.mtime_ns and state.file_size == prepared.file_size:
+                prepared.unchanged = True
+                return prepared
+
+            prepared.fingerprint = _fingerprint(file_path.read_bytes())
+            if state is not None and state.fingerprint == prepared.fingerprint:
+                # Touched but not edited: remember the new stat so the next run skips hashing.
+                prepared.unchanged = True
+                prepared.touched = True
+                return prepared
+
+            with self._ingest_lock:
+                prepared.ingested = self._ingestor.ingest(file_path)
+        except (IngestionError, OSError) as exc:
+            prepared.error = str(exc)
+        return prepared
+
+    @staticmethod
+    def _normalize_args(ingested: IngestionResult) -> tuple[list[str], str]:
+        book_language = ingested.document.metadata.language or "ru"
+        return [chunk.text for chunk in ingested.chunks], book_language
+
+    def _apply_prepared(self, prepared: _PreparedBook, lemmas: list[str] | None, stats: IndexRunStats) -> None:
+        """Write one prepared book on the owning connection and update *stats*."""
+
+        if prepared.error is not None:
+            stats.errors += 1
+            stats.error_details.append({"source_path": prepared.source_path, "error": prepared.error})
+            return
+        if prepared.unchanged:
+            if prepared.touched:
+                self._repository.touch_index_state(
+                    prepared.source_path,
+                    mtime_ns=prepared.mtime_ns,
+                    file_size=prepared.file_size,
+                )
+            stats.skipped_unchanged += 1
+            return
+
+        ingested = prepared.ingested
+        assert ingested is not None and lemmas is not None and prepared.fingerprint is not None
+        chunk_rows = [
+            ChunkRow(
+                chunk_no=chunk_no,
+                raw_text=chunk.text,
+                lemma_text=lemma_text,
+                page=chunk.source.page,
+                chapter=chunk.source.chapter,
+                item_id=chunk.source.item_id,
+                char_start=chunk.source.char_start,
+                char_end=chunk.source.char_end,
+            )
+            for chunk_no, (chunk, lemma_text) in enumerate(zip(ingested.chunks, lemmas))
+        ]
+
+        self._repository.replace_book_chunks(
+            source_path=prepared.source_path,
+            title=ingested.document.metadata.title,
+            author=ingested.document.metadata.author,
+            format_name=ingested.document.metadata.format_name,
+            language=ingested.document.metadata.language,
+            fingerprint=prepared.fingerprint,
+            mtime_ns=prepared.mtime_ns,
+            file_size=prepared.file_size,
+            chunks=chunk_rows,
+        )
+        stats.indexed += 1
@@ -14,6 +14,23 @@ from librar.search.prerev_normalization import (
 
 
 _WORD_RE = re.compile(r"[0-9A-Za-zА-Яа-яЁёѣѳіѵЪъ\u0400-\u04FF]+")
+_WORD_START_RE = re.compile(r"\w", re.UNICODE)
+
+# Yo-folding (ё/Ё → е) in one C-level pass; applied before lowercasing.
+_YO_FOLD_TRANS = str.maketrans("ёЁ", "ее")
+
+# normalize_text memoization: only inputs up to this length are cached.
+_NORMALIZE_CACHE_SIZE = 8192
+_NORMALIZE_CACHE_MAX_CHARS = 256
+
+# Per-token lemma memo. Word frequencies are Zipfian, so a bounded cache of
+# surface forms absorbs most analyzer calls when indexing whole books.
+_LEMMA_CACHE_SIZE = 131072
+
+
+def fold_case(text: str) -> str:
+    """Lowercase *text* and fold ё to е, the shared pre-tokenization step."""
+    return text.translate(_YO_FOLD_TRANS).lower()
 
 
 def _ensure_pymorphy2_compat() -> None:
@@ -37,19 +54,23 @@ def _get_analyzer():
     return pymorphy2.MorphAnalyzer()
 
 
+@lru_cache(maxsize=_LEMMA_CACHE_SIZE)
+def _lemmatize_token(value: str) -> str:
+    """Return the yo-folded pymorphy2 normal form of one case-folded token."""
+    parses = _get_analyzer().parse(value)
+    lemma = parses[0].normal_form if parses else value
+    return lemma.translate(_YO_FOLD_TRANS)
+
+
 def _normalize_to_lemmas(text: str) -> list[str]:
     """Lemmatize text using pymorphy2 (Russian morphology)."""
-    analyzer = _get_analyzer()
     lemmas: list[str] = []
 
-    for token in tokenize(text.lower().replace("ё", "е")):
+    for token in tokenize(fold_case(text)):
         value = token.text.strip()
         if not value or not _WORD_RE.fullmatch(value):
             continue
-
-        parses = analyzer.parse(value)
-        lemma = parses[0].normal_form if parses else value
-        lemmas.append(lemma.replace("ё", "е"))
+        lemmas.append(_lemmatize_token(value))
 
     return lemmas
 
@@ -71,7 +92,7 @@ def _normalize_kazakh_or_tatar(text: str) -> list[str]:
     tokens: list[str] = []
     for token in tokenize(text.lower()):
         value = token.text.strip()
-        if value and re.match(r"[\w]+", value, re.UNICODE):
+        if value and _WORD_START_RE.match(value):
             tokens.append(value)
     return tokens
 
@@ -86,9 +107,25 @@ def _normalize_english(text: str) -> list[str]:
     return tokens
 
 
+def _normalize_uncached(text: str, language: str) -> str:
+    if language in ("kk", "tt"):
+        tokens = _normalize_kazakh_or_tatar(text)
+    elif language == "en":
+        tokens = _normalize_english(text)
+    else:
+        tokens = _normalize_russian(text)
+    return " ".join(tokens)
+
+
+_normalize_cached = lru_cache(maxsize=_NORMALIZE_CACHE_SIZE)(_normalize_uncached)
+
+
 def normalize_text(text: str, *, language: str = "ru") -> str:
     """Return space-joined lemma tokens for the given language.
 
+    Results for short inputs (queries, titles) are memoized; full chunk
+    texts bypass the cache since they rarely repeat.
+
     Parameters
     ----------
     text:
@@ -97,13 +134,9 @@ def normalize_text(text: str, *, language: str = "ru") -> str:
         ISO 639-1 code.  Supported: ``'ru'``, ``'kk'``, ``'tt'``, ``'en'``.
         Unknown codes fall back to Russian morphology.
     """
-    if language in ("kk", "tt"):
-        tokens = _normalize_kazakh_or_tatar(text)
-    elif language == "en":
-        tokens = _normalize_english(text)
-    else:
-        tokens = _normalize_russian(text)
-    return " ".join(tokens)
+    if len(text) <= _NORMALIZE_CACHE_MAX_CHARS:
+        return _normalize_cached(text, language)
+    return _normalize_uncached(text, language)
 
 
 def normalize_query(query: str, *, language: str = "ru") -> str:
@@ -23,7 +23,8 @@ _PREREV_TRANS = str.maketrans(
 _TERMINAL_HARD_SIGN_RE = re.compile(r"\u044a\b")
 
 # Detection pattern — does this text contain any pre-revolutionary characters?
-_PREREV_CHARS_RE = re.compile(r"[\u0462\u0463\u0472\u0473\u0406\u0456\u0474\u0475]")
+# Derived from the translate table so detection and mapping cannot drift apart.
+_PREREV_CHARS_RE = re.compile("[" + "".join(map(chr, _PREREV_TRANS)) + "]")
 
 
 def has_prerev_characters(text: str) -> bool:
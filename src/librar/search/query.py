@@ -3,16 +3,41 @@
 from __future__ import annotations
 
 from dataclasses import dataclass, field
+from functools import lru_cache
 import re
 import sqlite3
 
 from razdel import tokenize
 
-from librar.search.normalize import normalize_query
+from librar.search.bigrams import build_bigram_match
+from librar.search.normalize import fold_case, normalize_query
 
 
 _WORD_RE = re.compile(r"[0-9A-Za-zА-Яа-яЁё]+")
 
+# Best-ranked FTS matches considered before metadata filters are applied.
+FTS_CANDIDATE_LIMIT = 2000
+
+_FTS_CANDIDATES = "SELECT rowid, bm25(chunks_fts, 1.5, 1.0) AS rank FROM chunks_fts WHERE chunks_fts MATCH ?"
+# Phrase mode with bigrams: the bigram index stands in for the lemma phrase
+# branch, the raw phrase branch is matched as usual, and every candidate is
+# confirmed and ranked by the full phrase expression on chunks_fts, so ranks
+# stay comparable with _FTS_CANDIDATES. Parameters: phrase expression,
+# bigram expression, raw phrase expression.
+_BIGRAM_CANDIDATES = """
+            SELECT rowid, rank FROM (
+                SELECT cand.rowid AS rowid, (
+                    SELECT bm25(chunks_fts, 1.5, 1.0) FROM chunks_fts
+                    WHERE chunks_fts MATCH ? AND chunks_fts.rowid = cand.rowid
+                ) AS rank
+                FROM (
+                    SELECT rowid FROM chunks_bigram_fts WHERE chunks_bigram_fts MATCH ?
+                    UNION
+                    SELECT rowid FROM chunks_fts WHERE chunks_fts MATCH ?
+                ) cand
+            )
+            WHERE rank IS NOT NULL"""
+
 
 @dataclass(slots=True)
 class SearchHit:
@@ -61,7 +86,7 @@ class SearchFilters:
 
 def _extract_terms(text: str) -> list[str]:
     terms: list[str] = []
-    for token in tokenize(text.lower().replace("ё", "е")):
+    for token in tokenize(fold_case(text)):
         value = token.text.strip()
         if value and _WORD_RE.fullmatch(value):
             terms.append(value)
@@ -72,6 +97,10 @@ def _quoted(value: str) -> str:
     return '"' + value.replace('"', '""') + '"'
 
 
+def _raw_phrase_expression(raw_terms: list[str]) -> str:
+    return f"raw_text:{_quoted(' '.join(raw_terms))}"
+
+
 def build_match_expression(query: str, *, phrase_mode: bool = False) -> str:
     raw_terms = _extract_terms(query)
     lemma_terms = normalize_query(query).split()
@@ -82,7 +111,7 @@ def build_match_expression(query: str, *, phrase_mode: bool = False) -> str:
     if phrase_mode:
         expressions: list[str] = []
         if raw_terms:
-            expressions.append(f"raw_text:{_quoted(' '.join(raw_terms))}")
+            expressions.append(_raw_phrase_expression(raw_terms))
         if lemma_terms:
             expressions.append(f"lemma_text:{_quoted(' '.join(lemma_terms))}")
         return " OR ".join(f"({expression})" for expression in expressions)
@@ -97,6 +126,77 @@ def build_match_expression(query: str, *, phrase_mode: bool = False) -> str:
     return " OR ".join(expressions)
 
 
+@lru_cache(maxsize=64)
+def _compose_search_sql(where_clauses: tuple[str, ...], *, bigram: bool = False) -> str:
+    """Return the search SQL for one filter shape.
+
+    The MATCH runs alone in an inner query capped at ``FTS_CANDIDATE_LIMIT``
+    so FTS5 ranks without the joins; filters and the final limit apply to
+    that candidate set. With *bigram* the lemma candidates come from
+    ``chunks_bigram_fts`` instead (see ``_BIGRAM_CANDIDATES``). Keeping
+    the text byte-identical per shape lets sqlite3's per-connection
+    statement cache reuse the compiled statement.
+    """
+
+    candidates = _BIGRAM_CANDIDATES if bigram else _FTS_CANDIDATES
+    filters = f"WHERE {' AND '.join(where_clauses)}" if where_clauses else ""
+    return f"""
+        SELECT
+            b.source_path AS source_path,
+            b.title AS title,
+            b.author AS author,
+            b.format AS format_name,
+            c.id AS chunk_id,
+            c.chunk_no AS chunk_no,
+            c.page AS page,
+            c.chapter AS chapter,
+            c.item_id AS item_id,
+            c.char_start AS char_start,
+            c.char_end AS char_end,
+            c.raw_text AS raw_text,
+            fts.rank AS rank
+        FROM (
+            {candidates}
+            ORDER BY rank ASC, rowid ASC
+            LIMIT {FTS_CANDIDATE_LIMIT}
+        ) fts
+        JOIN chunks c ON c.id = fts.rowid
+        JOIN books b ON b.id = c.book_id
+        {filters}
+        ORDER BY fts.rank ASC, c.id ASC
+        LIMIT ?
+    """
+
+
+def _fetch_excerpts(connection: sqlite3.Connection, match_expression: str, chunk_ids: list[int]) -> dict[int, str]:
+    """Build highlighted snippets only for the hits actually returned."""
+
+    placeholders = ",".join("?" * len(chunk_ids))
+    rows = connection.execute(
+        f"""
+        SELECT rowid, snippet(chunks_fts, 0, '\u00ab', '\u00bb', ' \u2026 ', 32) AS excerpt
+        FROM chunks_fts
+        WHERE chunks_fts MATCH ? AND rowid IN ({placeholders})
+        """,
+        (match_expression, *chunk_ids),
+    ).fetchall()
+    return {int(row["rowid"]): row["excerpt"] for row in rows}
+
+
+def _bigram_phrase_expression(connection: sqlite3.Connection, query: str) -> str:
+    """Bigram MATCH for a phrase touching a frequent lemma, else ""."""
+
+    lemma_terms = normalize_query(query).split()
+    if len(lemma_terms) < 2:
+        return ""
+    placeholders = ",".join("?" * len(lemma_terms))
+    rows = connection.execute(
+        f"SELECT lemma FROM frequent_lemmas WHERE lemma IN ({placeholders})",
+        tuple(lemma_terms),
+    ).fetchall()
+    return build_bigram_match(lemma_terms, frozenset(row[0] for row in rows))
+
+
 def search_chunks(
     connection: sqlite3.Connection,
     *,
@@ -106,15 +206,23 @@ def search_chunks(
     author_filter: str | None = None,
     format_filter: str | None = None,
     filters: SearchFilters | None = None,
+    use_bigrams: bool = True,
 ) -> list[SearchHit]:
     match_expression = build_match_expression(query, phrase_mode=phrase_mode)
     if not match_expression:
         return []
 
     safe_limit = max(1, min(limit, 100))
-    where_clauses = ["chunks_fts MATCH ?"]
+    where_clauses: list[str] = []
     params: list[object] = [match_expression]
 
+    bigram_expression = _bigram_phrase_expression(connection, query) if phrase_mode and use_bigrams else ""
+    raw_terms = _extract_terms(query) if bigram_expression else []
+    if raw_terms:
+        params.extend([bigram_expression, _raw_phrase_expression(raw_terms)])
+    else:
+        bigram_expression = ""
+
     if author_filter and author_filter.strip():
         where_clauses.append("LOWER(COALESCE(b.author, '')) LIKE ?")
         params.append(f"%{author_filter.strip().lower()}%")
@@ -156,31 +264,12 @@ def search_chunks(
             )
             params.append(filters.tag.strip().lower())
 
-    sql = f"""
-        SELECT
-            b.source_path AS source_path,
-            b.title AS title,
-            b.author AS author,
-            b.format AS format_name,
-            c.id AS chunk_id,
-            c.chunk_no AS chunk_no,
-            c.page AS page,
-            c.chapter AS chapter,
-            c.item_id AS item_id,
-            c.char_start AS char_start,
-            c.char_end AS char_end,
-            c.raw_text AS raw_text,
-            bm25(chunks_fts, 1.5, 1.0) AS rank,
-            snippet(chunks_fts, 0, '\u00ab', '\u00bb', ' \u2026 ', 32) AS excerpt
-        FROM chunks_fts
-        JOIN chunks c ON c.id = chunks_fts.rowid
-        JOIN books b ON b.id = c.book_id
-        WHERE {' AND '.join(where_clauses)}
-        ORDER BY rank ASC, c.id ASC
-        LIMIT ?
-    """
+    sql = _compose_search_sql(tuple(where_clauses), bigram=bool(bigram_expression))
     params.append(safe_limit)
     rows = connection.execute(sql, tuple(params)).fetchall()
+    if not rows:
+        return []
+    excerpts = _fetch_excerpts(connection, match_expression, [int(row["chunk_id"]) for row in rows])
 
     return [
         SearchHit(
@@ -196,7 +285,7 @@ def search_chunks(
             char_start=row["char_start"],
             char_end=row["char_end"],
             rank=float(row["rank"]),
-            excerpt=row["excerpt"] or row["raw_text"],
+            excerpt=excerpts.get(int(row["chunk_id"])) or row["raw_text"],
         )
         for row in rows
     ]
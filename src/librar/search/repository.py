@@ -2,11 +2,119 @@
 
 from __future__ import annotations
 
+from contextlib import contextmanager
 from dataclasses import dataclass
 from pathlib import Path
 import sqlite3
+from typing import Iterator
 
-from librar.search.schema import apply_runtime_pragmas, ensure_schema, optimize_fts, rebuild_fts
+from librar.search.bigrams import index_chunk_bigrams, load_frequent_lemmas, refresh_bigram_index
+from librar.search.schema import (
+    analyze_tables,
+    apply_runtime_pragmas,
+    ensure_schema,
+    fts_sync_suspended,
+    optimize_fts,
+    optimize_planner_stats,
+    rebuild_fts,
+    resume_fts_sync,
+    suspend_fts_sync,
+)
+
+# Hot statements live at module level so every call passes byte-identical
+# text and hits the connection's prepared-statement cache.
+_STATEMENT_CACHE_SIZE = 256
+
+# Ids per IN (...) list; stays well under SQLITE_MAX_VARIABLE_NUMBER.
+_IN_CLAUSE_BATCH = 500
+
+_SQL_GET_INDEX_STATE = """
+    SELECT source_path, book_id, fingerprint, mtime_ns, file_size
+    FROM index_state
+    WHERE source_path = ?
+"""
+
+_SQL_TOUCH_INDEX_STATE = """
+    UPDATE index_state
+    SET mtime_ns = ?, file_size = ?
+    WHERE source_path = ?
+"""
+
+_SQL_UPSERT_BOOK = """
+    INSERT INTO books(source_path, title, author, format, language, chunk_count)
+    VALUES(?, ?, ?, ?, ?, ?)
+    ON CONFLICT(source_path) DO UPDATE SET
+        title=excluded.title,
+        author=excluded.author,
+        format=excluded.format,
+        language=excluded.language,
+        chunk_count=excluded.chunk_count,
+        updated_at=CURRENT_TIMESTAMP
+"""
+
+_SQL_GET_BOOK_ID = "SELECT id FROM books WHERE source_path = ?"
+
+_SQL_DELETE_BOOK_CHUNKS = "DELETE FROM chunks WHERE book_id = ?"
+
+_SQL_INSERT_CHUNK = """
+    INSERT INTO chunks(
+        book_id,
+        chunk_no,
+        raw_text,
+        lemma_text,
+        page,
+        chapter,
+        item_id,
+        char_start,
+        char_end
+    )
+    VALUES(?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+_SQL_ANY_CHUNK = "SELECT 1 FROM chunks LIMIT 1"
+
+_SQL_BOOK_CHUNK_LEMMAS = "SELECT id, lemma_text FROM chunks WHERE book_id = ?"
+
+_SQL_BOOK_FACETS = "SELECT id, author, format FROM books"
+
+_SQL_UPSERT_INDEX_STATE = """
+    INSERT INTO index_state(source_path, book_id, fingerprint, mtime_ns, file_size)
+    VALUES(?, ?, ?, ?, ?)
+    ON CONFLICT(source_path) DO UPDATE SET
+        book_id=excluded.book_id,
+        fingerprint=excluded.fingerprint,
+        mtime_ns=excluded.mtime_ns,
+        file_size=excluded.file_size,
+        indexed_at=CURRENT_TIMESTAMP
+"""
+
+_SQL_SELECT_CHUNK_TEXT = """
+    SELECT
+        c.id AS chunk_id,
+        c.book_id AS book_id,
+        b.source_path AS source_path,
+        b.title AS title,
+        b.author AS author,
+        b.format AS format_name,
+        c.chunk_no AS chunk_no,
+        c.raw_text AS raw_text,
+        c.page AS page,
+        c.chapter AS chapter,
+        c.item_id AS item_id,
+        c.char_start AS char_start,
+        c.char_end AS char_end
+    FROM chunks c
+    JOIN books b ON b.id = c.book_id
+"""
+
+_SQL_ITER_CHUNKS = _SQL_SELECT_CHUNK_TEXT + "ORDER BY c.id ASC"
+
+_SQL_ITER_CHUNKS_PAGE = _SQL_SELECT_CHUNK_TEXT + "ORDER BY c.id ASC LIMIT ? OFFSET ?"
+
+_SQL_ITER_CHUNKS_AFTER = _SQL_SELECT_CHUNK_TEXT + "WHERE c.id > ? ORDER BY c.id ASC LIMIT ?"
+
+# Rows per page when streaming every chunk.
+_CHUNK_PAGE_SIZE = 1000
 
 
 @dataclass(slots=True)
@@ -27,6 +135,7 @@ class IndexStateRow:
     book_id: int
     fingerprint: str
     mtime_ns: int
+    file_size: int | None = None
 
 
 @dataclass(slots=True)
@@ -50,18 +159,48 @@ class SearchRepository:
     """Thin transactional layer over SQLite search schema."""
 
     def __init__(self, db_path: str | Path) -> None:
+        """Open *db_path*: a file path, ``":memory:"``, or a ``file:`` URI."""
+
+        database = str(db_path)
         self._db_path = Path(db_path)
-        self._connection = sqlite3.connect(str(self._db_path))
+        self._connection = sqlite3.connect(
+            database,
+            uri=database.startswith("file:"),
+            cached_statements=_STATEMENT_CACHE_SIZE,
+        )
         self._connection.row_factory = sqlite3.Row
+        self._frequent_lemmas: frozenset[str] | None = None
         apply_runtime_pragmas(self._connection)
         ensure_schema(self._connection)
 
+    @classmethod
+    def from_connection(cls, connection: sqlite3.Connection) -> "SearchRepository":
+        """Wrap an already-open connection whose schema is in place.
+
+        Used when the database was populated out of band, e.g. restored from a
+        schema snapshot via ``sqlite3.Connection.backup``.
+        """
+
+        repository = cls.__new__(cls)
+        connection.row_factory = sqlite3.Row
+        main_db = connection.execute("PRAGMA database_list").fetchone()
+        repository._db_path = Path(main_db["file"] or ":memory:")
+        repository._connection = connection
+        repository._frequent_lemmas = None
+        apply_runtime_pragmas(repository._connection)
+        return repository
+
     @property
     def connection(self) -> sqlite3.Connection:
         return self._connection
 
     def close(self) -> None:
-        self._connection.close()
+        try:
+            optimize_planner_stats(self._connection)
+        except sqlite3.Error:
+            pass  # Best effort: a busy or read-only database still closes.
+        finally:
+            self._connection.close()
 
     def __enter__(self) -> "SearchRepository":
         return self
@@ -70,14 +209,7 @@ class SearchRepository:
         self.close()
 
     def get_index_state(self, source_path: str) -> IndexStateRow | None:
-        row = self._connection.execute(
-            """
-            SELECT source_path, book_id, fingerprint, mtime_ns
-            FROM index_state
-            WHERE source_path = ?
-            """,
-            (source_path,),
-        ).fetchone()
+        row = self._connection.execute(_SQL_GET_INDEX_STATE, (source_path,)).fetchone()
         if row is None:
             return None
         return IndexStateRow(
@@ -85,8 +217,15 @@ class SearchRepository:
             book_id=row["book_id"],
             fingerprint=row["fingerprint"],
             mtime_ns=row["mtime_ns"],
+            file_size=row["file_size"],
         )
 
+    def touch_index_state(self, source_path: str, *, mtime_ns: int, file_size: int) -> None:
+        """Record a new stat signature for a book whose content is unchanged."""
+
+        with self._connection:
+            self._connection.execute(_SQL_TOUCH_INDEX_STATE, (mtime_ns, file_size, source_path))
+
     def replace_book_chunks(
         self,
         *,
@@ -97,49 +236,31 @@ class SearchRepository:
         language: str | None = None,
         fingerprint: str,
         mtime_ns: int,
+        file_size: int | None = None,
         chunks: list[ChunkRow],
     ) -> int:
         """Replace one book's chunks and index state in one transaction."""
 
         with self._connection:
+            if not self._connection.in_transaction:
+                # Take the write lock before any work so a busy database waits
+                # (busy_timeout) up front instead of failing mid-batch.
+                self._connection.execute("BEGIN IMMEDIATE")
             self._connection.execute(
-                """
-                INSERT INTO books(source_path, title, author, format, language)
-                VALUES(?, ?, ?, ?, ?)
-                ON CONFLICT(source_path) DO UPDATE SET
-                    title=excluded.title,
-                    author=excluded.author,
-                    format=excluded.format,
-                    language=excluded.language,
-                    updated_at=CURRENT_TIMESTAMP
-                """,
-                (source_path, title, author, format_name, language),
+                _SQL_UPSERT_BOOK,
+                (source_path, title, author, format_name, language, len(chunks)),
             )
-            row = self._connection.execute(
-                "SELECT id FROM books WHERE source_path = ?",
-                (source_path,),
-            ).fetchone()
+            row = self._connection.execute(_SQL_GET_BOOK_ID, (source_path,)).fetchone()
             if row is None:
                 raise RuntimeError(f"Book row missing after upsert: {source_path}")
             book_id = int(row["id"])
 
-            self._connection.execute("DELETE FROM chunks WHERE book_id = ?", (book_id,))
+            self._connection.execute(_SQL_DELETE_BOOK_CHUNKS, (book_id,))
             self._connection.executemany(
-                """
-                INSERT INTO chunks(
-                    book_id,
-                    chunk_no,
-                    raw_text,
-                    lemma_text,
-                    page,
-                    chapter,
-                    item_id,
-                    char_start,
-                    char_end
-                )
-                VALUES(?, ?, ?, ?, ?, ?, ?, ?, ?)
-                """,
-                [
+                _SQL_INSERT_CHUNK,
+                # Generator, not list: executemany binds rows one at a time, so
+                # large books never hold a second full copy of their parameters.
+                (
                     (
                         book_id,
                         chunk.chunk_no,
@@ -152,24 +273,44 @@ class SearchRepository:
                         chunk.char_end,
                     )
                     for chunk in chunks
-                ],
+                ),
             )
+            frequent = self._frequent_lemma_set()
+            if frequent:
+                rows = self._connection.execute(_SQL_BOOK_CHUNK_LEMMAS, (book_id,))
+                index_chunk_bigrams(self._connection, rows, frequent)
 
             self._connection.execute(
-                """
-                INSERT INTO index_state(source_path, book_id, fingerprint, mtime_ns)
-                VALUES(?, ?, ?, ?)
-                ON CONFLICT(source_path) DO UPDATE SET
-                    book_id=excluded.book_id,
-                    fingerprint=excluded.fingerprint,
-                    mtime_ns=excluded.mtime_ns,
-                    indexed_at=CURRENT_TIMESTAMP
-                """,
-                (source_path, book_id, fingerprint, mtime_ns),
+                _SQL_UPSERT_INDEX_STATE,
+                (source_path, book_id, fingerprint, mtime_ns, file_size),
             )
 
         return book_id
 
+    def wants_bulk_load(self) -> bool:
+        """True for an empty chunk table, or one left mid bulk load by a crash."""
+
+        if fts_sync_suspended(self._connection):
+            return True
+        return self._connection.execute(_SQL_ANY_CHUNK).fetchone() is None
+
+    @contextmanager
+    def bulk_load(self) -> Iterator[None]:
+        """Skip per-row FTS updates for the block, then rebuild chunks_fts once.
+
+        Writes inside the block are not searchable until it exits. A run that
+        dies inside it leaves the trigger dropped, which ``wants_bulk_load``
+        reports so the next run rebuilds.
+        """
+
+        with self._connection:
+            suspend_fts_sync(self._connection)
+        try:
+            yield
+        finally:
+            with self._connection:
+                resume_fts_sync(self._connection)
+
     def run_maintenance(self, command: str) -> None:
         if command == "optimize":
             optimize_fts(self._connection)
@@ -177,124 +318,96 @@ class SearchRepository:
         if command == "rebuild":
             rebuild_fts(self._connection)
             return
+        if command == "analyze":
+            analyze_tables(self._connection)
+            return
+        if command == "bigrams":
+            refresh_bigram_index(self._connection)
+            self._frequent_lemmas = None
+            return
         raise ValueError(f"Unsupported maintenance command: {command}")
 
+    def _frequent_lemma_set(self) -> frozenset[str]:
+        if self._frequent_lemmas is None:
+            self._frequent_lemmas = load_frequent_lemmas(self._connection)
+        return self._frequent_lemmas
+
     def iter_chunks(self, *, limit: int | None = None, offset: int = 0) -> list[ChunkTextRow]:
         if offset < 0:
             raise ValueError("offset cannot be negative")
 
         if limit is None:
-            rows = self._connection.execute(
-                """
-                SELECT
-                    c.id AS chunk_id,
-                    c.book_id AS book_id,
-                    b.source_path AS source_path,
-                    b.title AS title,
-                    b.author AS author,
-                    b.format AS format_name,
-                    c.chunk_no AS chunk_no,
-                    c.raw_text AS raw_text,
-                    c.page AS page,
-                    c.chapter AS chapter,
-                    c.item_id AS item_id,
-                    c.char_start AS char_start,
-                    c.char_end AS char_end
-                FROM chunks c
-                JOIN books b ON b.id = c.book_id
-                ORDER BY c.id ASC
-                """
-            ).fetchall()
+            rows = self._connection.execute(_SQL_ITER_CHUNKS).fetchall()
         else:
             if limit <= 0:
                 raise ValueError("limit must be positive")
-            rows = self._connection.execute(
-                """
-                SELECT
-                    c.id AS chunk_id,
-                    c.book_id AS book_id,
-                    b.source_path AS source_path,
-                    b.title AS title,
-                    b.author AS author,
-                    b.format AS format_name,
-                    c.chunk_no AS chunk_no,
-                    c.raw_text AS raw_text,
-                    c.page AS page,
-                    c.chapter AS chapter,
-                    c.item_id AS item_id,
-                    c.char_start AS char_start,
-                    c.char_end AS char_end
-                FROM chunks c
-                JOIN books b ON b.id = c.book_id
-                ORDER BY c.id ASC
-                LIMIT ? OFFSET ?
-                """,
-                (limit, offset),
-            ).fetchall()
+            rows = self._connection.execute(_SQL_ITER_CHUNKS_PAGE, (limit, offset)).fetchall()
+
+        return [_chunk_text_row(row) for row in rows]
+
+    def iter_chunk_pages(self, *, page_size: int = _CHUNK_PAGE_SIZE) -> Iterator[list[ChunkTextRow]]:
+        """Yield every chunk in id order, at most *page_size* per page.
+
+        Pages are keyed on the last chunk id rather than an open cursor, so
+        callers may write through the same connection between pages.
+        """
+
+        if page_size <= 0:
+            raise ValueError("page_size must be positive")
+        last_id = 0
+        while True:
+            rows = self._connection.execute(_SQL_ITER_CHUNKS_AFTER, (last_id, page_size)).fetchall()
+            if not rows:
+                return
+            yield [_chunk_text_row(row) for row in rows]
+            last_id = int(rows[-1]["chunk_id"])
+
+    def book_ids_matching(self, *, author: str | None = None, format_name: str | None = None) -> list[int]:
+        """Ids of books whose author contains *author* and whose format equals *format_name*.
+
+        Both values are expected lowercased. Matching runs in Python because
+        SQLite's ``lower()`` only folds ASCII and authors are often Cyrillic.
+        """
 
         return [
-            ChunkTextRow(
-                chunk_id=int(row["chunk_id"]),
-                book_id=int(row["book_id"]),
-                source_path=row["source_path"],
-                title=row["title"],
-                author=row["author"],
-                format_name=row["format_name"],
-                chunk_no=int(row["chunk_no"]),
-                raw_text=row["raw_text"],
-                page=row["page"],
-                chapter=row["chapter"],
-                item_id=row["item_id"],
-                char_start=row["char_start"],
-                char_end=row["char_end"],
-            )
-            for row in rows
+            int(row["id"])
+            for row in self._connection.execute(_SQL_BOOK_FACETS)
+            if (author is None or (row["author"] is not None and author in row["author"].lower()))
+            and (format_name is None or (row["format"] is not None and row["format"].lower() == format_name))
         ]
 
     def fetch_chunks_by_ids(self, chunk_ids: list[int]) -> list[ChunkTextRow]:
-        if not chunk_ids:
-            return []
-
-        placeholders = ",".join("?" for _ in chunk_ids)
-        rows = self._connection.execute(
-            f"""
-            SELECT
-                c.id AS chunk_id,
-                c.book_id AS book_id,
-                b.source_path AS source_path,
-                b.title AS title,
-                b.author AS author,
-                b.format AS format_name,
-                c.chunk_no AS chunk_no,
-                c.raw_text AS raw_text,
-                c.page AS page,
-                c.chapter AS chapter,
-                c.item_id AS item_id,
-                c.char_start AS char_start,
-                c.char_end AS char_end
-            FROM chunks c
-            JOIN books b ON b.id = c.book_id
-            WHERE c.id IN ({placeholders})
-            ORDER BY c.id ASC
-            """,
-            tuple(chunk_ids),
-        ).fetchall()
+        """Fetch chunks with book metadata, one IN (...) query per 500 ids, ordered by id."""
 
-        return [
-            ChunkTextRow(
-                chunk_id=int(row["chunk_id"]),
-                book_id=int(row["book_id"]),
-                source_path=row["source_path"],
-                title=row["title"],
-                author=row["author"],
-                format_name=row["format_name"],
-                chunk_no=int(row["chunk_no"]),
-                raw_text=row["raw_text"],
-                page=row["page"],
-                chapter=row["chapter"],
-                item_id=row["item_id"],
-                char_start=row["char_start"],
-                char_end=row["char_end"],
+        rows: list[sqlite3.Row] = []
+        for start in range(0, len(chunk_ids), _IN_CLAUSE_BATCH):
+            batch = chunk_ids[start : start + _IN_CLAUSE_BATCH]
+            placeholders = ",".join("?" * len(batch))
+            rows.extend(
+                self._connection.execute(
+                    f"{_SQL_SELECT_CHUNK_TEXT}WHERE c.id IN ({placeholders}) ORDER BY c.id ASC",
+                    tuple(batch),
+                ).fetchall()
             )
-            for row in rows
-        ]
+        if len(chunk_ids) > _IN_CLAUSE_BATCH:
+            rows.sort(key=lambda row: int(row["chunk_id"]))
+
+        return [_chunk_text_row(row) for row in rows]
+
+
+def _chunk_text_row(row: sqlite3.Row) -> ChunkTextRow:
+    return ChunkTextRow(
+        chunk_id=int(row["chunk_id"]),
+        book_id=int(row["book_id"]),
+        source_path=row["source_path"],
+        title=row["title"],
+        author=row["author"],
+        format_name=row["format_name"],
+        chunk_no=int(row["chunk_no"]),
+        raw_text=row["raw_text"],
+        page=row["page"],
+        chapter=row["chapter"],
+        item_id=row["item_id"],
+        char_start=row["char_start"],
+        char_end=row["char_end"],
+    )
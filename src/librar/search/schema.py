@@ -6,6 +6,22 @@ import sqlite3
 
 
 PRAGMA_BUSY_TIMEOUT_MS = 5000
+PRAGMA_CACHE_SIZE_KIB = 20000
+PRAGMA_INDEXING_CACHE_SIZE_KIB = 32000
+PRAGMA_MMAP_SIZE_BYTES = 256 * 1024 * 1024
+PRAGMA_ANALYSIS_LIMIT = 400
+
+# Stored in PRAGMA user_version once ensure_schema completes. Bump it whenever
+# the DDL or the additive migrations below change.
+SCHEMA_VERSION = 1
+
+# Per-row chunks -> chunks_fts sync. Bulk loads drop it and rebuild once.
+_CHUNKS_FTS_INSERT_TRIGGER = """
+    CREATE TRIGGER IF NOT EXISTS chunks_ai AFTER INSERT ON chunks BEGIN
+        INSERT INTO chunks_fts(rowid, raw_text, lemma_text)
+        VALUES (new.id, new.raw_text, new.lemma_text);
+    END;
+"""
 
 
 def apply_runtime_pragmas(connection: sqlite3.Connection) -> None:
@@ -15,6 +31,19 @@ def apply_runtime_pragmas(connection: sqlite3.Connection) -> None:
     connection.execute(f"PRAGMA busy_timeout={PRAGMA_BUSY_TIMEOUT_MS};")
     connection.execute("PRAGMA synchronous=NORMAL;")
     connection.execute("PRAGMA foreign_keys=ON;")
+    # Negative cache_size is in KiB; leaves room for FTS5 segment pages.
+    connection.execute(f"PRAGMA cache_size=-{PRAGMA_CACHE_SIZE_KIB};")
+    # Ranked search sorts candidates in a temp b-tree; keep it off disk.
+    connection.execute("PRAGMA temp_store=MEMORY;")
+    # Memory-mapped reads let hot b-tree pages come straight from the OS
+    # page cache instead of being copied through SQLite's.
+    connection.execute(f"PRAGMA mmap_size={PRAGMA_MMAP_SIZE_BYTES};")
+
+
+def apply_indexing_pragmas(connection: sqlite3.Connection) -> None:
+    """Apply extra pragmas for bulk indexing runs on top of the runtime set."""
+
+    connection.execute(f"PRAGMA cache_size=-{PRAGMA_INDEXING_CACHE_SIZE_KIB};")
 
 
 def _add_column_if_missing(
@@ -32,7 +61,14 @@ def _add_column_if_missing(
 
 
 def ensure_schema(connection: sqlite3.Connection) -> None:
-    """Create search tables, FTS index, and sync triggers if missing."""
+    """Create search tables, FTS index, and sync triggers if missing.
+
+    A database already stamped with ``SCHEMA_VERSION`` is returned as-is
+    after a single ``PRAGMA user_version`` read.
+    """
+
+    if connection.execute("PRAGMA user_version").fetchone()[0] >= SCHEMA_VERSION:
+        return
 
     connection.executescript(
         """
@@ -43,6 +79,7 @@ def ensure_schema(connection: sqlite3.Connection) -> None:
             author TEXT,
             format TEXT,
             language TEXT,
+            chunk_count INTEGER NOT NULL DEFAULT 0,
             updated_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP
         );
 
@@ -69,6 +106,15 @@ def ensure_schema(connection: sqlite3.Connection) -> None:
             tokenize='unicode61 remove_diacritics 2'
         );
 
+        CREATE VIRTUAL TABLE IF NOT EXISTS chunks_bigram_fts USING fts5(
+            bigrams,
+            tokenize="unicode61 remove_diacritics 2 tokenchars '_'"
+        );
+
+        CREATE TABLE IF NOT EXISTS frequent_lemmas (
+            lemma TEXT PRIMARY KEY
+        ) WITHOUT ROWID;
+
         CREATE TABLE IF NOT EXISTS index_state (
             source_path TEXT PRIMARY KEY,
             book_id INTEGER NOT NULL,
@@ -152,16 +198,15 @@ def ensure_schema(connection: sqlite3.Connection) -> None:
         CREATE INDEX IF NOT EXISTS idx_book_categories_book_id ON book_categories(book_id);
         CREATE INDEX IF NOT EXISTS idx_book_tags_book_id ON book_tags(book_id);
 
-        CREATE TRIGGER IF NOT EXISTS chunks_ai AFTER INSERT ON chunks BEGIN
-            INSERT INTO chunks_fts(rowid, raw_text, lemma_text)
-            VALUES (new.id, new.raw_text, new.lemma_text);
-        END;
-
         CREATE TRIGGER IF NOT EXISTS chunks_ad AFTER DELETE ON chunks BEGIN
             INSERT INTO chunks_fts(chunks_fts, rowid, raw_text, lemma_text)
             VALUES ('delete', old.id, old.raw_text, old.lemma_text);
         END;
 
+        CREATE TRIGGER IF NOT EXISTS chunks_bigram_ad AFTER DELETE ON chunks BEGIN
+            DELETE FROM chunks_bigram_fts WHERE rowid = old.id;
+        END;
+
         CREATE TRIGGER IF NOT EXISTS chunks_au AFTER UPDATE ON chunks BEGIN
             INSERT INTO chunks_fts(chunks_fts, rowid, raw_text, lemma_text)
             VALUES ('delete', old.id, old.raw_text, old.lemma_text);
@@ -169,10 +214,14 @@ def ensure_schema(connection: sqlite3.Connection) -> None:
             VALUES (new.id, new.raw_text, new.lemma_text);
         END;
         """
+        + _CHUNKS_FTS_INSERT_TRIGGER
     )
 
     # Additive migrations: add columns to existing tables without breaking old DBs
     _add_column_if_missing(connection, "books", "language", "TEXT")
+    _add_column_if_missing(connection, "books", "chunk_count", "INTEGER NOT NULL DEFAULT 0")
+    _add_column_if_missing(connection, "index_state", "file_size", "INTEGER")
+    connection.execute(f"PRAGMA user_version={SCHEMA_VERSION};")
 
 
 def optimize_fts(connection: sqlite3.Connection) -> None:
@@ -185,3 +234,51 @@ def rebuild_fts(connection: sqlite3.Connection) -> None:
     """Run FTS rebuild maintenance command."""
 
     connection.execute("INSERT INTO chunks_fts(chunks_fts) VALUES ('rebuild');")
+
+
+def fts_sync_suspended(connection: sqlite3.Connection) -> bool:
+    """Return True while the chunks -> chunks_fts insert trigger is absent."""
+
+    row = connection.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'trigger' AND name = 'chunks_ai'"
+    ).fetchone()
+    return row is None
+
+
+def suspend_fts_sync(connection: sqlite3.Connection) -> None:
+    """Stop indexing inserted chunks row by row; pair with ``resume_fts_sync``."""
+
+    connection.execute("DROP TRIGGER IF EXISTS chunks_ai;")
+
+
+def resume_fts_sync(connection: sqlite3.Connection) -> None:
+    """Reinstall the insert trigger and rebuild chunks_fts from its content table."""
+
+    connection.execute(_CHUNKS_FTS_INSERT_TRIGGER)
+    rebuild_fts(connection)
+
+
+def analyze_tables(connection: sqlite3.Connection) -> None:
+    """Collect full query-planner statistics (sqlite_stat1)."""
+
+    connection.execute("ANALYZE;")
+
+
+def has_planner_stats(connection: sqlite3.Connection) -> bool:
+    """Return True once ANALYZE has produced sqlite_stat1 for this database."""
+
+    row = connection.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'sqlite_stat1'"
+    ).fetchone()
+    return row is not None
+
+
+def optimize_planner_stats(connection: sqlite3.Connection) -> None:
+    """Refresh planner statistics only for tables that drifted.
+
+    ``analysis_limit`` bounds the per-index sampling on SQLite < 3.46, where
+    ``PRAGMA optimize`` is not self-limiting.
+    """
+
+    connection.execute(f"PRAGMA analysis_limit={PRAGMA_ANALYSIS_LIMIT};")
+    connection.execute("PRAGMA optimize;")
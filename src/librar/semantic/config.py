@@ -3,12 +3,16 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
+from functools import lru_cache
 import os
 from typing import Mapping
 
 
 DEFAULT_OPENROUTER_BASE_URL = "https://openrouter.ai/api/v1"
 
+_BASE_URL_SCHEMES = ("http://", "https://")
+_TRUE_VALUES = frozenset({"1", "true", "yes", "on"})
+
 
 @dataclass(frozen=True, slots=True)
 class SemanticSettings:
@@ -17,6 +21,8 @@ class SemanticSettings:
     api_key: str
     model: str
     base_url: str = DEFAULT_OPENROUTER_BASE_URL
+    enable_query_cache: bool = False
+    warmup_on_start: bool = False
 
     @classmethod
     def from_env(cls, environ: Mapping[str, str] | None = None) -> "SemanticSettings":
@@ -25,20 +31,42 @@ class SemanticSettings:
         api_key = source.get("OPENROUTER_API_KEY", "").strip()
         model = source.get("OPENROUTER_EMBEDDING_MODEL", "").strip()
         base_url = source.get("OPENROUTER_BASE_URL", DEFAULT_OPENROUTER_BASE_URL).strip()
+        enable_query_cache = source.get("SEMANTIC_QUERY_CACHE", "").strip().lower() in _TRUE_VALUES
+        warmup_on_start = source.get("SEMANTIC_WARMUP", "").strip().lower() in _TRUE_VALUES
+
+        return _validated_settings(cls, api_key, model, base_url, enable_query_cache, warmup_on_start)
+
+
+@lru_cache(maxsize=8)
+def _validated_settings(
+    settings_cls: type[SemanticSettings],
+    api_key: str,
+    model: str,
+    base_url: str,
+    enable_query_cache: bool,
+    warmup_on_start: bool,
+) -> SemanticSettings:
+    """Validate once per distinct set of values; the frozen result is shared."""
 
-        missing: list[str] = []
-        if not api_key:
-            missing.append("OPENROUTER_API_KEY")
-        if not model:
-            missing.append("OPENROUTER_EMBEDDING_MODEL")
+    missing: list[str] = []
+    if not api_key:
+        missing.append("OPENROUTER_API_KEY")
+    if not model:
+        missing.append("OPENROUTER_EMBEDDING_MODEL")
 
-        if missing:
-            missing_text = ", ".join(missing)
-            raise ValueError(f"Missing required semantic environment variables: {missing_text}")
+    if missing:
+        missing_text = ", ".join(missing)
+        raise ValueError(f"Missing required semantic environment variables: {missing_text}")
 
-        if not base_url:
-            raise ValueError("OPENROUTER_BASE_URL cannot be empty")
-        if not (base_url.startswith("http://") or base_url.startswith("https://")):
-            raise ValueError("OPENROUTER_BASE_URL must start with http:// or https://")
+    if not base_url:
+        raise ValueError("OPENROUTER_BASE_URL cannot be empty")
+    if not base_url.startswith(_BASE_URL_SCHEMES):
+        raise ValueError("OPENROUTER_BASE_URL must start with http:// or https://")
 
-        return cls(api_key=api_key, model=model, base_url=base_url.rstrip("/"))
+    return settings_cls(
+        api_key=api_key,
+        model=model,
+        base_url=base_url.rstrip("/"),
+        enable_query_cache=enable_query_cache,
+        warmup_on_start=warmup_on_start,
+    )
@@ -2,19 +2,26 @@
 
 from __future__ import annotations
 
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
 from dataclasses import dataclass, field
-import hashlib
+from functools import lru_cache
 from pathlib import Path
 import time
-from typing import Protocol, Sequence
+from typing import Iterable, Iterator, Protocol, Sequence
 
 import numpy as np
+import xxhash
 
 from librar.search.repository import SearchRepository
 from librar.semantic.config import SemanticSettings
 from librar.semantic.openrouter import OpenRouterEmbedder
-from librar.semantic.semantic_repository import SemanticRepository
-from librar.semantic.vector_store import FaissVectorStore
+from librar.semantic.semantic_repository import SemanticChunkState, SemanticRepository
+from librar.semantic.vector_store import FaissVectorStore, Quantization
+
+
+# Batch size for embedders that do not advertise ``max_batch_size``.
+_DEFAULT_BATCH_SIZE = 32
 
 
 class _BatchEmbedder(Protocol):
@@ -53,13 +60,28 @@ class _PendingChunk:
     fingerprint: str
 
 
+@lru_cache(maxsize=8)
+def _model_hasher(model: str) -> xxhash.xxh3_64:
+    return xxhash.xxh3_64(f"{model}\n".encode("utf-8"))
+
+
 def _semantic_fingerprint(text: str, model: str) -> str:
-    payload = f"{model}\n{text}".encode("utf-8")
-    return hashlib.sha256(payload).hexdigest()
+    # Change detection only, no adversary: xxh3 is far cheaper than sha256.
+    # Continuing a hasher already fed the model prefix gives the same digest
+    # as hashing "model\ntext" without building that string for every chunk.
+    hasher = _model_hasher(model).copy()
+    hasher.update(text.encode("utf-8"))
+    return f"{hasher.intdigest():016x}"
 
 
 class SemanticIndexer:
-    """Builds and updates semantic vectors for existing chunks."""
+    """Builds and updates semantic vectors for existing chunks.
+
+    Up to ``max_inflight_batches`` embedding requests run concurrently on a
+    thread pool; results are applied to the vector store and chunk state on
+    the calling thread, in batch order. Embedders that compute locally can
+    set ``max_concurrent_batches`` (e.g. 1 for a CPU model) to cap that.
+    """
 
     def __init__(
         self,
@@ -68,12 +90,28 @@ class SemanticIndexer:
         semantic_repository: SemanticRepository,
         embedder: _BatchEmbedder,
         index_path: str | Path,
-        batch_size: int = 32,
+        batch_size: int | None = None,
         metric: str = "ip",
         vector_store: FaissVectorStore | None = None,
+        max_inflight_batches: int = 4,
+        quantize: Quantization = "none",
     ) -> None:
+        """``batch_size`` defaults to the embedder's ``max_batch_size`` and is capped by it."""
+
+        provider_max = getattr(embedder, "max_batch_size", None)
+        if batch_size is None:
+            batch_size = provider_max or _DEFAULT_BATCH_SIZE
         if batch_size <= 0:
             raise ValueError("batch_size must be positive")
+        if provider_max:
+            batch_size = min(batch_size, provider_max)
+        if max_inflight_batches <= 0:
+            raise ValueError("max_inflight_batches must be positive")
+        embedder_limit = getattr(embedder, "max_concurrent_batches", None)
+        if embedder_limit:
+            # A local model already uses every core per call; overlapping
+            # calls only make their thread pools fight each other.
+            max_inflight_batches = min(max_inflight_batches, embedder_limit)
 
         self._search_repository = search_repository
         self._semantic_repository = semantic_repository
@@ -82,6 +120,8 @@ class SemanticIndexer:
         self._batch_size = batch_size
         self._metric = metric
         self._vector_store = vector_store
+        self._max_inflight_batches = max_inflight_batches
+        self._quantize = quantize
 
     @classmethod
     def from_db_path(
@@ -90,7 +130,8 @@ class SemanticIndexer:
         db_path: str | Path,
         index_path: str | Path,
         settings: SemanticSettings | None = None,
-        batch_size: int = 32,
+        batch_size: int | None = None,
+        quantize: Quantization = "none",
     ) -> "SemanticIndexer":
         search_repository = SearchRepository(db_path)
         semantic_repository = SemanticRepository(search_repository.connection)
@@ -101,7 +142,12 @@ class SemanticIndexer:
         vector_store: FaissVectorStore | None = None
         index_state = semantic_repository.get_index_state()
         if index_state is not None and index_state.model == resolved_settings.model:
-            vector_store = FaissVectorStore(index_path, dimension=index_state.dimension, metric=index_state.metric)
+            vector_store = FaissVectorStore(
+                index_path,
+                dimension=index_state.dimension,
+                metric=index_state.metric,
+                quantize=quantize,
+            )
 
         return cls(
             search_repository=search_repository,
@@ -111,6 +157,7 @@ class SemanticIndexer:
             batch_size=batch_size,
             metric=index_state.metric if index_state is not None else "ip",
             vector_store=vector_store,
+            quantize=quantize,
         )
 
     def close(self) -> None:
@@ -126,38 +173,19 @@ class SemanticIndexer:
         started = time.perf_counter()
         stats = SemanticIndexStats(model=self._embedder.model)
 
-        chunks = self._search_repository.iter_chunks()
-        stats.scanned_chunks = len(chunks)
-
-        pending: list[_PendingChunk] = []
-        for chunk in chunks:
-            fingerprint = _semantic_fingerprint(chunk.raw_text, self._embedder.model)
-            current_state = self._semantic_repository.get_chunk_state(
-                chunk_id=chunk.chunk_id,
-                model=self._embedder.model,
-            )
-            if current_state is not None and current_state.fingerprint == fingerprint:
-                stats.skipped_unchanged += 1
-                continue
-            pending.append(_PendingChunk(chunk_id=chunk.chunk_id, raw_text=chunk.raw_text, fingerprint=fingerprint))
-
-        for start in range(0, len(pending), self._batch_size):
-            batch = pending[start : start + self._batch_size]
-            texts = [item.raw_text for item in batch]
-
-            try:
-                vectors = self._embedder.embed_texts(texts, stage="chunks")
-            except Exception as exc:
+        for batch, outcome in self._embed_batches(self._pending_batches(stats)):
+            if isinstance(outcome, Exception):
                 stats.errors += len(batch)
                 stats.error_details.append(
                     {
                         "stage": "embed_texts",
                         "chunk_ids": ",".join(str(item.chunk_id) for item in batch),
-                        "error": str(exc),
+                        "error": str(outcome),
                     }
                 )
                 continue
 
+            vectors = outcome
             if vectors.shape[0] != len(batch):
                 stats.errors += len(batch)
                 stats.error_details.append(
@@ -173,13 +201,15 @@ class SemanticIndexer:
             vector_ids = [item.chunk_id for item in batch]
             store.add_or_replace(vector_ids=vector_ids, vectors=vectors)
 
-            for item in batch:
-                self._semantic_repository.upsert_chunk_state(
+            self._semantic_repository.upsert_chunk_states_bulk(
+                SemanticChunkState(
                     chunk_id=item.chunk_id,
                     vector_id=item.chunk_id,
                     model=self._embedder.model,
                     fingerprint=item.fingerprint,
                 )
+                for item in batch
+            )
 
             stats.embedded_chunks += len(batch)
 
@@ -195,12 +225,71 @@ class SemanticIndexer:
         stats.duration_ms = int((time.perf_counter() - started) * 1000)
         return stats
 
+    def _pending_batches(self, stats: SemanticIndexStats) -> Iterator[list[_PendingChunk]]:
+        """Stream changed chunks page by page and group them into embedding batches.
+
+        Only one page of chunk rows and one partial batch are held at a time,
+        so memory stays flat however large the corpus is.
+        """
+
+        pending: list[_PendingChunk] = []
+        for page in self._search_repository.iter_chunk_pages():
+            stats.scanned_chunks += len(page)
+            current_states = self._semantic_repository.get_chunk_states_bulk(
+                model=self._embedder.model,
+                chunk_ids=[chunk.chunk_id for chunk in page],
+            )
+            for chunk in page:
+                fingerprint = _semantic_fingerprint(chunk.raw_text, self._embedder.model)
+                current_state = current_states.get(chunk.chunk_id)
+                if current_state is not None and current_state.fingerprint == fingerprint:
+                    stats.skipped_unchanged += 1
+                    continue
+                pending.append(_PendingChunk(chunk_id=chunk.chunk_id, raw_text=chunk.raw_text, fingerprint=fingerprint))
+                if len(pending) == self._batch_size:
+                    yield pending
+                    pending = []
+        if pending:
+            yield pending
+
+    def _embed_batch(self, batch: list[_PendingChunk]) -> np.ndarray | Exception:
+        try:
+            return self._embedder.embed_texts([item.raw_text for item in batch], stage="chunks")
+        except Exception as exc:
+            return exc
+
+    def _embed_batches(
+        self,
+        batches: Iterable[list[_PendingChunk]],
+    ) -> Iterator[tuple[list[_PendingChunk], np.ndarray | Exception]]:
+        """Yield each batch with its vectors (or failure) in order, keeping a bounded window in flight.
+
+        *batches* is consumed lazily, only as far as the window needs.
+        """
+
+        if self._max_inflight_batches == 1:
+            for batch in batches:
+                yield batch, self._embed_batch(batch)
+            return
+
+        inflight: deque[tuple[list[_PendingChunk], Future[np.ndarray | Exception]]] = deque()
+        with ThreadPoolExecutor(max_workers=self._max_inflight_batches) as pool:
+            for batch in batches:
+                inflight.append((batch, pool.submit(self._embed_batch, batch)))
+                if len(inflight) >= self._max_inflight_batches:
+                    done_batch, future = inflight.popleft()
+                    yield done_batch, future.result()
+            while inflight:
+                done_batch, future = inflight.popleft()
+                yield done_batch, future.result()
+
     def _ensure_vector_store(self, *, dimension: int) -> FaissVectorStore:
         if self._vector_store is None:
             self._vector_store = FaissVectorStore(
                 self._index_path,
                 dimension=dimension,
                 metric=self._metric,
+                quantize=self._quantize,
             )
             return self._vector_store
 
@@ -3,8 +3,9 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
+import random
 import time
-from typing import Any, Callable, Sequence
+from typing import Any, Callable, Final, Sequence
 
 import numpy as np
 
@@ -13,7 +14,11 @@ from librar.semantic.config import SemanticSettings
 
 _RETRYABLE_STATUS_CODES = {429, 500, 502, 503, 504}
 
-_RAG_SYSTEM_PROMPT = (
+# Retry delays are scaled by a factor drawn from this range so concurrent
+# clients that fail together do not retry in lockstep.
+_RETRY_JITTER_RANGE = (0.5, 1.5)
+
+_RAG_SYSTEM_PROMPT: Final[str] = (
     "Ты помощник библиотечного бота. "
     "Отвечай ТОЛЬКО на основе предоставленного контекста. "
     "Никогда не используй внешние знания. "
@@ -28,6 +33,10 @@ _RAG_SYSTEM_PROMPT = (
     "(повторить для каждого источника)"
 )
 
+# Built once and spread into every request so the system turn is the same
+# object (and byte-identical payload prefix) across calls.
+_SYSTEM_MESSAGE: Final = ({"role": "system", "content": _RAG_SYSTEM_PROMPT},)
+
 
 @dataclass(slots=True)
 class EmbeddingRequestError(RuntimeError):
@@ -81,6 +90,13 @@ def _is_retryable(exc: Exception) -> bool:
     }
 
 
+def _backoff_schedule(base_seconds: float, max_retries: int, rng: random.Random) -> tuple[float, ...]:
+    """Jittered exponential delays, one per retry."""
+
+    low, high = _RETRY_JITTER_RANGE
+    return tuple(base_seconds * (2**attempt) * rng.uniform(low, high) for attempt in range(max_retries))
+
+
 def _extract_vectors(response: Any, *, expected_count: int, model: str, stage: str) -> np.ndarray:
     data = getattr(response, "data", None)
     if not isinstance(data, list):
@@ -92,34 +108,41 @@ def _extract_vectors(response: Any, *, expected_count: int, model: str, stage: s
             message=f"Embeddings response count mismatch: expected {expected_count}, got {len(data)}",
         )
 
-    vectors: list[list[float]] = []
-    dimension: int | None = None
+    # Fill one preallocated C-contiguous float32 matrix (sized from the first
+    # row) instead of building Python float lists and copying them again.
+    vectors: np.ndarray | None = None
 
-    for item in data:
+    for row_index, item in enumerate(data):
         embedding = getattr(item, "embedding", None)
         if embedding is None and isinstance(item, dict):
             embedding = item.get("embedding")
         if not isinstance(embedding, (list, tuple)) or len(embedding) == 0:
             raise EmbeddingRequestError(model=model, stage=stage, message="Embedding row missing numeric vector")
 
-        numeric = [float(value) for value in embedding]
-        if dimension is None:
-            dimension = len(numeric)
-        elif len(numeric) != dimension:
+        if vectors is None:
+            vectors = np.empty((expected_count, len(embedding)), dtype=np.float32)
+        elif len(embedding) != vectors.shape[1]:
             raise EmbeddingRequestError(
                 model=model,
                 stage=stage,
-                message=f"Embedding dimension mismatch: expected {dimension}, got {len(numeric)}",
+                message=f"Embedding dimension mismatch: expected {vectors.shape[1]}, got {len(embedding)}",
             )
 
-        vectors.append(numeric)
+        vectors[row_index] = embedding
 
-    return np.asarray(vectors, dtype=np.float32)
+    if vectors is None:
+        return np.empty((0, 0), dtype=np.float32)
+    return vectors
 
 
 class OpenRouterEmbedder:
     """OpenRouter embeddings wrapper with response validation and retry semantics."""
 
+    # Inputs per embeddings request. OpenAI-compatible endpoints accept up to
+    # 2048 inputs but also cap tokens per request; 1024 chunks of the default
+    # 500 characters stays under that cap.
+    max_batch_size: int = 1024
+
     def __init__(
         self,
         settings: SemanticSettings,
@@ -128,6 +151,7 @@ class OpenRouterEmbedder:
         max_retries: int = 2,
         retry_base_seconds: float = 0.25,
         sleep: Callable[[float], None] = time.sleep,
+        rng: random.Random | None = None,
     ) -> None:
         if max_retries < 0:
             raise ValueError("max_retries cannot be negative")
@@ -137,7 +161,7 @@ class OpenRouterEmbedder:
         self._settings = settings
         self._client = client or _build_default_client(settings)
         self._max_retries = max_retries
-        self._retry_base_seconds = retry_base_seconds
+        self._retry_delays = _backoff_schedule(retry_base_seconds, max_retries, rng or random.Random())
         self._sleep = sleep
 
     @property
@@ -171,8 +195,7 @@ class OpenRouterEmbedder:
                 should_retry = attempt < self._max_retries and _is_retryable(exc)
                 if not should_retry:
                     break
-                delay = self._retry_base_seconds * (2**attempt)
-                self._sleep(delay)
+                self._sleep(self._retry_delays[attempt])
 
         detail = str(last_error) if last_error is not None else "unknown OpenRouter error"
         raise EmbeddingRequestError(
@@ -193,6 +216,7 @@ class OpenRouterGenerator:
         max_retries: int = 2,
         retry_base_seconds: float = 0.25,
         sleep: Callable[[float], None] = time.sleep,
+        rng: random.Random | None = None,
     ) -> None:
         if max_retries < 0:
             raise ValueError("max_retries cannot be negative")
@@ -202,7 +226,7 @@ class OpenRouterGenerator:
         self._settings = settings
         self._client = client or _build_default_client(settings)
         self._max_retries = max_retries
-        self._retry_base_seconds = retry_base_seconds
+        self._retry_delays = _backoff_schedule(retry_base_seconds, max_retries, rng or random.Random())
         self._sleep = sleep
 
     def generate_text(
@@ -256,10 +280,7 @@ class OpenRouterGenerator:
             try:
                 return self._client.chat.completions.create(
                     model=model,
-                    messages=[
-                        {"role": "system", "content": _RAG_SYSTEM_PROMPT},
-                        {"role": "user", "content": prompt},
-                    ],
+                    messages=[*_SYSTEM_MESSAGE, {"role": "user", "content": prompt}],
                     temperature=temperature,
                     max_tokens=max_tokens,
                 )
@@ -268,8 +289,7 @@ class OpenRouterGenerator:
                 should_retry = attempt < self._max_retries and _is_retryable(exc)
                 if not should_retry:
                     break
-                delay = self._retry_base_seconds * (2**attempt)
-                self._sleep(delay)
+                self._sleep(self._retry_delays[attempt])
 
         detail = str(last_error) if last_error is not None else "unknown OpenRouter error"
         raise GenerationRequestError(
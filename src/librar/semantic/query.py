@@ -2,17 +2,45 @@
 
 from __future__ import annotations
 
+from collections import OrderedDict
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Any, Protocol
+import threading
+import time
+from typing import Any, Collection, Protocol
 
 import numpy as np
 
-from librar.search.repository import SearchRepository
+from librar.search.repository import ChunkTextRow, SearchRepository
 from librar.semantic.config import SemanticSettings
 from librar.semantic.openrouter import OpenRouterEmbedder
+from librar.semantic.query_cache import SemanticQueryCache
 from librar.semantic.semantic_repository import SemanticRepository
-from librar.semantic.vector_store import FaissVectorStore
+from librar.semantic.vector_store import FaissVectorStore, index_generation
+
+
+# Vector hits resolved to chunk rows per round-trip; fetching stops window by
+# window once ``limit`` hits are built.
+_CHUNK_FETCH_WINDOW = 500
+
+# Query embeddings shared by every service in the process, keyed by model and
+# casefolded text. Callers such as the bot open a service per search, so a
+# per-instance cache would never see a repeat.
+_EMBEDDING_CACHE_SIZE = 1024
+_embedding_cache: OrderedDict[tuple[str, str], np.ndarray] = OrderedDict()
+_embedding_cache_lock = threading.Lock()
+
+# Result caches shared by every service in the process, one per index file
+# and model, each tagged with the index generation it was created for.
+_query_caches: dict[tuple[str, str], tuple[tuple[int | None, ...], SemanticQueryCache[Any]]] = {}
+_query_caches_lock = threading.Lock()
+
+# Query embedders shared by every service in the process, so the OpenRouter
+# client and its open connections outlive the per-search services.
+_embedders: dict[SemanticSettings, OpenRouterEmbedder] = {}
+_embedders_lock = threading.Lock()
+
+_WARMUP_QUERY = "warmup"
 
 
 class _QueryEmbedder(Protocol):
@@ -25,7 +53,13 @@ class _QueryEmbedder(Protocol):
 
 
 class _VectorSearcher(Protocol):
-    def search(self, query_vector: np.ndarray, *, top_k: int = 10) -> list[Any]:
+    def search(
+        self,
+        query_vector: np.ndarray,
+        *,
+        top_k: int = 10,
+        allowed_ids: Collection[int] | None = None,
+    ) -> list[Any]:
         ...
 
 
@@ -73,11 +107,15 @@ class SemanticQueryService:
         semantic_repository: SemanticRepository,
         vector_store: _VectorSearcher,
         embedder: _QueryEmbedder,
+        query_cache: SemanticQueryCache[SemanticSearchHit] | None = None,
     ) -> None:
         self._search_repository = search_repository
         self._semantic_repository = semantic_repository
         self._vector_store = vector_store
         self._embedder = embedder
+        # Results are only valid for the index they were computed from; see
+        # shared_query_cache for a cache that outlives the service.
+        self._query_cache = query_cache
 
     @classmethod
     def from_db_path(
@@ -103,15 +141,34 @@ class SemanticQueryService:
                 "Reindex with `python -m librar.cli.index_semantic`."
             )
 
-        vector_store = FaissVectorStore(index_path, dimension=index_state.dimension, metric=index_state.metric)
-        embedder = OpenRouterEmbedder(resolved_settings)
+        # Before loading the store: a save in between then only costs a
+        # fresh cache on the next service, never stale hits.
+        query_cache = (
+            shared_query_cache(index_path, model=index_state.model) if resolved_settings.enable_query_cache else None
+        )
+        vector_store = FaissVectorStore(
+            index_path,
+            dimension=index_state.dimension,
+            metric=index_state.metric,
+            read_only=True,
+        )
         return cls(
             search_repository=search_repository,
             semantic_repository=semantic_repository,
             vector_store=vector_store,
-            embedder=embedder,
+            embedder=shared_embedder(resolved_settings),
+            query_cache=query_cache,
         )
 
+    def warm_up(self) -> threading.Thread:
+        """Send a throwaway query embedding from a daemon thread; see ``warm_up_embedder``."""
+
+        return warm_up_embedder(self._embedder)
+
+    @property
+    def query_cache(self) -> SemanticQueryCache[SemanticSearchHit] | None:
+        return self._query_cache
+
     def close(self) -> None:
         self._search_repository.close()
 
@@ -143,55 +200,158 @@ class SemanticQueryService:
         author_value = author_filter.strip().lower() if author_filter and author_filter.strip() else None
         format_value = format_filter.strip().lower() if format_filter and format_filter.strip() else None
 
-        query_vector = self._embedder.embed_query(query_text)
-        top_k = max(limit, candidate_limit or limit)
-        if (author_value or format_value) and hasattr(self._vector_store, "ntotal"):
-            total = int(getattr(self._vector_store, "ntotal") or 0)
-            if total > 0:
-                top_k = max(top_k, total)
-
-        vector_hits = self._vector_store.search(query_vector, top_k=top_k)
-        if not vector_hits:
-            return []
+        cache = self._query_cache
+        cache_key = (author_value, format_value, limit, candidate_limit)
+        if cache is not None:
+            cached = cache.lookup_text(query_text, cache_key)
+            if cached is not None:
+                return cached
+
+        started = time.perf_counter()
+        query_vector = self._embed_query(query_text)
+        if cache is not None:
+            cached = cache.lookup_vector(query_vector, cache_key)
+            if cached is not None:
+                latency_ms = (time.perf_counter() - started) * 1000
+                cache.store(query_text, cache_key, query_vector, cached, latency_ms=latency_ms)
+                return cached
 
-        chunk_ids = [int(hit.vector_id) for hit in vector_hits]
-        chunks = self._search_repository.fetch_chunks_by_ids(chunk_ids)
-        by_id = {chunk.chunk_id: chunk for chunk in chunks}
+        top_k = max(limit, candidate_limit or limit)
+        allowed_ids: list[int] | None = None
+        if author_value or format_value:
+            # Resolve the filter to vector ids up front so the vector search
+            # only ranks matching chunks instead of the whole corpus.
+            book_ids = self._search_repository.book_ids_matching(author=author_value, format_name=format_value)
+            allowed_ids = self._semantic_repository.vector_ids_for_books(model=index_state.model, book_ids=book_ids)
+
+        if allowed_ids is not None and not allowed_ids:
+            vector_hits: list[Any] = []
+        else:
+            vector_hits = self._vector_store.search(query_vector, top_k=top_k, allowed_ids=allowed_ids)
+        results = self._build_hits(vector_hits, limit=limit, author_value=author_value, format_value=format_value)
+        if cache is not None:
+            latency_ms = (time.perf_counter() - started) * 1000
+            cache.store(query_text, cache_key, query_vector, results, latency_ms=latency_ms)
+        return results
 
+    def _embed_query(self, query_text: str) -> np.ndarray:
+        """Embed *query_text*, reusing the vector of an earlier identical query."""
+
+        key = (self._embedder.model, query_text.casefold())
+        with _embedding_cache_lock:
+            vector = _embedding_cache.get(key)
+            if vector is not None:
+                _embedding_cache.move_to_end(key)
+                return vector
+
+        vector = np.array(self._embedder.embed_query(query_text), dtype=np.float32)
+        vector.setflags(write=False)  # shared by every later hit
+        with _embedding_cache_lock:
+            _embedding_cache[key] = vector
+            while len(_embedding_cache) > _EMBEDDING_CACHE_SIZE:
+                _embedding_cache.popitem(last=False)
+        return vector
+
+    def _build_hits(
+        self,
+        vector_hits: list[Any],
+        *,
+        limit: int,
+        author_value: str | None,
+        format_value: str | None,
+    ) -> list[SemanticSearchHit]:
         results: list[SemanticSearchHit] = []
-        for hit in vector_hits:
-            chunk = by_id.get(int(hit.vector_id))
-            if chunk is None:
-                continue
-
-            if author_value and (chunk.author is None or author_value not in chunk.author.lower()):
-                continue
-            if format_value and (chunk.format_name is None or chunk.format_name.lower() != format_value):
-                continue
-
-            excerpt = chunk.raw_text.strip()
-            if len(excerpt) > 300:
-                excerpt = excerpt[:297].rstrip() + "..."
-
-            results.append(
-                SemanticSearchHit(
-                    source_path=chunk.source_path,
-                    title=chunk.title,
-                    author=chunk.author,
-                    format_name=chunk.format_name,
-                    chunk_id=chunk.chunk_id,
-                    chunk_no=chunk.chunk_no,
-                    page=chunk.page,
-                    chapter=chunk.chapter,
-                    item_id=chunk.item_id,
-                    char_start=chunk.char_start,
-                    char_end=chunk.char_end,
-                    score=float(hit.score),
-                    excerpt=excerpt,
-                )
-            )
-
-            if len(results) >= limit:
-                break
+        for start in range(0, len(vector_hits), _CHUNK_FETCH_WINDOW):
+            window = vector_hits[start : start + _CHUNK_FETCH_WINDOW]
+            chunks = self._search_repository.fetch_chunks_by_ids([int(hit.vector_id) for hit in window])
+            by_id = {chunk.chunk_id: chunk for chunk in chunks}
+            for hit in window:
+                chunk = by_id.get(int(hit.vector_id))
+                if chunk is None:
+                    continue
+                if author_value and (chunk.author is None or author_value not in chunk.author.lower()):
+                    continue
+                if format_value and (chunk.format_name is None or chunk.format_name.lower() != format_value):
+                    continue
+
+                results.append(_semantic_hit(chunk, float(hit.score)))
+                if len(results) >= limit:
+                    return results
 
         return results
+
+
+def shared_embedder(settings: SemanticSettings) -> OpenRouterEmbedder:
+    """Return the process-wide query embedder for *settings*, creating it on first use.
+
+    With ``settings.warmup_on_start`` a newly created embedder is warmed up
+    right away, so the process pays for connection setup once, up front.
+    """
+
+    with _embedders_lock:
+        embedder = _embedders.get(settings)
+        if embedder is not None:
+            return embedder
+        embedder = OpenRouterEmbedder(settings)
+        _embedders[settings] = embedder
+    if settings.warmup_on_start:
+        warm_up_embedder(embedder)
+    return embedder
+
+
+def warm_up_embedder(embedder: _QueryEmbedder) -> threading.Thread:
+    """Send a throwaway query embedding from a daemon thread.
+
+    Opens the embedder's HTTP connection before the first real query
+    needs it. Failures are ignored; a real query reports its own.
+    """
+
+    def _run() -> None:
+        try:
+            embedder.embed_query(_WARMUP_QUERY)
+        except Exception:
+            pass
+
+    thread = threading.Thread(target=_run, name="semantic-warmup", daemon=True)
+    thread.start()
+    return thread
+
+
+def shared_query_cache(index_path: str | Path, *, model: str) -> SemanticQueryCache[SemanticSearchHit]:
+    """Return the process-wide result cache for the index at *index_path*.
+
+    Services are opened per search, so a cache owned by one would never see a
+    repeat. Call this before loading the index: once the index files change
+    on disk the next call replaces the cache with an empty one.
+    """
+
+    scope = (str(Path(index_path).resolve()), model)
+    generation = index_generation(index_path)
+    with _query_caches_lock:
+        current = _query_caches.get(scope)
+        if current is None or current[0] != generation:
+            current = (generation, SemanticQueryCache())
+            _query_caches[scope] = current
+        return current[1]
+
+
+def _semantic_hit(chunk: ChunkTextRow, score: float) -> SemanticSearchHit:
+    excerpt = chunk.raw_text.strip()
+    if len(excerpt) > 300:
+        excerpt = excerpt[:297].rstrip() + "..."
+
+    return SemanticSearchHit(
+        source_path=chunk.source_path,
+        title=chunk.title,
+        author=chunk.author,
+        format_name=chunk.format_name,
+        chunk_id=chunk.chunk_id,
+        chunk_no=chunk.chunk_no,
+        page=chunk.page,
+        chapter=chunk.chapter,
+        item_id=chunk.item_id,
+        char_start=chunk.char_start,
+        char_end=chunk.char_end,
+        score=score,
+        excerpt=excerpt,
+    )
@@ -0,0 +1,139 @@
+"""In-process cache of semantic query results keyed by query embedding."""
+
+from __future__ import annotations
+
+from collections import OrderedDict
+from dataclasses import dataclass
+import threading
+import time
+from typing import Callable, Generic, Hashable, TypeVar
+
+import numpy as np
+
+
+DEFAULT_CAPACITY = 512
+DEFAULT_THRESHOLD = 0.97
+DEFAULT_TTL_SECONDS = 7 * 86400.0
+DEFAULT_MIN_LATENCY_MS = 50.0
+
+_HitT = TypeVar("_HitT")
+
+
+@dataclass(slots=True)
+class _CacheEntry(Generic[_HitT]):
+    filter_key: Hashable
+    vector: np.ndarray
+    hits: list[_HitT]
+    stored_at: float
+
+
+def _unit(vector: np.ndarray) -> np.ndarray:
+    array = np.asarray(vector, dtype=np.float32).reshape(-1)
+    norm = float(np.linalg.norm(array))
+    return array / norm if norm > 0 else array
+
+
+class SemanticQueryCache(Generic[_HitT]):
+    """LRU cache returning stored hits for the same or a near-identical query.
+
+    ``lookup_text`` matches the normalized query text exactly and skips the
+    embedding call. ``lookup_vector`` matches any stored query under the same
+    ``filter_key`` whose embedding has cosine similarity >= ``threshold``,
+    scored with one matrix-vector product, and skips the vector search.
+
+    Only results that took at least ``min_latency_ms`` to compute are
+    admitted: fast lookups gain little from caching and would evict the
+    slow ones that do.
+
+    Safe to share between threads: every method holds an internal lock.
+    """
+
+    def __init__(
+        self,
+        *,
+        capacity: int = DEFAULT_CAPACITY,
+        threshold: float = DEFAULT_THRESHOLD,
+        ttl_seconds: float = DEFAULT_TTL_SECONDS,
+        min_latency_ms: float = DEFAULT_MIN_LATENCY_MS,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        if capacity <= 0:
+            raise ValueError("capacity must be positive")
+        if not 0.0 < threshold <= 1.0:
+            raise ValueError("threshold must be in (0, 1]")
+        if ttl_seconds <= 0:
+            raise ValueError("ttl_seconds must be positive")
+        if min_latency_ms < 0:
+            raise ValueError("min_latency_ms cannot be negative")
+
+        self._capacity = capacity
+        self._threshold = threshold
+        self._ttl_seconds = ttl_seconds
+        self._min_latency_ms = min_latency_ms
+        self._clock = clock
+        self._entries: OrderedDict[tuple[str, Hashable], _CacheEntry[_HitT]] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+    def lookup_text(self, query_text: str, filter_key: Hashable) -> list[_HitT] | None:
+        key = (query_text.casefold(), filter_key)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or self._expired(entry):
+                if entry is not None:
+                    del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return list(entry.hits)
+
+    def lookup_vector(self, vector: np.ndarray, filter_key: Hashable) -> list[_HitT] | None:
+        query = _unit(vector)
+        with self._lock:
+            self._evict_expired()
+            keys = [key for key, entry in self._entries.items() if entry.filter_key == filter_key]
+            if keys:
+                stored = np.stack([self._entries[key].vector for key in keys])
+                similarities = stored @ query
+                best = int(np.argmax(similarities))
+                if float(similarities[best]) >= self._threshold:
+                    self._entries.move_to_end(keys[best])
+                    self.hits += 1
+                    return list(self._entries[keys[best]].hits)
+            self.misses += 1
+            return None
+
+    def store(
+        self,
+        query_text: str,
+        filter_key: Hashable,
+        vector: np.ndarray,
+        hits: list[_HitT],
+        *,
+        latency_ms: float,
+    ) -> bool:
+        """Cache *hits* if computing them took ``min_latency_ms`` or more; return whether stored."""
+
+        if latency_ms < self._min_latency_ms:
+            return False
+        key = (query_text.casefold(), filter_key)
+        entry = _CacheEntry(filter_key=filter_key, vector=_unit(vector), hits=list(hits), stored_at=self._clock())
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._capacity:
+                self._entries.popitem(last=False)
+        return True
+
+    def _expired(self, entry: _CacheEntry[_HitT]) -> bool:
+        return self._clock() - entry.stored_at > self._ttl_seconds
+
+    def _evict_expired(self) -> None:
+        stale = [key for key, entry in self._entries.items() if self._expired(entry)]
+        for key in stale:
+            del self._entries[key]
@@ -4,6 +4,23 @@ from __future__ import annotations
 
 from dataclasses import dataclass
 import sqlite3
+from typing import Iterable
+
+
+# Stays well under SQLite's default host-parameter limit (999 before 3.32).
+_IN_CLAUSE_BATCH = 500
+
+_SQL_CREATE_KEEP_IDS = "CREATE TEMP TABLE IF NOT EXISTS semantic_keep_ids(chunk_id INTEGER PRIMARY KEY)"
+
+_SQL_UPSERT_CHUNK_STATE = """
+INSERT INTO semantic_chunk_state(chunk_id, vector_id, model, fingerprint)
+VALUES(?, ?, ?, ?)
+ON CONFLICT(chunk_id) DO UPDATE SET
+    vector_id=excluded.vector_id,
+    model=excluded.model,
+    fingerprint=excluded.fingerprint,
+    updated_at=CURRENT_TIMESTAMP
+"""
 
 
 @dataclass(slots=True)
@@ -81,19 +98,60 @@ class SemanticRepository:
             fingerprint=row["fingerprint"],
         )
 
+    def get_chunk_states_bulk(self, *, model: str, chunk_ids: list[int]) -> dict[int, SemanticChunkState]:
+        """Fetch chunk states for many ids with one IN (...) query per 500 ids."""
+
+        states: dict[int, SemanticChunkState] = {}
+        for start in range(0, len(chunk_ids), _IN_CLAUSE_BATCH):
+            batch = chunk_ids[start : start + _IN_CLAUSE_BATCH]
+            placeholders = ",".join("?" * len(batch))
+            rows = self._connection.execute(
+                f"""
+                SELECT chunk_id, vector_id, model, fingerprint
+                FROM semantic_chunk_state
+                WHERE model = ? AND chunk_id IN ({placeholders})
+                """,
+                (model, *batch),
+            ).fetchall()
+            for row in rows:
+                states[int(row["chunk_id"])] = SemanticChunkState(
+                    chunk_id=int(row["chunk_id"]),
+                    vector_id=int(row["vector_id"]),
+                    model=row["model"],
+                    fingerprint=row["fingerprint"],
+                )
+        return states
+
+    def vector_ids_for_books(self, *, model: str, book_ids: list[int]) -> list[int]:
+        """Vector ids of every indexed chunk of *book_ids*, one IN (...) query per 500 ids."""
+
+        vector_ids: list[int] = []
+        for start in range(0, len(book_ids), _IN_CLAUSE_BATCH):
+            batch = book_ids[start : start + _IN_CLAUSE_BATCH]
+            placeholders = ",".join("?" * len(batch))
+            rows = self._connection.execute(
+                f"""
+                SELECT s.vector_id
+                FROM semantic_chunk_state s
+                JOIN chunks c ON c.id = s.chunk_id
+                WHERE s.model = ? AND c.book_id IN ({placeholders})
+                """,
+                (model, *batch),
+            ).fetchall()
+            vector_ids.extend(int(row["vector_id"]) for row in rows)
+        return vector_ids
+
     def upsert_chunk_state(self, *, chunk_id: int, vector_id: int, model: str, fingerprint: str) -> None:
         with self._connection:
-            self._connection.execute(
-                """
-                INSERT INTO semantic_chunk_state(chunk_id, vector_id, model, fingerprint)
-                VALUES(?, ?, ?, ?)
-                ON CONFLICT(chunk_id) DO UPDATE SET
-                    vector_id=excluded.vector_id,
-                    model=excluded.model,
-                    fingerprint=excluded.fingerprint,
-                    updated_at=CURRENT_TIMESTAMP
-                """,
-                (chunk_id, vector_id, model, fingerprint),
+            self._connection.execute(_SQL_UPSERT_CHUNK_STATE, (chunk_id, vector_id, model, fingerprint))
+
+    def upsert_chunk_states_bulk(self, states: Iterable[SemanticChunkState]) -> None:
+        """Upsert many chunk states with one executemany in one transaction."""
+
+        with self._connection:
+            self._connection.executemany(
+                _SQL_UPSERT_CHUNK_STATE,
+                ((state.chunk_id, state.vector_id, state.model, state.fingerprint) for state in states),
             )
 
     def list_chunk_states(self, *, model: str) -> list[SemanticChunkState]:
@@ -118,6 +176,12 @@ class SemanticRepository:
         ]
 
     def delete_chunk_states_not_in(self, *, model: str, chunk_ids: set[int]) -> int:
+        """Delete *model* states whose chunk is not in *chunk_ids*.
+
+        The keep-set goes through a temp table, so one DELETE handles any
+        number of ids without hitting SQLite's host-parameter limit.
+        """
+
         with self._connection:
             if not chunk_ids:
                 cursor = self._connection.execute(
@@ -126,14 +190,20 @@ class SemanticRepository:
                 )
                 return int(cursor.rowcount)
 
-            placeholders = ",".join("?" for _ in chunk_ids)
-            params: tuple[object, ...] = (model, *sorted(chunk_ids))
-            cursor = self._connection.execute(
-                f"""
-                DELETE FROM semantic_chunk_state
-                WHERE model = ?
-                  AND chunk_id NOT IN ({placeholders})
-                """,
-                params,
-            )
-            return int(cursor.rowcount)
+            self._connection.execute(_SQL_CREATE_KEEP_IDS)
+            try:
+                self._connection.executemany(
+                    "INSERT OR IGNORE INTO temp.semantic_keep_ids(chunk_id) VALUES(?)",
+                    ((chunk_id,) for chunk_id in chunk_ids),
+                )
+                cursor = self._connection.execute(
+                    """
+                    DELETE FROM semantic_chunk_state
+                    WHERE model = ?
+                      AND chunk_id NOT IN (SELECT chunk_id FROM temp.semantic_keep_ids)
+                    """,
+                    (model,),
+                )
+                return int(cursor.rowcount)
+            finally:
+                self._connection.execute("DROP TABLE temp.semantic_keep_ids")
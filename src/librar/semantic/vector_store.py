@@ -3,12 +3,39 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
+import logging
 from pathlib import Path
-from typing import Any, Sequence
+import threading
+from typing import Any, Collection, Literal, Sequence
 
 import numpy as np
 
 
+logger = logging.getLogger(__name__)
+
+# Above this many vectors ``save`` also writes an HNSW graph next to the flat
+# index, and read-only stores search the graph instead of scanning every
+# vector. The flat index stays the writable source of truth: HNSW cannot
+# remove ids, which ``add_or_replace`` needs.
+HNSW_MIN_VECTORS = 50_000
+HNSW_M = 32
+HNSW_EF_CONSTRUCTION = 200
+HNSW_EF_SEARCH = 64
+
+# "sq8" stores the HNSW graph's vectors as 8-bit scalar-quantized codes, a
+# quarter of the fp32 bytes read per distance. The quantizer is trained on
+# every stored vector at save time; the flat index stays fp32 and exact.
+Quantization = Literal["none", "sq8"]
+
+# ``save`` writes changes to a small delta file next to the index until they
+# exceed this fraction of the index; then it rewrites (compacts) the index.
+DELTA_COMPACT_RATIO = 0.1
+
+# Restricted searches over at most this many ids score the reconstructed
+# vectors directly instead of running a FAISS search with an id selector.
+EXACT_SUBSET_MAX = 2048
+
+
 @dataclass(slots=True)
 class VectorSearchHit:
     vector_id: int
@@ -24,18 +51,22 @@ class VectorStoreError(RuntimeError):
 
 
 def _to_vectors_array(vectors: np.ndarray | Sequence[Sequence[float]], *, dimension: int) -> np.ndarray:
-    array = np.asarray(vectors, dtype=np.float32)
+    # One private C-contiguous float32 copy: "ip" normalizes it in place and
+    # the journal keeps views of its rows, so it must not alias the caller's.
+    array = np.array(vectors, dtype=np.float32, order="C")
     if array.ndim != 2:
         raise ValueError("vectors must be a 2D array")
     if array.shape[1] != dimension:
         raise ValueError(f"vector dimension mismatch: expected {dimension}, got {array.shape[1]}")
     if array.shape[0] == 0:
         raise ValueError("vectors cannot be empty")
-    return np.ascontiguousarray(array)
+    return array
 
 
 def _to_query_array(query_vector: np.ndarray | Sequence[float], *, dimension: int) -> np.ndarray:
-    array = np.asarray(query_vector, dtype=np.float32)
+    # Always a copy: "ip" searches normalize it in place, and callers may
+    # pass cached, read-only vectors.
+    array = np.array(query_vector, dtype=np.float32)
     if array.ndim != 1:
         raise ValueError("query_vector must be a 1D array")
     if array.shape[0] != dimension:
@@ -43,20 +74,99 @@ def _to_query_array(query_vector: np.ndarray | Sequence[float], *, dimension: in
     return np.ascontiguousarray(array.reshape(1, -1))
 
 
-class FaissVectorStore:
-    """Thin persistence wrapper around an ID-mapped FAISS index."""
+def index_generation(index_path: str | Path) -> tuple[int | None, ...]:
+    """Modification times of the files ``save`` writes for *index_path*.
+
+    Changes whenever a writer saves, so callers can tell whether what they
+    derived from an earlier load is stale. Missing files count as ``None``.
+    """
+
+    path = Path(index_path)
+    generation: list[int | None] = []
+    for candidate in (path, _delta_path(path)):
+        try:
+            generation.append(candidate.stat().st_mtime_ns)
+        except FileNotFoundError:
+            generation.append(None)
+    return tuple(generation)
+
+
+def _delta_path(index_path: Path) -> Path:
+    return index_path.with_suffix(index_path.suffix + ".delta")
 
-    def __init__(self, index_path: str | Path, *, dimension: int, metric: str = "ip") -> None:
+
+class FaissVectorStore:
+    """Thin persistence wrapper around an ID-mapped FAISS index.
+
+    ``read_only`` stores memory-map the saved vector codes instead of copying
+    them into RAM (only the id map and any HNSW links are read), so query
+    processes start without reading every vector and share the OS page cache. Writers replace the file atomically in ``save``, which
+    leaves existing mappings intact. Read-only stores prefer the HNSW graph
+    written by ``save`` for large indexes, as long as it is not older than
+    the flat index.
+
+    Writes mutate the index in place, so a writable store must not be
+    searched from another thread while it is written. Query services open
+    their own read-only store and pick up saves through the atomic file swap.
+
+    ``save`` persists incrementally: vectors changed since the last
+    compaction go to ``delta_path``, and the full index is only rewritten
+    once they outgrow ``compact_ratio`` of it (or on ``compact``). Writers
+    replay the delta into memory on load; read-only stores keep it as a
+    separate in-memory index that shadows the mapped one.
+    """
+
+    def __init__(
+        self,
+        index_path: str | Path,
+        *,
+        dimension: int,
+        metric: str = "ip",
+        read_only: bool = False,
+        hnsw_min_vectors: int = HNSW_MIN_VECTORS,
+        ef_search: int = HNSW_EF_SEARCH,
+        compact_ratio: float = DELTA_COMPACT_RATIO,
+        quantize: Quantization = "none",
+    ) -> None:
         if dimension <= 0:
             raise ValueError("dimension must be positive")
         if metric not in {"ip", "l2"}:
             raise ValueError("metric must be 'ip' or 'l2'")
+        if hnsw_min_vectors <= 0:
+            raise ValueError("hnsw_min_vectors must be positive")
+        if ef_search <= 0:
+            raise ValueError("ef_search must be positive")
+        if compact_ratio < 0:
+            raise ValueError("compact_ratio cannot be negative")
+        if quantize not in {"none", "sq8"}:
+            raise ValueError("quantize must be 'none' or 'sq8'")
 
         self._index_path = Path(index_path)
         self._dimension = dimension
         self._metric = metric
+        self._read_only = read_only
+        self._hnsw_min_vectors = hnsw_min_vectors
+        self._ef_search = ef_search
+        self._compact_ratio = compact_ratio
+        self._quantize = quantize
         self._faiss = self._import_faiss()
+        self._uses_hnsw = False
+        self._write_lock = threading.Lock()
+        # Writer: latest row per id changed since the last compaction, and
+        # whether any arrived since the last save.
+        self._journal: dict[int, np.ndarray] = {}
+        self._dirty = False
+        # Reader: the delta index shadowing ids of the mapped index.
+        self._delta: Any | None = None
+        self._delta_ids = np.empty(0, dtype=np.int64)
+        self._delta_new_ids = 0
         self._index = self._load_or_create_index()
+        self._load_delta()
+        # Ids currently in the index. Flat remove_ids scans every stored
+        # vector, so it only runs for ids that are actually being replaced.
+        self._stored_ids: set[int] = (
+            set() if read_only else set(self._faiss.vector_to_array(self._index.id_map).tolist())
+        )
 
     @property
     def dimension(self) -> int:
@@ -72,15 +182,33 @@ class FaissVectorStore:
 
     @property
     def ntotal(self) -> int:
-        return int(self._index.ntotal)
+        return int(self._index.ntotal) + self._delta_new_ids
+
+    @property
+    def hnsw_path(self) -> Path:
+        return self._index_path.with_suffix(self._index_path.suffix + ".hnsw")
+
+    @property
+    def delta_path(self) -> Path:
+        return _delta_path(self._index_path)
+
+    @property
+    def read_only(self) -> bool:
+        return self._read_only
+
+    @property
+    def uses_hnsw(self) -> bool:
+        return self._uses_hnsw
 
     def add_or_replace(self, *, vector_ids: Sequence[int], vectors: np.ndarray | Sequence[Sequence[float]]) -> None:
+        self._require_writable()
         ids = np.asarray(vector_ids, dtype=np.int64)
         if ids.ndim != 1:
             raise ValueError("vector_ids must be a 1D sequence")
         if ids.size == 0:
             raise ValueError("vector_ids cannot be empty")
-        if len(set(int(value) for value in ids.tolist())) != int(ids.size):
+        id_list = ids.tolist()
+        if len(set(id_list)) != len(id_list):
             raise ValueError("vector_ids cannot contain duplicates in one operation")
 
         rows = _to_vectors_array(vectors, dimension=self._dimension)
@@ -90,21 +218,74 @@ class FaissVectorStore:
         if self._metric == "ip":
             self._faiss.normalize_L2(rows)
 
-        self._index.remove_ids(ids)
-        self._index.add_with_ids(rows, ids)
+        with self._write_lock:
+            # One remove (a single compaction pass) and one add per call,
+            # however many of the ids are replacements.
+            replaced = self._stored_ids.intersection(id_list)
+            if replaced:
+                replaced_ids = np.fromiter(replaced, dtype=np.int64, count=len(replaced))
+                self._index.remove_ids(self._faiss.IDSelectorBatch(replaced_ids))
+            self._index.add_with_ids(rows, ids)
+            self._stored_ids.update(id_list)
+            self._journal.update(zip(id_list, rows))
+            self._dirty = True
+
+    def search(
+        self,
+        query_vector: np.ndarray | Sequence[float],
+        *,
+        top_k: int = 10,
+        allowed_ids: Collection[int] | None = None,
+    ) -> list[VectorSearchHit]:
+        """Return the *top_k* nearest vectors, only among *allowed_ids* when given."""
 
-    def search(self, query_vector: np.ndarray | Sequence[float], *, top_k: int = 10) -> list[VectorSearchHit]:
         if top_k <= 0:
             raise ValueError("top_k must be positive")
-        if self.ntotal == 0:
+        index = self._index  # one snapshot for the whole call
+        if self.ntotal == 0 or (allowed_ids is not None and not allowed_ids):
             return []
 
         query = _to_query_array(query_vector, dimension=self._dimension)
         if self._metric == "ip":
             self._faiss.normalize_L2(query)
 
-        limit = min(top_k, self.ntotal)
-        scores, ids = self._index.search(query, limit)
+        allowed: Any | None = None
+        if allowed_ids is not None:
+            subset = np.fromiter(allowed_ids, dtype=np.int64, count=len(allowed_ids))
+            if subset.size <= EXACT_SUBSET_MAX:
+                return self._search_subset_exactly(index, query[0], subset, top_k=top_k)
+            allowed = self._faiss.IDSelectorBatch(subset)
+
+        if self._delta is None:
+            return self._search_index(index, query, top_k=top_k, selector=allowed, graph=self._uses_hnsw)
+
+        shadowed = self._faiss.IDSelectorNot(self._faiss.IDSelectorBatch(self._delta_ids))
+        base_selector = shadowed if allowed is None else self._faiss.IDSelectorAnd(allowed, shadowed)
+        hits = self._search_index(index, query, top_k=top_k, selector=base_selector, graph=self._uses_hnsw)
+        hits.extend(self._search_index(self._delta, query, top_k=top_k, selector=allowed, graph=False))
+        hits.sort(key=lambda hit: hit.score, reverse=self._metric == "ip")
+        return hits[:top_k]
+
+    def _search_index(
+        self,
+        index: Any,
+        query: np.ndarray,
+        *,
+        top_k: int,
+        selector: Any | None,
+        graph: bool,
+    ) -> list[VectorSearchHit]:
+        k = min(top_k, int(index.ntotal))
+        if k == 0:
+            return []
+        if selector is None:
+            scores, ids = index.search(query, k)
+        else:
+            if graph:
+                params = self._faiss.SearchParametersHNSW(sel=selector, efSearch=max(self._ef_search, k))
+            else:
+                params = self._faiss.SearchParameters(sel=selector)
+            scores, ids = index.search(query, k, params=params)
 
         hits: list[VectorSearchHit] = []
         for score, vector_id in zip(scores[0], ids[0]):
@@ -113,11 +294,112 @@ class FaissVectorStore:
             hits.append(VectorSearchHit(vector_id=int(vector_id), score=float(score)))
         return hits
 
+    def _search_subset_exactly(
+        self,
+        index: Any,
+        query: np.ndarray,
+        subset: np.ndarray,
+        *,
+        top_k: int,
+    ) -> list[VectorSearchHit]:
+        in_delta = np.isin(subset, self._delta_ids)
+        found: list[int] = []
+        vectors: list[np.ndarray] = []
+        for vector_id, shadowed in zip(subset.tolist(), in_delta.tolist()):
+            try:
+                vectors.append((self._delta if shadowed else index).reconstruct(vector_id))
+            except RuntimeError:  # id not in this index snapshot
+                continue
+            found.append(vector_id)
+        if not found:
+            return []
+
+        matrix = np.vstack(vectors)
+        if self._metric == "ip":
+            scores = matrix @ query
+            order = np.argsort(-scores, kind="stable")[:top_k]
+        else:
+            scores = np.sum((matrix - query) ** 2, axis=1)
+            order = np.argsort(scores, kind="stable")[:top_k]
+        return [VectorSearchHit(vector_id=found[row], score=float(scores[row])) for row in order]
+
     def save(self) -> None:
+        """Persist changes since the last save.
+
+        Writes only the delta file while the changed vectors stay within
+        ``compact_ratio`` of the index, so a save moves O(changes) bytes.
+        """
+
+        self._require_writable()
+        with self._write_lock:
+            index = self._index
+            if not self._index_path.exists() or len(self._journal) > self._compact_ratio * int(index.ntotal):
+                self._compact_locked(index)
+            elif self._dirty:
+                self._write_atomically(self._journal_index(), self.delta_path)
+                self._dirty = False
+
+    def compact(self) -> None:
+        """Rewrite the full index (and HNSW graph) and drop the delta file."""
+
+        self._require_writable()
+        with self._write_lock:
+            self._compact_locked(self._index)
+
+    def _compact_locked(self, index: Any) -> None:
         self._index_path.parent.mkdir(parents=True, exist_ok=True)
-        tmp_path = self._index_path.with_suffix(self._index_path.suffix + ".tmp")
-        self._faiss.write_index(self._index, str(tmp_path))
-        tmp_path.replace(self._index_path)
+        self._write_atomically(index, self._index_path)
+        # Written after the flat file so a reader never pairs a fresh flat
+        # index with an older, newer-looking graph.
+        if int(index.ntotal) >= self._hnsw_min_vectors:
+            self._write_atomically(self._build_hnsw(index), self.hnsw_path)
+        else:
+            self.hnsw_path.unlink(missing_ok=True)
+        # A delta left behind by a crash here is older than the index just
+        # written, so loads ignore it.
+        self.delta_path.unlink(missing_ok=True)
+        self._journal.clear()
+        self._dirty = False
+
+    def _journal_index(self) -> Any:
+        delta = self._empty_index()
+        ids = np.fromiter(self._journal, dtype=np.int64, count=len(self._journal))
+        # Journal rows are already L2-normalized for "ip".
+        delta.add_with_ids(np.vstack(list(self._journal.values())), ids)
+        return delta
+
+    def _write_atomically(self, index: Any, path: Path) -> None:
+        tmp_path = path.with_suffix(path.suffix + ".tmp")
+        self._faiss.write_index(index, str(tmp_path))
+        tmp_path.replace(path)
+
+    def _build_hnsw(self, flat: Any) -> Any:
+        metric = self._faiss.METRIC_INNER_PRODUCT if self._metric == "ip" else self._faiss.METRIC_L2
+        if self._quantize == "sq8":
+            graph = self._faiss.IndexHNSWSQ(self._dimension, self._faiss.ScalarQuantizer.QT_8bit, HNSW_M, metric)
+        else:
+            graph = self._faiss.IndexHNSWFlat(self._dimension, HNSW_M, metric)
+        graph.hnsw.efConstruction = HNSW_EF_CONSTRUCTION
+        index = self._faiss.IndexIDMap2(graph)
+        # Stored vectors are already L2-normalized for "ip".
+        vectors = flat.index.reconstruct_n(0, int(flat.ntotal))
+        if not index.is_trained:
+            index.train(vectors)
+        index.add_with_ids(vectors, self._faiss.vector_to_array(flat.id_map))
+        return index
+
+    def _fresh_sidecar(self, path: Path) -> Path | None:
+        """*path* if it exists and is not older than the flat index."""
+
+        try:
+            sidecar_mtime = path.stat().st_mtime_ns
+        except FileNotFoundError:
+            return None
+        return path if sidecar_mtime >= self._index_path.stat().st_mtime_ns else None
+
+    def _require_writable(self) -> None:
+        if self._read_only:
+            raise VectorStoreError(f"FAISS index '{self._index_path}' is opened read-only")
 
     def _import_faiss(self) -> Any:
         try:
@@ -129,7 +411,14 @@ class FaissVectorStore:
     def _load_or_create_index(self) -> Any:
         if self._index_path.exists():
             try:
-                index = self._faiss.read_index(str(self._index_path))
+                if self._read_only:
+                    graph_path = self._fresh_sidecar(self.hnsw_path)
+                    index = self._read_mapped(graph_path or self._index_path)
+                    if graph_path is not None:
+                        self._faiss.downcast_index(index.index).hnsw.efSearch = self._ef_search
+                        self._uses_hnsw = True
+                else:
+                    index = self._faiss.read_index(str(self._index_path))
             except Exception as exc:
                 raise VectorStoreError(f"Failed to load FAISS index '{self._index_path}': {exc}") from exc
             if int(index.d) != self._dimension:
@@ -138,5 +427,53 @@ class FaissVectorStore:
                 )
             return index
 
+        return self._empty_index()
+
+    def _read_mapped(self, path: Path) -> Any:
+        """Memory-map *path*, or read it into RAM if its index type cannot be mapped.
+
+        ``IO_FLAG_MMAP_IFC`` is the flag that maps the stored codes of flat
+        and HNSW indexes; plain ``IO_FLAG_MMAP`` still copies them to the heap.
+        """
+
+        try:
+            return self._faiss.read_index(str(path), self._faiss.IO_FLAG_MMAP_IFC | self._faiss.IO_FLAG_READ_ONLY)
+        except Exception as exc:
+            logger.warning("Cannot memory-map FAISS index '%s', reading it into RAM instead: %s", path, exc)
+            return self._faiss.read_index(str(path))
+
+    def _load_delta(self) -> None:
+        if not self._index_path.exists():
+            return
+        delta_path = self._fresh_sidecar(self.delta_path)
+        if delta_path is None:
+            return
+        try:
+            delta = self._faiss.read_index(str(delta_path))
+        except Exception as exc:
+            raise VectorStoreError(f"Failed to load FAISS delta '{delta_path}': {exc}") from exc
+        if int(delta.d) != self._dimension:
+            raise VectorStoreError(
+                f"FAISS delta dimension mismatch at '{delta_path}': expected {self._dimension}, got {delta.d}"
+            )
+
+        ids = self._faiss.vector_to_array(delta.id_map).astype(np.int64)
+        if ids.size == 0:
+            return
+        base_ids = self._faiss.vector_to_array(self._index.id_map)
+        if self._read_only:
+            self._delta = delta
+            self._delta_ids = ids
+            self._delta_new_ids = int(np.count_nonzero(~np.isin(ids, base_ids)))
+            return
+
+        rows = delta.index.reconstruct_n(0, int(delta.ntotal))
+        replaced = ids[np.isin(ids, base_ids)]
+        if replaced.size:
+            self._index.remove_ids(self._faiss.IDSelectorBatch(replaced))
+        self._index.add_with_ids(rows, ids)
+        self._journal = {vector_id: row for vector_id, row in zip(ids.tolist(), rows)}
+
+    def _empty_index(self) -> Any:
         base = self._faiss.IndexFlatIP(self._dimension) if self._metric == "ip" else self._faiss.IndexFlatL2(self._dimension)
         return self._faiss.IndexIDMap2(base)
@@ -9,7 +9,8 @@ from functools import lru_cache
 from pathlib import Path
 
 _THESAURUS_PATH = Path(__file__).parent / "thesaurus.json"
-_WORD_RE = re.compile(r"\b\w+\b", re.UNICODE)
+# Greedy \w+ already ends on word boundaries; explicit \b only adds checks.
+_WORD_RE = re.compile(r"\w+", re.UNICODE)
 
 
 @dataclass(slots=True)
@@ -24,6 +25,37 @@ def _load_thesaurus() -> dict:
     return json.loads(_THESAURUS_PATH.read_text(encoding="utf-8"))
 
 
+@dataclass(frozen=True, slots=True)
+class _KeywordIndex:
+    names: dict[int, str]
+    # Lowercased keyword -> ids of the categories listing it, once per listing.
+    categories_by_keyword: dict[str, tuple[int, ...]]
+    # Category position in the thesaurus; breaks score ties deterministically.
+    rank: dict[int, int]
+
+
+@lru_cache(maxsize=1)
+def _keyword_index() -> _KeywordIndex:
+    """Invert the thesaurus once so scoring walks the text's words, not every keyword."""
+
+    thesaurus = _load_thesaurus()
+    names = {int(c["id"]): c["name"] for c in thesaurus["categories"]}
+    categories_by_keyword: dict[str, list[int]] = {}
+    rank: dict[int, int] = {}
+    for position, (raw_id, keywords) in enumerate(thesaurus["keywords"].items()):
+        cat_id = int(raw_id)
+        if cat_id not in names:
+            continue
+        rank[cat_id] = position
+        for keyword in keywords:
+            categories_by_keyword.setdefault(keyword.lower(), []).append(cat_id)
+    return _KeywordIndex(
+        names=names,
+        categories_by_keyword={keyword: tuple(ids) for keyword, ids in categories_by_keyword.items()},
+        rank=rank,
+    )
+
+
 def classify_text(
     text: str,
     *,
@@ -47,28 +79,20 @@ def classify_text(
     if not text or not text.strip():
         return []
 
-    thesaurus = _load_thesaurus()
-    cats_by_id: dict[int, dict] = {c["id"]: c for c in thesaurus["categories"]}
-    kw_by_cat: dict[int, list[str]] = {
-        int(k): v for k, v in thesaurus["keywords"].items()
-    }
-
-    words = {w.lower() for w in _WORD_RE.findall(text)}
+    index = _keyword_index()
+    # Deduplicate before lowercasing: books repeat words far more than they add new ones.
+    words = {w.lower() for w in set(_WORD_RE.findall(text))}
     total = max(len(words), 1)
 
-    scores: dict[int, float] = {}
-    for cat_id, keywords in kw_by_cat.items():
-        matched = sum(1 for kw in keywords if kw.lower() in words)
-        if matched > 0:
-            scores[cat_id] = matched / total
+    matched: dict[int, int] = {}
+    for word in words:
+        for cat_id in index.categories_by_keyword.get(word, ()):
+            matched[cat_id] = matched.get(cat_id, 0) + 1
 
+    ranked = sorted(matched.items(), key=lambda item: (-item[1], index.rank[item[0]]))
     results = [
-        CategoryMatch(
-            category_id=cat_id,
-            name=cats_by_id[cat_id]["name"],
-            score=score,
-        )
-        for cat_id, score in sorted(scores.items(), key=lambda x: -x[1])
-        if score >= min_score and cat_id in cats_by_id
+        CategoryMatch(category_id=cat_id, name=index.names[cat_id], score=count / total)
+        for cat_id, count in ranked
+        if count / total >= min_score
     ]
     return results[:top_n]
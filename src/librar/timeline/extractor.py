@@ -1,17 +1,18 @@
 """Temporal expression extraction from text (primarily Russian-language).
 
-Patterns are applied in priority order — ranges first, then single years,
-decades, centuries.  Overlapping matches are deduplicated via covered-span
-tracking.
+Ranges, decades, single years and Roman-numeral centuries are found in
+one scan of a combined pattern whose alternation order encodes their
+priority.
 """
 
 from __future__ import annotations
 
 import re
 from dataclasses import dataclass
+from functools import lru_cache
 
 
-@dataclass(slots=True)
+@dataclass(frozen=True, slots=True)
 class TemporalSpan:
     """Extracted temporal reference normalized to a year range."""
 
@@ -28,26 +29,52 @@ class TemporalSpan:
 # Pattern library
 # ---------------------------------------------------------------------------
 
-# Year range: "1914–1918", "1917-1922"
-_YEAR_RANGE_RE = re.compile(
-    r"\b(1[0-9]{3}|20[0-2][0-9])[\s]*[-–—][\s]*(1[0-9]{3}|20[0-2][0-9])\b"
+# Years 1000-2029, the only four-digit numbers taken as years ("42", "7"
+# and "3000" are not). Kept in the pattern rather than checked with int():
+# a rejected candidate would cost a Python round trip per number, and a
+# rejected range would swallow the year after it.
+_YEAR = r"(?:1[0-9]{3}|20[0-2][0-9])"
+
+# Every temporal expression in one alternation, in priority order: year
+# ranges ("1914–1918"), full decades ("1840-е годы", "1840-х годах",
+# "1840-ых"), single years ("в 1917 году") and Roman-numeral centuries
+# ("XIX век", "XVIII–XIX вв.", "XX столетие"). At any position a range
+# beats a decade, which beats a bare year, so "1840" in "1840-е" is never
+# taken as a plain year. Centuries contain no digits, so they cannot
+# overlap the numeric kinds. One left-to-right pass finds every span
+# without overlaps.
+#
+# Possessive quantifiers and atomic numerals mark the places where giving
+# characters back can never produce a match (whitespace before a dash or a
+# Cyrillic suffix; a shorter numeral leaves a numeral letter next), so a
+# failed attempt ends without backtracking. Quantifiers that can give back
+# whitespace to a following one stay greedy.
+_NUMERIC_BRANCHES = (
+    r"(?P<range_from>" + _YEAR + r")[\s]*+[-–—][\s]*+(?P<range_to>" + _YEAR + r")\b"
+    r"|(?P<decade>1[0-9]{2}0)[-–]?(?i:(?:ы[ех]|[ех])(?:[\s\-]++год(?:ы|а|ов|ах|ам)?)?)\b"
+    r"|(?P<year>" + _YEAR + r")\b"
 )
-
-# Four-digit year: "в 1917 году", "после 1825"
-_YEAR_RE = re.compile(r"\b(1[0-9]{3}|20[0-2][0-9])\b")
-
-# Full decade: "1840-е годы", "1840-х годах", "в 1840-е"
-_DECADE_FULL_RE = re.compile(
-    r"\b(1[0-9]{2}0)[-–]?е(?:[\s\-]+год[аы]?)?\b", re.IGNORECASE
-)
-
-# Roman numeral centuries: "XIX век", "XVIII–XIX вв.", "XX столетие"
-_ROMAN_CENTURY_RE = re.compile(
-    r"\b(X{0,3}(?:IX|IV|V?I{0,3}))"
-    r"(?:[\s]*[-–—][\s]*(X{0,3}(?:IX|IV|V?I{0,3})))?"
-    r"[\s]+(?:вв?\.?|в(?:ек[а-яё]{0,4}|\.)|столетии?)\b",
-    re.IGNORECASE,
+_CENTURY_BRANCH = (
+    r"(?i:(?=[IVX]|[\s]*+[-–—])(?P<century_from>(?>X{0,3}(?:IX|IV|V?I{0,3})))"
+    r"(?:[\s]*+[-–—][\s]*(?P<century_to>(?>X{0,3}(?:IX|IV|V?I{0,3}))))?"
+    r"[\s]++(?:вв?\.?|в(?:ек[а-яё]{0,4}|\.)|столетии?)\b)"
 )
+# Each pattern opens with a lookahead for the characters a match can start
+# with. Checking one character class is cheaper than the Unicode word
+# lookups \b makes on both sides, and it rejects nearly every position in
+# Cyrillic text before \b is evaluated.
+_TEMPORAL_RE = re.compile(r"(?=[12IVXivxİı\s\-–—])\b(?:" + _NUMERIC_BRANCHES + "|" + _CENTURY_BRANCH + ")")
+
+# Without a Latin I/V/X the century branch can only match an empty numeral,
+# which yields no span, so such texts are scanned without it.
+_NUMERIC_RE = re.compile(r"(?=[12])\b(?:" + _NUMERIC_BRANCHES + ")")
+# Spelled out rather than re.IGNORECASE, which scans over twice as slowly;
+# "İ" and "ı" are the letters IGNORECASE also folds to "I".
+_ROMAN_NUMERAL_CHAR_RE = re.compile(r"[IVXivxİı]")
+
+# Every span needs an ASCII digit or a Roman numeral letter; under
+# re.IGNORECASE "İ" and "ı" also match "I".
+_TRIGGER_CHAR_RE = re.compile(r"[0-9IVXivxİı]")
 
 # Approximate markers in Russian
 _APPROX_WORDS_RE = re.compile(
@@ -55,23 +82,31 @@ _APPROX_WORDS_RE = re.compile(
     re.IGNORECASE,
 )
 
-_ROMAN_VALUES = {
-    "I": 1, "V": 5, "X": 10, "L": 50, "C": 100, "D": 500, "M": 1000,
+# Substrings of which every approximate marker contains one; a text
+# without any of them cannot have a marker in any match's context window.
+# Plain substring tests on the casefolded text are several times faster
+# than a case-insensitive regex alternation, and casefold() covers every
+# character re.IGNORECASE treats as equal to a Cyrillic letter here
+# (lower() misses "ᲂ", "ᲃ", "ᲄ" and "ᲅ").
+_APPROX_HINTS = ("ок", "примерно", "приблизительно", "кон.", "нач.", "сер.")
+
+# Every numeral _TEMPORAL_RE can capture (I..XXXIX), mapped to its value.
+_ROMAN_NUMERALS: dict[str, int] = {
+    tens + ones: 10 * tens_value + ones_value
+    for tens_value, tens in enumerate(("", "X", "XX", "XXX"))
+    for ones_value, ones in enumerate(("", "I", "II", "III", "IV", "V", "VI", "VII", "VIII", "IX"))
+    if tens or ones
 }
 
 
-def _roman_to_int(roman: str) -> int:
-    roman = roman.upper().strip()
-    total = 0
-    prev = 0
-    for ch in reversed(roman):
-        val = _ROMAN_VALUES.get(ch, 0)
-        if val < prev:
-            total -= val
-        else:
-            total += val
-        prev = val
-    return total
+# Texts whose spans stay memoized; each entry holds the text and its spans.
+_SPAN_CACHE_SIZE = 4096
+
+# Confidence per span kind; the CLI filters spans with --min-confidence.
+_RANGE_CONFIDENCE = 0.95
+_YEAR_CONFIDENCE = 0.9
+_DECADE_CONFIDENCE = 0.7
+_CENTURY_CONFIDENCE = 0.6
 
 
 def _century_to_year_range(century: int) -> tuple[int, int]:
@@ -85,103 +120,101 @@ def _has_approx_context(text: str, match_start: int, *, window: int = 30) -> boo
     return bool(_APPROX_WORDS_RE.search(context))
 
 
-def _is_covered(start: int, end: int, covered: set[tuple[int, int]]) -> bool:
-    for cs, ce in covered:
-        if start < ce and end > cs:
-            return True
-    return False
-
-
 def extract_temporal_spans(text: str) -> list[TemporalSpan]:
     """Extract all temporal references from *text* and return normalized spans.
 
-    Patterns are applied in priority order: ranges first, then single
-    years, decades, centuries.  Overlapping positions are skipped.
+    Spans are returned in priority order: ranges first, then decades,
+    single years, centuries.  Overlapping positions are skipped.  Results
+    are memoized per text, so repeated chunks share the same frozen spans.
     """
-    spans: list[TemporalSpan] = []
-    covered: set[tuple[int, int]] = set()
-
-    # 1. Year ranges (highest confidence)
-    for m in _YEAR_RANGE_RE.finditer(text):
-        if _is_covered(m.start(), m.end(), covered):
-            continue
-        y1, y2 = int(m.group(1)), int(m.group(2))
-        if y1 > y2:
-            y1, y2 = y2, y1
-        spans.append(
-            TemporalSpan(
-                year_from=y1,
-                year_to=y2,
-                decade=None,
-                century=None,
-                source_fragment=m.group(0),
-                is_approximate=_has_approx_context(text, m.start()),
-                confidence=0.95,
+    if not _TRIGGER_CHAR_RE.search(text):
+        return []
+    return list(_extract_spans(text))
+
+
+@lru_cache(maxsize=_SPAN_CACHE_SIZE)
+def _extract_spans(text: str) -> tuple[TemporalSpan, ...]:
+    ranges: list[TemporalSpan] = []
+    decades: list[TemporalSpan] = []
+    years: list[TemporalSpan] = []
+    centuries: list[TemporalSpan] = []
+    folded = text.casefold()
+    maybe_approx = any(hint in folded for hint in _APPROX_HINTS)
+
+    pattern = _TEMPORAL_RE if _ROMAN_NUMERAL_CHAR_RE.search(text) else _NUMERIC_RE
+    # The last group a match closes names its kind ("century_to" or
+    # "century_from" for centuries), so one lookup dispatches each match.
+    for m in pattern.finditer(text):
+        kind = m.lastgroup
+        if kind == "year":
+            # A year match is exactly its group; parse the fragment itself.
+            fragment = m.group()
+            year = int(fragment)
+            years.append(
+                TemporalSpan(
+                    year_from=year,
+                    year_to=year,
+                    decade=None,
+                    century=None,
+                    source_fragment=fragment,
+                    is_approximate=maybe_approx and _has_approx_context(text, m.start()),
+                    confidence=_YEAR_CONFIDENCE,
+                )
             )
-        )
-        covered.add((m.start(), m.end()))
-
-    # 2. Full decades: "1840-е годы" — must run before single years so that
-    #    "1840" in "1840-е" is not consumed as a plain year first.
-    for m in _DECADE_FULL_RE.finditer(text):
-        if _is_covered(m.start(), m.end(), covered):
-            continue
-        decade_start = int(m.group(1))
-        spans.append(
-            TemporalSpan(
-                year_from=decade_start,
-                year_to=decade_start + 9,
-                decade=decade_start,
-                century=None,
-                source_fragment=m.group(0),
-                is_approximate=True,
-                confidence=0.7,
+        elif kind == "range_to":
+            y1, y2 = int(m.group("range_from")), int(m.group(kind))
+            if y1 > y2:
+                y1, y2 = y2, y1
+            ranges.append(
+                TemporalSpan(
+                    year_from=y1,
+                    year_to=y2,
+                    decade=None,
+                    century=None,
+                    source_fragment=m.group(),
+                    is_approximate=maybe_approx and _has_approx_context(text, m.start()),
+                    confidence=_RANGE_CONFIDENCE,
+                )
             )
-        )
-        covered.add((m.start(), m.end()))
-
-    # 3. Single years
-    for m in _YEAR_RE.finditer(text):
-        if _is_covered(m.start(), m.end(), covered):
-            continue
-        year = int(m.group(1))
-        spans.append(
-            TemporalSpan(
-                year_from=year,
-                year_to=year,
-                decade=None,
-                century=None,
-                source_fragment=m.group(0),
-                is_approximate=_has_approx_context(text, m.start()),
-                confidence=0.9,
+        elif kind == "decade":
+            decade_start = int(m.group(kind))
+            decades.append(
+                TemporalSpan(
+                    year_from=decade_start,
+                    year_to=decade_start + 9,
+                    decade=decade_start,
+                    century=None,
+                    source_fragment=m.group(),
+                    is_approximate=True,
+                    confidence=_DECADE_CONFIDENCE,
+                )
             )
-        )
-        covered.add((m.start(), m.end()))
-
-    # 4. Roman numeral centuries
-    for m in _ROMAN_CENTURY_RE.finditer(text):
-        if _is_covered(m.start(), m.end(), covered):
-            continue
-        century_from = _roman_to_int(m.group(1))
-        if century_from == 0:
-            continue
-        century_to_str = m.group(2)
-        century_to = _roman_to_int(century_to_str) if century_to_str else century_from
-
-        y_from, _ = _century_to_year_range(century_from)
-        _, y_to = _century_to_year_range(century_to)
-
-        spans.append(
-            TemporalSpan(
-                year_from=y_from,
-                year_to=y_to,
-                decade=None,
-                century=century_from,
-                source_fragment=m.group(0),
-                is_approximate=True,
-                confidence=0.6,
+        else:
+            # The numeral may match empty before a "–XIX в." tail; such
+            # matches carry no century but still consume the tail. Test
+            # the span so they are dropped before any string is built.
+            numeral_start, numeral_end = m.span("century_from")
+            if numeral_start == numeral_end:
+                continue
+            # A dotted "İ" matches "I" but does not uppercase to it.
+            century_from = _ROMAN_NUMERALS.get(text[numeral_start:numeral_end].upper())
+            if century_from is None:
+                continue
+            century_to = _ROMAN_NUMERALS.get((m.group("century_to") or "").upper(), century_from)
+
+            y_from, _ = _century_to_year_range(century_from)
+            _, y_to = _century_to_year_range(century_to)
+
+            centuries.append(
+                TemporalSpan(
+                    year_from=y_from,
+                    year_to=y_to,
+                    decade=None,
+                    century=century_from,
+                    source_fragment=m.group(),
+                    is_approximate=True,
+                    confidence=_CENTURY_CONFIDENCE,
+                )
             )
-        )
-        covered.add((m.start(), m.end()))
 
-    return spans
+    return (*ranges, *decades, *years, *centuries)
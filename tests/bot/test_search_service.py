@@ -2,10 +2,19 @@ from __future__ import annotations
 
 import asyncio
 import json
+import threading
 from types import SimpleNamespace
 from typing import Any
 
-from librar.bot.search_service import INSUFFICIENT_DATA_ANSWER, SearchResult, answer_question, search_hybrid_cli
+from librar.bot.search_service import (
+    INSUFFICIENT_DATA_ANSWER,
+    SearchResult,
+    answer_question,
+    search_hybrid_cli,
+    warm_up_semantic_search,
+)
+from librar.semantic import query as semantic_query
+from librar.semantic.config import SemanticSettings
 
 
 class _DummyProc:
@@ -361,3 +370,38 @@ def test_answer_question_builds_diverse_context_for_llm(monkeypatch) -> None:
     assert "source_path=books/a.pdf" in prompt
     assert "source_path=books/b.pdf" in prompt
     assert prompt.count("source_path=books/a.pdf") <= 1
+
+
+def test_warm_up_semantic_search_creates_the_shared_embedder_once(monkeypatch) -> None:
+    warmups: list[str] = []
+    warmed = threading.Event()
+
+    class _Embedder:
+        def __init__(self, settings: SemanticSettings) -> None:
+            self.model = settings.model
+
+        def embed_query(self, query: str) -> list[float]:
+            warmups.append(query)
+            warmed.set()
+            return [1.0]
+
+    monkeypatch.setattr(semantic_query, "OpenRouterEmbedder", _Embedder)
+    monkeypatch.setenv("OPENROUTER_API_KEY", "test-key")
+    monkeypatch.setenv("OPENROUTER_EMBEDDING_MODEL", "test-model")
+    monkeypatch.setenv("SEMANTIC_WARMUP", "1")
+
+    warm_up_semantic_search()
+    assert warmed.wait(timeout=5.0)
+    embedder = semantic_query.shared_embedder(SemanticSettings.from_env())
+
+    assert isinstance(embedder, _Embedder)
+    assert warmups == ["warmup"]
+
+
+def test_warm_up_semantic_search_skips_missing_configuration(monkeypatch) -> None:
+    monkeypatch.delenv("OPENROUTER_API_KEY", raising=False)
+    monkeypatch.setenv("SEMANTIC_WARMUP", "1")
+
+    warm_up_semantic_search()
+
+    assert semantic_query._embedders == {}
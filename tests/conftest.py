@@ -1,10 +1,47 @@
 from __future__ import annotations
 
+from collections.abc import Iterator
+import sqlite3
 import sys
 from pathlib import Path
 
+import pytest
+
 ROOT = Path(__file__).resolve().parents[1]
 SRC = ROOT / "src"
 
 if str(SRC) not in sys.path:
     sys.path.insert(0, str(SRC))
+
+from librar.search.repository import SearchRepository  # noqa: E402
+from librar.search.schema import ensure_schema  # noqa: E402
+from librar.semantic import query as semantic_query  # noqa: E402
+
+
+@pytest.fixture(autouse=True)
+def _clear_semantic_caches() -> Iterator[None]:
+    """Keep the process-wide semantic query caches from leaking between tests."""
+    yield
+    semantic_query._embedding_cache.clear()
+    semantic_query._query_caches.clear()
+    semantic_query._embedders.clear()
+
+
+@pytest.fixture(scope="session")
+def schema_template() -> Iterator[sqlite3.Connection]:
+    """In-memory database holding the full search schema, built once per session."""
+    connection = sqlite3.connect(":memory:")
+    ensure_schema(connection)
+    yield connection
+    connection.close()
+
+
+@pytest.fixture
+def search_repo(schema_template: sqlite3.Connection) -> Iterator[SearchRepository]:
+    """Fresh repository cloned from the schema template via the backup API."""
+    connection = sqlite3.connect(":memory:")
+    schema_template.backup(connection)
+    with SearchRepository.from_connection(connection) as repo:
+        # Test data is throwaway: skip fsyncs.
+        repo.connection.execute("PRAGMA synchronous=OFF;")
+        yield repo
@@ -56,73 +56,71 @@ def _seed(repo: SearchRepository, source_path: str, *, author: str, format_name:
     return int(row["chunk_id"])
 
 
-def test_text_and_semantic_filters_align(tmp_path: Path) -> None:
-    db_path = tmp_path / "hybrid.db"
+def test_text_and_semantic_filters_align(tmp_path: Path, search_repo: SearchRepository) -> None:
     index_path = tmp_path / "hybrid.faiss"
 
-    with SearchRepository(db_path) as repo:
-        keep_id = _seed(
-            repo,
-            "keep.fb2",
-            author="Nisargadatta Maharaj",
-            format_name="fb2",
-            text="книга о духовной практике и внимании",
-        )
-        skip_id = _seed(
-            repo,
-            "skip.txt",
-            author="Another Author",
-            format_name="txt",
-            text="книга о духовной практике и внимании",
-        )
-
-        text_hits = search_chunks(
-            repo.connection,
-            query="книга",
-            author_filter="mahar",
-            format_filter="fb2",
-            limit=10,
-        )
-
-        semantic_repo = SemanticRepository(repo.connection)
-        semantic_repo.upsert_index_state(
-            model="test-semantic-model",
-            dimension=3,
-            metric="ip",
-            index_path=str(index_path),
-        )
-        semantic_repo.upsert_chunk_state(
-            chunk_id=keep_id,
-            vector_id=keep_id,
-            model="test-semantic-model",
-            fingerprint="keep",
-        )
-        semantic_repo.upsert_chunk_state(
-            chunk_id=skip_id,
-            vector_id=skip_id,
-            model="test-semantic-model",
-            fingerprint="skip",
-        )
-
-        vector_store = FaissVectorStore(index_path, dimension=3, metric="ip")
-        vector_store.add_or_replace(
-            vector_ids=[keep_id, skip_id],
-            vectors=[[1.0, 0.0, 0.0], [0.8, 0.2, 0.0]],
-        )
-        vector_store.save()
-
-        semantic_service = SemanticQueryService(
-            search_repository=repo,
-            semantic_repository=semantic_repo,
-            vector_store=vector_store,
-            embedder=_FixedEmbedder([1.0, 0.0, 0.0]),
-        )
-        semantic_hits = semantic_service.search(
-            query="spiritual growth",
-            author_filter="mahar",
-            format_filter="fb2",
-            limit=10,
-        )
+    keep_id = _seed(
+        search_repo,
+        "keep.fb2",
+        author="Nisargadatta Maharaj",
+        format_name="fb2",
+        text="книга о духовной практике и внимании",
+    )
+    skip_id = _seed(
+        search_repo,
+        "skip.txt",
+        author="Another Author",
+        format_name="txt",
+        text="книга о духовной практике и внимании",
+    )
+
+    text_hits = search_chunks(
+        search_repo.connection,
+        query="книга",
+        author_filter="mahar",
+        format_filter="fb2",
+        limit=10,
+    )
+
+    semantic_repo = SemanticRepository(search_repo.connection)
+    semantic_repo.upsert_index_state(
+        model="test-semantic-model",
+        dimension=3,
+        metric="ip",
+        index_path=str(index_path),
+    )
+    semantic_repo.upsert_chunk_state(
+        chunk_id=keep_id,
+        vector_id=keep_id,
+        model="test-semantic-model",
+        fingerprint="keep",
+    )
+    semantic_repo.upsert_chunk_state(
+        chunk_id=skip_id,
+        vector_id=skip_id,
+        model="test-semantic-model",
+        fingerprint="skip",
+    )
+
+    vector_store = FaissVectorStore(index_path, dimension=3, metric="ip")
+    vector_store.add_or_replace(
+        vector_ids=[keep_id, skip_id],
+        vectors=[[1.0, 0.0, 0.0], [0.8, 0.2, 0.0]],
+    )
+    vector_store.save()
+
+    semantic_service = SemanticQueryService(
+        search_repository=search_repo,
+        semantic_repository=semantic_repo,
+        vector_store=vector_store,
+        embedder=_FixedEmbedder([1.0, 0.0, 0.0]),
+    )
+    semantic_hits = semantic_service.search(
+        query="spiritual growth",
+        author_filter="mahar",
+        format_filter="fb2",
+        limit=10,
+    )
 
     assert len(text_hits) == 1
     assert text_hits[0].source_path == "keep.fb2"
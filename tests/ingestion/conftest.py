@@ -0,0 +1,14 @@
+from __future__ import annotations
+
+import pytest
+
+
+@pytest.fixture(scope="session", autouse=True)
+def _warm_pymupdf() -> None:
+    """Load pymupdf and its base-14 font data once per session (or xdist worker)."""
+    import pymupdf
+
+    with pymupdf.open() as doc:
+        page = doc.new_page()
+        page.insert_text((72, 72), "warm-up")
+        page.get_text("blocks")
@@ -89,6 +89,17 @@ def test_text_page_returns_embedded_status() -> None:
     assert result.text.strip()
 
 
+def test_shared_textpage_yields_same_embedded_text() -> None:
+    ocr = _reload_ocr()
+    doc, page = _text_page()
+    textpage = page.get_textpage(flags=pymupdf.TEXTFLAGS_BLOCKS)
+    shared = ocr.extract_page_text(page, page_index=1, textpage=textpage)
+    fresh = ocr.extract_page_text(page, page_index=1)
+    doc.close()
+    assert shared.status == ocr.OcrStatus.EMBEDDED
+    assert shared.text == fresh.text
+
+
 # ---------------------------------------------------------------------------
 # TesseractNotFoundError detection
 # ---------------------------------------------------------------------------
@@ -1,36 +1,18 @@
 from __future__ import annotations
 
 from pathlib import Path
-
-import pymupdf
+import shutil
 
 from librar.ingestion.adapters.pdf_adapter import PDFAdapter
 
-
-def _build_pdf(path: Path, *, title: str | None, author: str | None) -> None:
-    doc = pymupdf.open()
-    page_one = doc.new_page()
-    page_one.insert_text((72, 72), "First paragraph on page one.")
-    page_one.insert_text((72, 120), "Second paragraph on page one.")
-
-    page_two = doc.new_page()
-    page_two.insert_text((72, 72), "Opening paragraph on page two.")
-
-    metadata = {}
-    if title:
-        metadata["title"] = title
-    if author:
-        metadata["author"] = author
-    if metadata:
-        doc.set_metadata(metadata)
-
-    doc.save(str(path))
-    doc.close()
+# Two-page PDFs (two paragraphs on page one, one on page two) generated once
+# with pymupdf; titled.pdf carries title="Collected Works", author="Jane Doe".
+FIXTURE_DIR = Path(__file__).parent / "fixtures"
 
 
 def test_pdf_adapter_extracts_ordered_page_blocks_and_metadata(tmp_path: Path) -> None:
     pdf_path = tmp_path / "sample.pdf"
-    _build_pdf(pdf_path, title="Collected Works", author="Jane Doe")
+    shutil.copyfile(FIXTURE_DIR / "titled.pdf", pdf_path)
 
     adapter = PDFAdapter()
     document = adapter.extract(pdf_path)
@@ -54,7 +36,7 @@ def test_pdf_adapter_extracts_ordered_page_blocks_and_metadata(tmp_path: Path) -
 
 def test_pdf_adapter_falls_back_to_filename_for_missing_title(tmp_path: Path) -> None:
     pdf_path = tmp_path / "my-awesome_book.pdf"
-    _build_pdf(pdf_path, title=None, author=None)
+    shutil.copyfile(FIXTURE_DIR / "untitled.pdf", pdf_path)
 
     document = PDFAdapter().extract(pdf_path)
 
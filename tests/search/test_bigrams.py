@@ -0,0 +1,85 @@
+from __future__ import annotations
+
+from librar.search.bigrams import build_bigram_match, lemma_bigrams
+from librar.search.query import _bigram_phrase_expression, search_chunks
+from librar.search.repository import ChunkRow, SearchRepository
+
+
+def _insert_book(repo: SearchRepository, source_path: str, text: str, lemma_text: str) -> int:
+    return repo.replace_book_chunks(
+        source_path=source_path,
+        title=source_path,
+        author="tester",
+        format_name="txt",
+        fingerprint=f"fp-{source_path}",
+        mtime_ns=1,
+        chunks=[
+            ChunkRow(
+                chunk_no=0,
+                raw_text=text,
+                lemma_text=lemma_text,
+                page=1,
+                chapter=None,
+                item_id=None,
+                char_start=0,
+                char_end=len(text),
+            )
+        ],
+    )
+
+
+def _bigram_rows(repo: SearchRepository) -> dict[int, str]:
+    rows = repo.connection.execute("SELECT rowid, bigrams FROM chunks_bigram_fts").fetchall()
+    return {int(row["rowid"]): row["bigrams"] for row in rows}
+
+
+def test_lemma_bigrams_keep_pairs_touching_frequent_lemmas() -> None:
+    frequent = frozenset({"книга"})
+
+    assert lemma_bigrams(["туманный", "книга", "о", "море"], frequent) == ["туманный_книга", "книга_о"]
+    assert build_bigram_match(["туманный", "книга"], frequent) == '"туманный_книга"'
+    assert build_bigram_match(["туманный", "море"], frequent) == ""
+
+
+def test_bigram_index_stays_empty_until_refreshed(search_repo: SearchRepository) -> None:
+    _insert_book(search_repo, "a.txt", "Туманная книга", "туманный книга")
+    assert _bigram_rows(search_repo) == {}
+
+    search_repo.run_maintenance("bigrams")
+    assert list(_bigram_rows(search_repo).values()) == ["туманный_книга"]
+
+    # Later writes index bigrams incrementally; deleting chunks drops them.
+    _insert_book(search_repo, "b.txt", "Книга тумана", "книга туман")
+    assert len(_bigram_rows(search_repo)) == 2
+    search_repo.connection.execute("DELETE FROM books WHERE source_path = 'b.txt'")
+    assert list(_bigram_rows(search_repo).values()) == ["туманный_книга"]
+
+
+def test_phrase_search_via_bigrams_matches_plain_phrase_search(search_repo: SearchRepository) -> None:
+    # Nominative nouns: lemma and surface form coincide.
+    _insert_book(search_repo, "phrase.txt", "История революция в книге", "история революция в книга")
+    _insert_book(search_repo, "split.txt", "Революция и история", "революция и история")
+    _insert_book(search_repo, "other.txt", "Другая история", "другой история")
+    search_repo.run_maintenance("bigrams")
+    assert _bigram_phrase_expression(search_repo.connection, "история революция") == '"история_революция"'
+
+    plain = search_chunks(search_repo.connection, query="история революция", phrase_mode=True, use_bigrams=False)
+    via_bigrams = search_chunks(search_repo.connection, query="история революция", phrase_mode=True)
+
+    assert [hit.source_path for hit in plain] == ["phrase.txt"]
+    assert [hit.source_path for hit in via_bigrams] == ["phrase.txt"]
+    assert "«" in via_bigrams[0].excerpt
+
+
+def test_bigram_phrase_search_keeps_chunks_matched_only_by_the_raw_phrase(search_repo: SearchRepository) -> None:
+    # The indexed lemmas ("book") differ from the query's lemmatized form
+    # ("books"), so only the raw_text phrase branch matches this chunk.
+    _insert_book(search_repo, "old.txt", "Old books here", "old book here")
+    search_repo.run_maintenance("bigrams")
+    assert _bigram_phrase_expression(search_repo.connection, "old books")
+
+    plain = search_chunks(search_repo.connection, query="old books", phrase_mode=True, use_bigrams=False)
+    via_bigrams = search_chunks(search_repo.connection, query="old books", phrase_mode=True)
+
+    assert [hit.chunk_id for hit in via_bigrams] == [hit.chunk_id for hit in plain] == [1]
+    assert via_bigrams[0].rank == plain[0].rank
@@ -1,10 +1,21 @@
 from __future__ import annotations
 
 import json
+import os
 from pathlib import Path
+import threading
+import time
+
+import pytest
 
 from librar.cli.index_books import main as index_cli_main
-from librar.search.indexer import SearchIndexer
+from librar.search.indexer import SearchIndexer, _collect_inputs
+from librar.search.schema import (
+    PRAGMA_INDEXING_CACHE_SIZE_KIB,
+    fts_sync_suspended,
+    has_planner_stats,
+    suspend_fts_sync,
+)
 
 
 def _write_txt(path: Path, *, title: str, body: str) -> None:
@@ -17,8 +28,7 @@ def test_first_run_indexes_all_books(tmp_path: Path) -> None:
     _write_txt(books_dir / "a.txt", title="A", body="Книги и книга в одном тексте.")
     _write_txt(books_dir / "b.txt", title="B", body="Другая книга и еще текст.")
 
-    db_path = tmp_path / "search.db"
-    with SearchIndexer.from_db_path(db_path) as indexer:
+    with SearchIndexer.from_db_path(":memory:") as indexer:
         stats = indexer.index_books(books_dir)
 
         assert stats.scanned == 2
@@ -26,11 +36,10 @@ def test_first_run_indexes_all_books(tmp_path: Path) -> None:
         assert stats.skipped_unchanged == 0
         assert stats.errors == 0
 
-        row = indexer._repository.connection.execute(
-            "SELECT COUNT(*) AS c FROM chunks WHERE lemma_text != ''"
-        ).fetchone()
-        assert row is not None
-        assert int(row["c"]) > 0
+        rows = indexer._repository.connection.execute("SELECT chunk_count FROM books").fetchall()
+        assert len(rows) == 2
+        assert all(int(row["chunk_count"]) > 0 for row in rows)
+        assert has_planner_stats(indexer._repository.connection)
 
 
 def test_second_run_indexes_only_changed_and_new_books(tmp_path: Path) -> None:
@@ -41,8 +50,7 @@ def test_second_run_indexes_only_changed_and_new_books(tmp_path: Path) -> None:
     _write_txt(a_path, title="A", body="Первый текст про книгу.")
     _write_txt(b_path, title="B", body="Второй текст про книги.")
 
-    db_path = tmp_path / "search.db"
-    with SearchIndexer.from_db_path(db_path) as indexer:
+    with SearchIndexer.from_db_path(":memory:") as indexer:
         first = indexer.index_books(books_dir)
         assert first.indexed == 2
 
@@ -62,19 +70,175 @@ def test_second_run_indexes_only_changed_and_new_books(tmp_path: Path) -> None:
         assert third.errors == 0
 
         counts = indexer._repository.connection.execute(
-            """
-            SELECT b.source_path, COUNT(*) AS chunk_count
-            FROM chunks c
-            JOIN books b ON b.id = c.book_id
-            GROUP BY b.source_path
-            ORDER BY b.source_path
-            """
+            "SELECT source_path, chunk_count FROM books"
         ).fetchall()
         by_path = {row["source_path"]: int(row["chunk_count"]) for row in counts}
         assert set(by_path) == {str(a_path), str(b_path), str(books_dir / "c.txt")}
         assert all(count > 0 for count in by_path.values())
 
 
+def test_touched_but_unchanged_book_is_skipped_and_stat_refreshed(tmp_path: Path) -> None:
+    books_dir = tmp_path / "books"
+    books_dir.mkdir()
+    a_path = books_dir / "a.txt"
+    _write_txt(a_path, title="A", body="Текст, который не меняется.")
+
+    with SearchIndexer.from_db_path(":memory:") as indexer:
+        assert indexer.index_books(books_dir).indexed == 1
+
+        touched_ns = a_path.stat().st_mtime_ns + 5_000_000_000
+        os.utime(a_path, ns=(touched_ns, touched_ns))
+
+        second = indexer.index_books(books_dir)
+        assert second.indexed == 0
+        assert second.skipped_unchanged == 1
+
+        state = indexer._repository.get_index_state(str(a_path))
+        assert state is not None
+        assert state.mtime_ns == touched_ns
+        assert state.file_size == a_path.stat().st_size
+
+
+def test_parallel_workers_match_serial_indexing(tmp_path: Path) -> None:
+    books_dir = tmp_path / "books"
+    books_dir.mkdir()
+    for name in ("a", "b", "c"):
+        _write_txt(books_dir / f"{name}.txt", title=name.upper(), body=f"Книги {name} и ещё одна книга.")
+    (books_dir / "broken.pdf").write_bytes(b"not a pdf")
+
+    query = """
+        SELECT b.source_path, c.chunk_no, c.lemma_text
+        FROM chunks c
+        JOIN books b ON b.id = c.book_id
+        ORDER BY b.source_path, c.chunk_no
+    """
+    with SearchIndexer.from_db_path(":memory:") as serial:
+        serial_stats = serial.index_books(books_dir)
+        serial_rows = [tuple(row) for row in serial._repository.connection.execute(query)]
+
+    with SearchIndexer.from_db_path(":memory:", workers=2) as parallel:
+        parallel_stats = parallel.index_books(books_dir)
+        parallel_rows = [tuple(row) for row in parallel._repository.connection.execute(query)]
+        assert parallel.index_books(books_dir).skipped_unchanged == 3
+
+    assert (parallel_stats.indexed, parallel_stats.errors) == (3, 1)
+    assert (serial_stats.indexed, serial_stats.errors) == (3, 1)
+    assert parallel_stats.error_details[0]["source_path"] == str(books_dir / "broken.pdf")
+    assert parallel_rows == serial_rows
+
+
+def test_parallel_indexing_bounds_books_in_flight_and_serializes_extraction(tmp_path: Path) -> None:
+    books_dir = tmp_path / "books"
+    books_dir.mkdir()
+    for number in range(12):
+        _write_txt(books_dir / f"{number:02}.txt", title=str(number), body=f"Книга номер {number}.")
+
+    lock = threading.Lock()
+    counts = {"started": 0, "written": 0, "in_flight": 0, "ingesting": 0}
+    peaks = {"in_flight": 0, "ingesting": 0}
+
+    with SearchIndexer.from_db_path(":memory:", workers=2) as indexer:
+        real_prepare, real_apply = indexer._prepare_book, indexer._apply_prepared
+        real_ingest = indexer._ingestor.ingest
+
+        def _prepare(scanned, state):
+            with lock:
+                counts["started"] += 1
+                peaks["in_flight"] = max(peaks["in_flight"], counts["started"] - counts["written"])
+            return real_prepare(scanned, state)
+
+        def _apply(prepared, lemmas, stats):
+            with lock:
+                counts["written"] += 1
+            real_apply(prepared, lemmas, stats)
+
+        def _ingest(path):
+            with lock:
+                counts["ingesting"] += 1
+                peaks["ingesting"] = max(peaks["ingesting"], counts["ingesting"])
+            time.sleep(0.01)
+            try:
+                return real_ingest(path)
+            finally:
+                with lock:
+                    counts["ingesting"] -= 1
+
+        indexer._prepare_book = _prepare
+        indexer._apply_prepared = _apply
+        indexer._ingestor.ingest = _ingest
+        stats = indexer.index_books(books_dir)
+
+    assert stats.indexed == 12
+    assert peaks["in_flight"] <= 2 * 2
+    assert peaks["ingesting"] == 1
+
+
+def _fts_hits(connection, term: str) -> int:
+    return connection.execute("SELECT count(*) FROM chunks_fts WHERE chunks_fts MATCH ?", (term,)).fetchone()[0]
+
+
+def test_initial_bulk_load_rebuilds_fts_and_restores_trigger(tmp_path: Path) -> None:
+    books_dir = tmp_path / "books"
+    books_dir.mkdir()
+    _write_txt(books_dir / "a.txt", title="A", body="Туманная книга.")
+
+    with SearchIndexer.from_db_path(":memory:") as indexer:
+        connection = indexer._repository.connection
+        assert indexer._repository.wants_bulk_load()
+        indexer.index_books(books_dir)
+
+        assert not fts_sync_suspended(connection)
+        assert not indexer._repository.wants_bulk_load()
+        connection.execute("INSERT INTO chunks_fts(chunks_fts, rank) VALUES('integrity-check', 1)")
+        assert _fts_hits(connection, "raw_text:туманная") == 1
+
+        # Incremental runs go back through the per-row triggers.
+        _write_txt(books_dir / "b.txt", title="B", body="Туманная гора.")
+        assert indexer.index_books(books_dir).indexed == 1
+        assert _fts_hits(connection, "raw_text:туманная") == 2
+
+
+def test_interrupted_bulk_load_is_rebuilt_on_next_run(tmp_path: Path) -> None:
+    books_dir = tmp_path / "books"
+    books_dir.mkdir()
+    _write_txt(books_dir / "a.txt", title="A", body="Туманная книга.")
+
+    with SearchIndexer.from_db_path(":memory:") as indexer:
+        connection = indexer._repository.connection
+        indexer.index_books(books_dir)
+        suspend_fts_sync(connection)  # as if a bulk load had crashed
+        _write_txt(books_dir / "b.txt", title="B", body="Туманная гора.")
+
+        assert indexer._repository.wants_bulk_load()
+        indexer.index_books(books_dir)
+
+        assert not fts_sync_suspended(connection)
+        assert _fts_hits(connection, "raw_text:туманная") == 2
+
+
+def test_collect_inputs_walks_nested_dirs_in_path_order_with_stats(tmp_path: Path) -> None:
+    books_dir = tmp_path / "books"
+    (books_dir / "nested").mkdir(parents=True)
+    _write_txt(books_dir / "b.txt", title="B", body="Книга.")
+    _write_txt(books_dir / "nested" / "a.txt", title="A", body="Книга.")
+    (books_dir / "notes.md").write_text("skip me", encoding="utf-8")
+
+    inputs = _collect_inputs(books_dir)
+
+    assert [path.relative_to(books_dir).as_posix() for path, _ in inputs] == ["b.txt", "nested/a.txt"]
+    for path, stat_result in inputs:
+        assert stat_result.st_mtime_ns == path.stat().st_mtime_ns
+        assert stat_result.st_size == path.stat().st_size
+    assert _collect_inputs(tmp_path / "missing") == []
+
+
+def test_indexer_connection_uses_bulk_indexing_pragmas(tmp_path: Path) -> None:
+    with SearchIndexer.from_db_path(tmp_path / "search.db") as indexer:
+        connection = indexer._repository.connection
+        assert connection.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+        assert connection.execute("PRAGMA cache_size").fetchone()[0] == -PRAGMA_INDEXING_CACHE_SIZE_KIB
+
+
 def test_cli_returns_structured_incremental_stats(tmp_path: Path, capsys: object) -> None:
     books_dir = tmp_path / "books"
     books_dir.mkdir()
@@ -101,3 +265,24 @@ def test_cli_returns_structured_incremental_stats(tmp_path: Path, capsys: object
     assert second_payload["indexed"] == 0
     assert second_payload["skipped_unchanged"] == 1
     assert second_payload["errors"] == 0
+
+
+def test_cli_jobs_flag_sets_indexer_workers(monkeypatch: pytest.MonkeyPatch, tmp_path: Path, capsys: object) -> None:
+    seen: list[int] = []
+    real_from_db_path = SearchIndexer.from_db_path.__func__
+
+    def _recording_from_db_path(cls, db_path, *, workers=1):
+        seen.append(workers)
+        return real_from_db_path(cls, db_path, workers=1)
+
+    monkeypatch.setattr(SearchIndexer, "from_db_path", classmethod(_recording_from_db_path))
+    monkeypatch.setattr(os, "cpu_count", lambda: 6)
+    books_dir = tmp_path / "books"
+    books_dir.mkdir()
+
+    assert index_cli_main(["--books-path", str(books_dir), "--db-path", ":memory:", "--jobs", "3"]) == 0
+    assert index_cli_main(["--books-path", str(books_dir), "--db-path", ":memory:", "--jobs", "0"]) == 0
+    assert index_cli_main(["--books-path", str(books_dir), "--db-path", ":memory:"]) == 0
+    capsys.readouterr()
+
+    assert seen == [3, 6, 1]
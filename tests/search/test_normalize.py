@@ -22,3 +22,37 @@ def test_normalization_is_idempotent() -> None:
     twice = normalize_text(once)
 
     assert once == twice
+
+
+def test_short_inputs_are_memoized_per_language() -> None:
+    from librar.search import normalize as normalize_module
+
+    normalize_module._normalize_cached.cache_clear()
+    normalize_text("книги", language="ru")
+    normalize_text("книги", language="ru")
+    normalize_text("книги", language="kk")
+
+    info = normalize_module._normalize_cached.cache_info()
+    assert info.hits == 1
+    assert info.misses == 2
+
+
+def test_long_inputs_bypass_the_memo() -> None:
+    from librar.search import normalize as normalize_module
+
+    normalize_module._normalize_cached.cache_clear()
+    long_text = "книга " * 100
+    assert normalize_text(long_text) == " ".join(["книга"] * 100)
+
+    assert normalize_module._normalize_cached.cache_info().currsize == 0
+
+
+def test_long_inputs_reuse_per_token_lemmas() -> None:
+    from librar.search import normalize as normalize_module
+
+    normalize_module._lemmatize_token.cache_clear()
+    normalize_text("книги " * 100)
+
+    info = normalize_module._lemmatize_token.cache_info()
+    assert info.misses == 1
+    assert info.hits == 99
@@ -1,7 +1,8 @@
 from __future__ import annotations
 
-from pathlib import Path
+import pytest
 
+from librar.search import query as query_module
 from librar.search.query import search_chunks
 from librar.search.repository import ChunkRow, SearchRepository
 
@@ -37,101 +38,133 @@ def _insert_book(
     )
 
 
-def test_exact_phrase_query_hits_raw_text_phrase(tmp_path: Path) -> None:
-    db_path = tmp_path / "search.db"
-
-    with SearchRepository(db_path) as repo:
-        _insert_book(
-            repo,
-            source_path="exact.txt",
-            text="Туманная книга стоит на полке.",
-            lemma_text="туманный книга стоять на полка",
-        )
-        _insert_book(
-            repo,
-            source_path="other.txt",
-            text="Книга может быть туманной, но слова разделены.",
-            lemma_text="книга мочь быть туманный но слово разделить",
-        )
+def test_exact_phrase_query_hits_raw_text_phrase(search_repo: SearchRepository) -> None:
+    _insert_book(
+        search_repo,
+        source_path="exact.txt",
+        text="Туманная книга стоит на полке.",
+        lemma_text="туманный книга стоять на полка",
+    )
+    _insert_book(
+        search_repo,
+        source_path="other.txt",
+        text="Книга может быть туманной, но слова разделены.",
+        lemma_text="книга мочь быть туманный но слово разделить",
+    )
 
-        hits = search_chunks(repo.connection, query="туманная книга", phrase_mode=True, limit=5)
+    hits = search_chunks(search_repo.connection, query="туманная книга", phrase_mode=True, limit=5)
 
     assert hits
     assert hits[0].source_path == "exact.txt"
     assert "Туманная книга" in hits[0].excerpt
 
 
-def test_lemma_query_finds_inflected_forms(tmp_path: Path) -> None:
-    db_path = tmp_path / "search.db"
-
-    with SearchRepository(db_path) as repo:
-        _insert_book(
-            repo,
-            source_path="forms.txt",
-            text="В библиотеке много книги и редкие книги тоже.",
-            lemma_text="в библиотека много книга и редкий книга тоже",
-        )
+def test_lemma_query_finds_inflected_forms(search_repo: SearchRepository) -> None:
+    _insert_book(
+        search_repo,
+        source_path="forms.txt",
+        text="В библиотеке много книги и редкие книги тоже.",
+        lemma_text="в библиотека много книга и редкий книга тоже",
+    )
 
-        hits = search_chunks(repo.connection, query="книга", limit=5)
+    hits = search_chunks(search_repo.connection, query="книга", limit=5)
 
     assert hits
     assert any(hit.source_path == "forms.txt" for hit in hits)
 
 
-def test_results_are_sorted_by_rank_then_rowid(tmp_path: Path) -> None:
-    db_path = tmp_path / "search.db"
-
-    with SearchRepository(db_path) as repo:
-        _insert_book(
-            repo,
-            source_path="high.txt",
-            text="книга книга книга книга",
-            lemma_text="книга книга книга книга",
-        )
-        _insert_book(
-            repo,
-            source_path="low.txt",
-            text="книга встречается один раз",
-            lemma_text="книга встречаться один раз",
-        )
+def test_results_are_sorted_by_rank_then_rowid(search_repo: SearchRepository) -> None:
+    _insert_book(
+        search_repo,
+        source_path="high.txt",
+        text="книга книга книга книга",
+        lemma_text="книга книга книга книга",
+    )
+    _insert_book(
+        search_repo,
+        source_path="low.txt",
+        text="книга встречается один раз",
+        lemma_text="книга встречаться один раз",
+    )
 
-        hits = search_chunks(repo.connection, query="книга", limit=5)
+    hits = search_chunks(search_repo.connection, query="книга", limit=5)
 
     assert len(hits) == 2
     assert hits[0].rank <= hits[1].rank
     assert hits[0].source_path == "high.txt"
 
 
-def test_search_supports_author_and_format_filters(tmp_path: Path) -> None:
-    db_path = tmp_path / "search.db"
-
-    with SearchRepository(db_path) as repo:
-        _insert_book(
-            repo,
-            source_path="allowed.fb2",
-            text="книга о духовной практике",
-            lemma_text="книга о духовный практика",
-            author="Nisargadatta Maharaj",
-            format_name="fb2",
-        )
-        _insert_book(
-            repo,
-            source_path="blocked.txt",
-            text="книга о духовной практике",
-            lemma_text="книга о духовный практика",
-            author="Other Author",
-            format_name="txt",
-        )
-
-        hits = search_chunks(
-            repo.connection,
-            query="книга",
-            author_filter="mahar",
-            format_filter="fb2",
-            limit=10,
-        )
+def test_search_supports_author_and_format_filters(search_repo: SearchRepository) -> None:
+    _insert_book(
+        search_repo,
+        source_path="allowed.fb2",
+        text="книга о духовной практике",
+        lemma_text="книга о духовный практика",
+        author="Nisargadatta Maharaj",
+        format_name="fb2",
+    )
+    _insert_book(
+        search_repo,
+        source_path="blocked.txt",
+        text="книга о духовной практике",
+        lemma_text="книга о духовный практика",
+        author="Other Author",
+        format_name="txt",
+    )
+
+    hits = search_chunks(
+        search_repo.connection,
+        query="книга",
+        author_filter="mahar",
+        format_filter="fb2",
+        limit=10,
+    )
 
     assert len(hits) == 1
     assert hits[0].source_path == "allowed.fb2"
     assert hits[0].author == "Nisargadatta Maharaj"
     assert hits[0].format_name == "fb2"
+
+
+def test_filters_apply_within_the_fts_candidate_window(
+    search_repo: SearchRepository,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    _insert_book(
+        search_repo,
+        source_path="high.txt",
+        text="книга книга книга книга",
+        lemma_text="книга книга книга книга",
+        author="First",
+    )
+    _insert_book(
+        search_repo,
+        source_path="low.txt",
+        text="книга встречается один раз",
+        lemma_text="книга встречаться один раз",
+        author="Second",
+    )
+
+    monkeypatch.setattr(query_module, "FTS_CANDIDATE_LIMIT", 1)
+    query_module._compose_search_sql.cache_clear()
+    try:
+        capped = search_chunks(search_repo.connection, query="книга", author_filter="second")
+        top = search_chunks(search_repo.connection, query="книга")
+    finally:
+        query_module._compose_search_sql.cache_clear()
+
+    assert capped == []
+    assert [hit.source_path for hit in top] == ["high.txt"]
+
+
+def test_search_sql_matches_through_the_fts_index(search_repo: SearchRepository) -> None:
+    sql = query_module._compose_search_sql(("LOWER(COALESCE(b.format, '')) = ?",))
+    plan = [
+        row["detail"]
+        for row in search_repo.connection.execute(f"EXPLAIN QUERY PLAN {sql}", ("книга", "txt", 10))
+    ]
+
+    fts_scans = [detail for detail in plan if "chunks_fts VIRTUAL TABLE" in detail]
+    assert fts_scans
+    # "INDEX 0:M<n>" is FTS5's MATCH access path; a bare "INDEX 0:" is a full scan.
+    assert all(":M" in detail for detail in fts_scans)
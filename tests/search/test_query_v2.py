@@ -2,7 +2,8 @@
 
 from __future__ import annotations
 
-from pathlib import Path
+from collections.abc import Sequence
+from dataclasses import dataclass
 
 from librar.search.query import SearchFilters, search_chunks
 from librar.search.repository import ChunkRow, SearchRepository
@@ -13,40 +14,101 @@ from librar.search.repository import ChunkRow, SearchRepository
 # ---------------------------------------------------------------------------
 
 
-def _insert_book(
-    repo: SearchRepository,
-    *,
-    source_path: str,
-    text: str,
-    lemma_text: str,
-    language: str = "ru",
-    author: str = "tester",
-    format_name: str = "txt",
-) -> int:
-    """Insert a single-chunk book and return its book_id."""
-    repo.replace_book_chunks(
-        source_path=source_path,
-        title=source_path,
-        author=author,
-        format_name=format_name,
-        language=language,
-        fingerprint=f"fp-{source_path}",
-        mtime_ns=1,
-        chunks=[
-            ChunkRow(
-                chunk_no=0,
-                raw_text=text,
-                lemma_text=lemma_text,
-                page=1,
-                chapter=None,
-                item_id=None,
-                char_start=0,
-                char_end=len(text),
-            )
-        ],
-    )
+@dataclass(slots=True)
+class BookSpec:
+    """A single-chunk book plus its taxonomy and timeline link rows.
+
+    ``tags`` are ``(name, tag_type)`` pairs and ``timeline_events`` are
+    ``(year_from, year_to, event_text, confidence)`` tuples.
+    """
+
+    source_path: str
+    text: str
+    lemma_text: str
+    language: str = "ru"
+    author: str = "tester"
+    format_name: str = "txt"
+    categories: Sequence[str] = ()
+    tags: Sequence[tuple[str, str]] = ()
+    timeline_events: Sequence[tuple[int, int, str, float]] = ()
+
+
+def _seed_books(repo: SearchRepository, *specs: BookSpec) -> dict[str, int]:
+    """Insert the books, then their link rows in one transaction; return ids by source_path.
+
+    ``replace_book_chunks`` commits each book on its own.
+    """
+    connection = repo.connection
+    book_ids: dict[str, int] = {}
+    for spec in specs:
+        book_ids[spec.source_path] = repo.replace_book_chunks(
+            source_path=spec.source_path,
+            title=spec.source_path,
+            author=spec.author,
+            format_name=spec.format_name,
+            language=spec.language,
+            fingerprint=f"fp-{spec.source_path}",
+            mtime_ns=1,
+            chunks=[
+                ChunkRow(
+                    chunk_no=0,
+                    raw_text=spec.text,
+                    lemma_text=spec.lemma_text,
+                    page=1,
+                    chapter=None,
+                    item_id=None,
+                    char_start=0,
+                    char_end=len(spec.text),
+                )
+            ],
+        )
+
+    with connection:
+        category_links = [
+            (book_ids[spec.source_path], name) for spec in specs for name in spec.categories
+        ]
+        connection.executemany(
+            "INSERT INTO categories (name) VALUES (?) ON CONFLICT(name) DO NOTHING",
+            [(name,) for _, name in category_links],
+        )
+        connection.executemany(
+            """INSERT INTO book_categories (book_id, category_id)
+               SELECT ?, id FROM categories WHERE name = ?""",
+            category_links,
+        )
+
+        tag_links = [
+            (book_ids[spec.source_path], name, tag_type)
+            for spec in specs
+            for name, tag_type in spec.tags
+        ]
+        connection.executemany(
+            """INSERT INTO tags (name, tag_type) VALUES (?, ?)
+               ON CONFLICT(name, tag_type) DO NOTHING""",
+            [(name, tag_type) for _, name, tag_type in tag_links],
+        )
+        connection.executemany(
+            """INSERT INTO book_tags (book_id, tag_id)
+               SELECT ?, id FROM tags WHERE name = ? AND tag_type = ?""",
+            tag_links,
+        )
+
+        connection.executemany(
+            """INSERT INTO timeline_events
+               (book_id, year_from, year_to, event_text, confidence)
+               VALUES (?, ?, ?, ?, ?)""",
+            [
+                (book_ids[spec.source_path], *event)
+                for spec in specs
+                for event in spec.timeline_events
+            ],
+        )
+    return book_ids
+
+
+def _category_id(repo: SearchRepository, name: str) -> int:
     row = repo.connection.execute(
-        "SELECT id FROM books WHERE source_path = ?", (source_path,)
+        "SELECT id FROM categories WHERE name = ?", (name,)
     ).fetchone()
     return int(row["id"])
 
@@ -56,96 +118,90 @@ def _insert_book(
 # ---------------------------------------------------------------------------
 
 
-def test_language_filter_includes_matching_book(tmp_path: Path) -> None:
-    db_path = tmp_path / "q2.db"
-
-    with SearchRepository(db_path) as repo:
-        # Two books with Russian text but different language tags.
-        # The filter must include only the one with language="kk".
-        _insert_book(
-            repo,
+def test_language_filter_includes_matching_book(search_repo: SearchRepository) -> None:
+    # Two books with Russian text but different language tags.
+    # The filter must include only the one with language="kk".
+    _seed_books(
+        search_repo,
+        BookSpec(
             source_path="kk.txt",
             text="история книга",
             lemma_text="история книга",
             language="kk",
-        )
-        _insert_book(
-            repo,
+        ),
+        BookSpec(
             source_path="ru.txt",
             text="история книга",
             lemma_text="история книга",
             language="ru",
-        )
+        ),
+    )
 
-        hits = search_chunks(
-            repo.connection,
-            query="история",
-            filters=SearchFilters(language="kk"),
-            limit=10,
-        )
+    hits = search_chunks(
+        search_repo.connection,
+        query="история",
+        filters=SearchFilters(language="kk"),
+        limit=10,
+    )
 
     assert hits
     assert all(h.source_path == "kk.txt" for h in hits)
 
 
-def test_language_filter_excludes_other_language(tmp_path: Path) -> None:
-    db_path = tmp_path / "q2.db"
-
-    with SearchRepository(db_path) as repo:
-        _insert_book(
-            repo,
+def test_language_filter_excludes_other_language(search_repo: SearchRepository) -> None:
+    _seed_books(
+        search_repo,
+        BookSpec(
             source_path="ru.txt",
             text="книга о природе и жизни",
             lemma_text="книга о природа и жизнь",
             language="ru",
-        )
-        _insert_book(
-            repo,
+        ),
+        BookSpec(
             source_path="en.txt",
             text="book about nature and life",
             lemma_text="book about nature and life",
             language="en",
-        )
+        ),
+    )
 
-        hits = search_chunks(
-            repo.connection,
-            query="книга",
-            filters=SearchFilters(language="en"),
-            limit=10,
-        )
+    hits = search_chunks(
+        search_repo.connection,
+        query="книга",
+        filters=SearchFilters(language="en"),
+        limit=10,
+    )
 
     # The Russian "книга" is not in the English book, so no hits
     assert all(h.source_path == "en.txt" for h in hits) or hits == []
 
 
-def test_no_filters_returns_all_languages(tmp_path: Path) -> None:
-    db_path = tmp_path / "q2.db"
-
-    with SearchRepository(db_path) as repo:
-        _insert_book(
-            repo,
+def test_no_filters_returns_all_languages(search_repo: SearchRepository) -> None:
+    _seed_books(
+        search_repo,
+        BookSpec(
             source_path="ru.txt",
             text="книга о природе",
             lemma_text="книга о природа",
             language="ru",
-        )
-        _insert_book(
-            repo,
+        ),
+        BookSpec(
             source_path="kk.txt",
             text="книга туралы",
             lemma_text="книга туралы",
             language="kk",
-        )
+        ),
+    )
 
-        hits_no_filter = search_chunks(
-            repo.connection, query="книга", limit=10
-        )
-        hits_ru_filter = search_chunks(
-            repo.connection,
-            query="книга",
-            filters=SearchFilters(language="ru"),
-            limit=10,
-        )
+    hits_no_filter = search_chunks(
+        search_repo.connection, query="книга", limit=10
+    )
+    hits_ru_filter = search_chunks(
+        search_repo.connection,
+        query="книга",
+        filters=SearchFilters(language="ru"),
+        limit=10,
+    )
 
     assert len(hits_no_filter) == 2
     assert len(hits_ru_filter) == 1
@@ -157,59 +213,45 @@ def test_no_filters_returns_all_languages(tmp_path: Path) -> None:
 # ---------------------------------------------------------------------------
 
 
-def test_year_filter_matches_overlapping_event(tmp_path: Path) -> None:
-    db_path = tmp_path / "q2.db"
-
-    with SearchRepository(db_path) as repo:
-        book_id = _insert_book(
-            repo,
+def test_year_filter_matches_overlapping_event(search_repo: SearchRepository) -> None:
+    _seed_books(
+        search_repo,
+        BookSpec(
             source_path="history.txt",
             text="революция произошла в 1917 году",
             lemma_text="революция произойти в 1917 год",
-        )
-        repo.connection.execute(
-            """INSERT INTO timeline_events
-               (book_id, year_from, year_to, event_text, confidence)
-               VALUES (?, 1905, 1922, 'Революционный период', 0.9)""",
-            (book_id,),
-        )
-        repo.connection.commit()
+            timeline_events=[(1905, 1922, "Революционный период", 0.9)],
+        ),
+    )
 
-        hits = search_chunks(
-            repo.connection,
-            query="революция",
-            filters=SearchFilters(year_from=1910, year_to=1920),
-            limit=10,
-        )
+    hits = search_chunks(
+        search_repo.connection,
+        query="революция",
+        filters=SearchFilters(year_from=1910, year_to=1920),
+        limit=10,
+    )
 
     assert hits
     assert hits[0].source_path == "history.txt"
 
 
-def test_year_filter_excludes_non_matching_period(tmp_path: Path) -> None:
-    db_path = tmp_path / "q2.db"
-
-    with SearchRepository(db_path) as repo:
-        book_id = _insert_book(
-            repo,
+def test_year_filter_excludes_non_matching_period(search_repo: SearchRepository) -> None:
+    _seed_books(
+        search_repo,
+        BookSpec(
             source_path="ancient.txt",
             text="история древних времен",
             lemma_text="история древний время",
-        )
-        repo.connection.execute(
-            """INSERT INTO timeline_events
-               (book_id, year_from, year_to, event_text, confidence)
-               VALUES (?, 1200, 1400, 'Средние века', 0.8)""",
-            (book_id,),
-        )
-        repo.connection.commit()
+            timeline_events=[(1200, 1400, "Средние века", 0.8)],
+        ),
+    )
 
-        hits = search_chunks(
-            repo.connection,
-            query="история",
-            filters=SearchFilters(year_from=1900, year_to=2000),
-            limit=10,
-        )
+    hits = search_chunks(
+        search_repo.connection,
+        query="история",
+        filters=SearchFilters(year_from=1900, year_to=2000),
+        limit=10,
+    )
 
     assert hits == []
 
@@ -219,65 +261,51 @@ def test_year_filter_excludes_non_matching_period(tmp_path: Path) -> None:
 # ---------------------------------------------------------------------------
 
 
-def test_category_filter_includes_categorised_book(tmp_path: Path) -> None:
-    db_path = tmp_path / "q2.db"
-
-    with SearchRepository(db_path) as repo:
-        book_id = _insert_book(
-            repo,
+def test_category_filter_includes_categorised_book(search_repo: SearchRepository) -> None:
+    _seed_books(
+        search_repo,
+        BookSpec(
             source_path="science.txt",
             text="физика и математика",
             lemma_text="физика и математика",
-        )
-        # Insert a category and link it
-        repo.connection.execute(
-            "INSERT INTO categories (name) VALUES ('science')"
-        )
-        cat_id = repo.connection.execute(
-            "SELECT id FROM categories WHERE name = 'science'"
-        ).fetchone()["id"]
-        repo.connection.execute(
-            "INSERT INTO book_categories (book_id, category_id) VALUES (?, ?)",
-            (book_id, cat_id),
-        )
-        repo.connection.commit()
+            categories=["science"],
+        ),
+    )
+    cat_id = _category_id(search_repo, "science")
 
-        hits = search_chunks(
-            repo.connection,
-            query="физика",
-            filters=SearchFilters(category_ids=[cat_id]),
-            limit=10,
-        )
+    hits = search_chunks(
+        search_repo.connection,
+        query="физика",
+        filters=SearchFilters(category_ids=[cat_id]),
+        limit=10,
+    )
 
     assert hits
     assert hits[0].source_path == "science.txt"
 
 
-def test_category_filter_excludes_uncategorised_book(tmp_path: Path) -> None:
-    db_path = tmp_path / "q2.db"
-
-    with SearchRepository(db_path) as repo:
-        _insert_book(
-            repo,
+def test_category_filter_excludes_uncategorised_book(search_repo: SearchRepository) -> None:
+    _seed_books(
+        search_repo,
+        BookSpec(
             source_path="other.txt",
             text="физика и математика",
             lemma_text="физика и математика",
-        )
-        # Insert a category that is NOT linked to any book
-        repo.connection.execute(
+        ),
+    )
+    # Insert a category that is NOT linked to any book
+    with search_repo.connection:
+        search_repo.connection.execute(
             "INSERT INTO categories (name) VALUES ('history')"
         )
-        cat_id = repo.connection.execute(
-            "SELECT id FROM categories WHERE name = 'history'"
-        ).fetchone()["id"]
-        repo.connection.commit()
-
-        hits = search_chunks(
-            repo.connection,
-            query="физика",
-            filters=SearchFilters(category_ids=[cat_id]),
-            limit=10,
-        )
+    cat_id = _category_id(search_repo, "history")
+
+    hits = search_chunks(
+        search_repo.connection,
+        query="физика",
+        filters=SearchFilters(category_ids=[cat_id]),
+        limit=10,
+    )
 
     assert hits == []
 
@@ -287,34 +315,23 @@ def test_category_filter_excludes_uncategorised_book(tmp_path: Path) -> None:
 # ---------------------------------------------------------------------------
 
 
-def test_tag_filter_includes_tagged_book(tmp_path: Path) -> None:
-    db_path = tmp_path / "q2.db"
-
-    with SearchRepository(db_path) as repo:
-        book_id = _insert_book(
-            repo,
+def test_tag_filter_includes_tagged_book(search_repo: SearchRepository) -> None:
+    _seed_books(
+        search_repo,
+        BookSpec(
             source_path="tagged.txt",
             text="важная книга о культуре",
             lemma_text="важный книга о культура",
-        )
-        repo.connection.execute(
-            "INSERT INTO tags (name, tag_type) VALUES ('культура', 'topic')"
-        )
-        tag_id = repo.connection.execute(
-            "SELECT id FROM tags WHERE name = 'культура'"
-        ).fetchone()["id"]
-        repo.connection.execute(
-            "INSERT INTO book_tags (book_id, tag_id) VALUES (?, ?)",
-            (book_id, tag_id),
-        )
-        repo.connection.commit()
+            tags=[("культура", "topic")],
+        ),
+    )
 
-        hits = search_chunks(
-            repo.connection,
-            query="книга",
-            filters=SearchFilters(tag="культура"),
-            limit=10,
-        )
+    hits = search_chunks(
+        search_repo.connection,
+        query="книга",
+        filters=SearchFilters(tag="культура"),
+        limit=10,
+    )
 
     assert hits
     assert hits[0].source_path == "tagged.txt"
@@ -325,19 +342,18 @@ def test_tag_filter_includes_tagged_book(tmp_path: Path) -> None:
 # ---------------------------------------------------------------------------
 
 
-def test_excerpt_uses_guillemet_markers(tmp_path: Path) -> None:
-    db_path = tmp_path / "q2.db"
-
-    with SearchRepository(db_path) as repo:
-        # raw_text must contain the exact search token so FTS5 snippet highlights it.
-        _insert_book(
-            repo,
+def test_excerpt_uses_guillemet_markers(search_repo: SearchRepository) -> None:
+    # raw_text must contain the exact search token so FTS5 snippet highlights it.
+    _seed_books(
+        search_repo,
+        BookSpec(
             source_path="snip.txt",
             text="книга рассматривает различные темы.",
             lemma_text="книга рассматривать различный тема",
-        )
+        ),
+    )
 
-        hits = search_chunks(repo.connection, query="книга", limit=5)
+    hits = search_chunks(search_repo.connection, query="книга", limit=5)
 
     assert hits
     excerpt = hits[0].excerpt
@@ -350,24 +366,23 @@ def test_excerpt_uses_guillemet_markers(tmp_path: Path) -> None:
 # ---------------------------------------------------------------------------
 
 
-def test_empty_search_filters_does_not_restrict_results(tmp_path: Path) -> None:
-    db_path = tmp_path / "q2.db"
-
-    with SearchRepository(db_path) as repo:
-        _insert_book(
-            repo,
+def test_empty_search_filters_does_not_restrict_results(search_repo: SearchRepository) -> None:
+    _seed_books(
+        search_repo,
+        BookSpec(
             source_path="a.txt",
             text="книга о поэзии",
             lemma_text="книга о поэзия",
             language="ru",
-        )
+        ),
+    )
 
-        hits_no_filters = search_chunks(repo.connection, query="книга", limit=10)
-        hits_empty_filters = search_chunks(
-            repo.connection,
-            query="книга",
-            filters=SearchFilters(),
-            limit=10,
-        )
+    hits_no_filters = search_chunks(search_repo.connection, query="книга", limit=10)
+    hits_empty_filters = search_chunks(
+        search_repo.connection,
+        query="книга",
+        filters=SearchFilters(),
+        limit=10,
+    )
 
     assert len(hits_no_filters) == len(hits_empty_filters)
@@ -1,8 +1,12 @@
 from __future__ import annotations
 
 from pathlib import Path
+import sqlite3
+
+import pytest
 
 from librar.search.repository import ChunkRow, SearchRepository
+from librar.search.schema import has_planner_stats
 
 
 def test_schema_initialization_creates_expected_tables(tmp_path: Path) -> None:
@@ -22,6 +26,16 @@ def test_schema_initialization_creates_expected_tables(tmp_path: Path) -> None:
         assert "semantic_chunk_state" in table_names
 
 
+def test_repository_connection_applies_runtime_pragmas(tmp_path: Path) -> None:
+    with SearchRepository(tmp_path / "search.db") as repo:
+        connection = repo.connection
+        assert connection.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+        assert connection.execute("PRAGMA synchronous").fetchone()[0] == 1  # NORMAL
+        assert connection.execute("PRAGMA foreign_keys").fetchone()[0] == 1
+        assert connection.execute("PRAGMA temp_store").fetchone()[0] == 2  # MEMORY
+        assert connection.execute("PRAGMA mmap_size").fetchone()[0] > 0
+
+
 def test_fts_is_queryable_with_external_content_sync(tmp_path: Path) -> None:
     db_path = tmp_path / "search.db"
 
@@ -93,9 +107,141 @@ def test_index_state_persists_and_updates(tmp_path: Path) -> None:
         assert updated.mtime_ns == 200
 
 
+def test_books_chunk_count_tracks_replaced_chunks(search_repo: SearchRepository) -> None:
+    def _chunk(chunk_no: int) -> ChunkRow:
+        return ChunkRow(
+            chunk_no=chunk_no,
+            raw_text=f"Часть {chunk_no}",
+            lemma_text=f"часть {chunk_no}",
+            page=None,
+            chapter=None,
+            item_id=None,
+            char_start=None,
+            char_end=None,
+        )
+
+    def _count() -> int:
+        row = search_repo.connection.execute(
+            "SELECT chunk_count FROM books WHERE source_path = 'book-a.txt'"
+        ).fetchone()
+        return int(row["chunk_count"])
+
+    common = {"source_path": "book-a.txt", "title": "A", "author": None, "format_name": "txt"}
+    search_repo.replace_book_chunks(**common, fingerprint="fp-1", mtime_ns=1, chunks=[_chunk(0), _chunk(1)])
+    assert _count() == 2
+
+    search_repo.replace_book_chunks(**common, fingerprint="fp-2", mtime_ns=2, chunks=[_chunk(0)])
+    assert _count() == 1
+
+
+def test_replace_book_chunks_rolls_back_failed_batch(search_repo: SearchRepository) -> None:
+    chunk = ChunkRow(
+        chunk_no=0,
+        raw_text="Старый текст",
+        lemma_text="старый текст",
+        page=None,
+        chapter=None,
+        item_id=None,
+        char_start=None,
+        char_end=None,
+    )
+    common = {"source_path": "book-a.txt", "title": "A", "author": None, "format_name": "txt"}
+    search_repo.replace_book_chunks(**common, fingerprint="fp-1", mtime_ns=1, chunks=[chunk])
+
+    with pytest.raises(sqlite3.IntegrityError):
+        # Duplicate chunk_no violates UNIQUE(book_id, chunk_no) mid-batch.
+        search_repo.replace_book_chunks(**common, fingerprint="fp-2", mtime_ns=2, chunks=[chunk, chunk])
+
+    assert not search_repo.connection.in_transaction
+    rows = search_repo.connection.execute("SELECT raw_text FROM chunks_fts WHERE chunks_fts MATCH 'старый'").fetchall()
+    assert [row["raw_text"] for row in rows] == ["Старый текст"]
+    state = search_repo.get_index_state("book-a.txt")
+    assert state is not None
+    assert state.fingerprint == "fp-1"
+
+
+def test_fetch_chunks_by_ids_batches_long_id_lists(search_repo: SearchRepository) -> None:
+    search_repo.replace_book_chunks(
+        source_path="long.txt",
+        title="Long",
+        author=None,
+        format_name="txt",
+        fingerprint="fp-long",
+        mtime_ns=1,
+        chunks=[
+            ChunkRow(
+                chunk_no=chunk_no,
+                raw_text=f"chunk {chunk_no}",
+                lemma_text=f"chunk {chunk_no}",
+                page=None,
+                chapter=None,
+                item_id=None,
+                char_start=None,
+                char_end=None,
+            )
+            for chunk_no in range(1_100)
+        ],
+    )
+    ids = [row[0] for row in search_repo.connection.execute("SELECT id FROM chunks").fetchall()]
+
+    fetched = search_repo.fetch_chunks_by_ids(list(reversed(ids)) + [999_999])
+
+    assert [row.chunk_id for row in fetched] == sorted(ids)
+    assert fetched[0].source_path == "long.txt"
+
+
+def test_iter_chunk_pages_streams_every_chunk_in_id_order(search_repo: SearchRepository) -> None:
+    search_repo.replace_book_chunks(
+        source_path="paged.txt",
+        title="Paged",
+        author=None,
+        format_name="txt",
+        fingerprint="fp-paged",
+        mtime_ns=1,
+        chunks=[
+            ChunkRow(
+                chunk_no=chunk_no,
+                raw_text=f"chunk {chunk_no}",
+                lemma_text=f"chunk {chunk_no}",
+                page=None,
+                chapter=None,
+                item_id=None,
+                char_start=None,
+                char_end=None,
+            )
+            for chunk_no in range(5)
+        ],
+    )
+
+    pages = []
+    for page in search_repo.iter_chunk_pages(page_size=2):
+        pages.append([row.chunk_no for row in page])
+        # Writes between pages do not disturb the iteration.
+        search_repo.touch_index_state("paged.txt", mtime_ns=len(pages), file_size=1)
+
+    assert pages == [[0, 1], [2, 3], [4]]
+    with pytest.raises(ValueError, match="page_size"):
+        next(search_repo.iter_chunk_pages(page_size=0))
+
+
 def test_maintenance_hooks_are_available(tmp_path: Path) -> None:
     db_path = tmp_path / "search.db"
 
     with SearchRepository(db_path) as repo:
         repo.run_maintenance("optimize")
         repo.run_maintenance("rebuild")
+        repo.run_maintenance("analyze")
+
+        assert has_planner_stats(repo.connection)
+
+
+def test_close_runs_pragma_optimize(tmp_path: Path) -> None:
+    repo = SearchRepository(tmp_path / "search.db")
+    statements: list[str] = []
+    repo.connection.set_trace_callback(statements.append)
+
+    repo.close()
+
+    assert "PRAGMA optimize;" in statements
+    with pytest.raises(sqlite3.ProgrammingError):
+        repo.connection.execute("SELECT 1")
@@ -3,8 +3,10 @@
 from __future__ import annotations
 
 from pathlib import Path
+import sqlite3
 
 from librar.search.repository import ChunkRow, SearchRepository
+from librar.search.schema import SCHEMA_VERSION, ensure_schema
 
 
 def test_books_table_has_language_column(tmp_path: Path) -> None:
@@ -45,6 +47,23 @@ def test_ensure_schema_is_idempotent(tmp_path: Path) -> None:
         pass  # second open → must not raise "duplicate column name" etc.
 
 
+def test_ensure_schema_skips_ddl_once_stamped(tmp_path: Path) -> None:
+    db_path = tmp_path / "schema_v2.db"
+    with SearchRepository(db_path) as repo:
+        version = repo.connection.execute("PRAGMA user_version").fetchone()[0]
+    assert version == SCHEMA_VERSION
+
+    connection = sqlite3.connect(db_path)
+    statements: list[str] = []
+    connection.set_trace_callback(statements.append)
+    try:
+        ensure_schema(connection)
+    finally:
+        connection.close()
+
+    assert statements == ["PRAGMA user_version"]
+
+
 def test_language_is_stored_and_retrieved(tmp_path: Path) -> None:
     db_path = tmp_path / "schema_v2.db"
 
@@ -137,3 +156,47 @@ def test_timeline_events_foreign_key_cascade(tmp_path: Path) -> None:
         ).fetchall()
 
     assert events == []
+
+
+def test_reindex_keeps_book_id_and_book_level_rows() -> None:
+    """Re-indexing upserts the book row in place; book-keyed rows survive."""
+
+    with SearchRepository(":memory:") as repo:
+        conn = repo.connection
+        first_id = repo.replace_book_chunks(
+            source_path="tl.pdf",
+            title="TL",
+            author=None,
+            format_name="pdf",
+            language="ru",
+            fingerprint="fp-1",
+            mtime_ns=1,
+            chunks=[],
+        )
+        conn.execute("INSERT INTO categories(id, name) VALUES (1, 'История')")
+        conn.execute("INSERT INTO book_categories(book_id, category_id) VALUES (?, 1)", (first_id,))
+        conn.execute(
+            """INSERT INTO timeline_events
+               (book_id, year_from, year_to, event_text, confidence)
+               VALUES (?, 1917, 1917, 'Революция', 0.9)""",
+            (first_id,),
+        )
+        conn.commit()
+
+        second_id = repo.replace_book_chunks(
+            source_path="tl.pdf",
+            title="TL v2",
+            author=None,
+            format_name="pdf",
+            language="ru",
+            fingerprint="fp-2",
+            mtime_ns=2,
+            chunks=[],
+        )
+
+        categories = conn.execute("SELECT book_id FROM book_categories").fetchall()
+        events = conn.execute("SELECT book_id FROM timeline_events").fetchall()
+
+    assert second_id == first_id
+    assert [row["book_id"] for row in categories] == [first_id]
+    assert [row["book_id"] for row in events] == [first_id]
@@ -22,7 +22,9 @@ def test_cli_returns_ranked_json_results_with_locators(tmp_path: Path, capsys: o
     capsys.readouterr()
 
     exit_code = search_text_main(["--db-path", str(db_path), "--query", "книга", "--limit", "5"])
-    payload = json.loads(capsys.readouterr().out)
+    output = capsys.readouterr().out
+    payload = json.loads(output)
+    assert '"query":"книга"' in output  # compact, unescaped UTF-8
 
     assert exit_code == 0
     assert payload["query"] == "книга"
@@ -35,3 +35,37 @@ def test_settings_validate_base_url() -> None:
                 "OPENROUTER_BASE_URL": "openrouter.ai/api/v1",
             }
         )
+
+
+def test_settings_from_env_reuses_instance_for_identical_values() -> None:
+    env = {
+        "OPENROUTER_API_KEY": "sk-or-v1-test",
+        "OPENROUTER_EMBEDDING_MODEL": "openai/text-embedding-3-small",
+    }
+
+    first = SemanticSettings.from_env(env)
+    assert SemanticSettings.from_env(dict(env)) is first
+
+    changed = SemanticSettings.from_env({**env, "OPENROUTER_EMBEDDING_MODEL": "qwen/qwen3-embedding-0.6b"})
+    assert changed is not first
+    assert changed.model == "qwen/qwen3-embedding-0.6b"
+
+
+def test_settings_enable_query_cache_from_env() -> None:
+    env = {
+        "OPENROUTER_API_KEY": "sk-or-v1-test",
+        "OPENROUTER_EMBEDDING_MODEL": "openai/text-embedding-3-small",
+    }
+
+    assert SemanticSettings.from_env(env).enable_query_cache is False
+    assert SemanticSettings.from_env({**env, "SEMANTIC_QUERY_CACHE": "true"}).enable_query_cache is True
+
+
+def test_settings_enable_warmup_from_env() -> None:
+    env = {
+        "OPENROUTER_API_KEY": "sk-or-v1-test",
+        "OPENROUTER_EMBEDDING_MODEL": "openai/text-embedding-3-small",
+    }
+
+    assert SemanticSettings.from_env(env).warmup_on_start is False
+    assert SemanticSettings.from_env({**env, "SEMANTIC_WARMUP": "1"}).warmup_on_start is True
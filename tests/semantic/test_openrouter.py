@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
+import random
 from types import SimpleNamespace
 
 import numpy as np
@@ -14,6 +15,13 @@ def _response(vectors: list[list[float]]) -> SimpleNamespace:
     return SimpleNamespace(data=[SimpleNamespace(embedding=vector) for vector in vectors])
 
 
+class _NoJitter(random.Random):
+    """Always draws the jitter midpoint, i.e. a 1.0 multiplier."""
+
+    def uniform(self, a: float, b: float) -> float:
+        return (a + b) / 2
+
+
 @dataclass
 class _HttpError(Exception):
     status_code: int
@@ -62,6 +70,18 @@ def test_embed_texts_returns_float32_vectors_on_success() -> None:
     assert client.embeddings.calls == [("openai/text-embedding-3-small", ["alpha", "beta"])]
 
 
+def test_embed_texts_returns_contiguous_matrix_and_rejects_ragged_rows() -> None:
+    client = _FakeClient([_response([[1, 2, 3], [4, 5, 6]]), _response([[0.1, 0.2], [0.3]])])
+    embedder = OpenRouterEmbedder(_settings(), client=client)
+
+    vectors = embedder.embed_texts(["alpha", "beta"])
+    assert vectors.flags["C_CONTIGUOUS"]
+    np.testing.assert_array_equal(vectors, np.array([[1, 2, 3], [4, 5, 6]], dtype=np.float32))
+
+    with pytest.raises(EmbeddingRequestError, match="dimension mismatch"):
+        embedder.embed_texts(["alpha", "beta"])
+
+
 def test_embedder_retries_on_transient_error_then_succeeds() -> None:
     delays: list[float] = []
     client = _FakeClient(
@@ -76,6 +96,7 @@ def test_embedder_retries_on_transient_error_then_succeeds() -> None:
         max_retries=2,
         retry_base_seconds=0.5,
         sleep=delays.append,
+        rng=_NoJitter(),
     )
 
     vector = embedder.embed_query("книга")
@@ -100,6 +121,7 @@ def test_embedder_raises_on_terminal_failures() -> None:
         max_retries=2,
         retry_base_seconds=0.1,
         sleep=delays.append,
+        rng=_NoJitter(),
     )
 
     with pytest.raises(EmbeddingRequestError, match="openai/text-embedding-3-small"):
@@ -153,6 +175,7 @@ def test_generator_retries_then_raises_on_terminal_failure() -> None:
         max_retries=2,
         retry_base_seconds=0.1,
         sleep=delays.append,
+        rng=_NoJitter(),
     )
 
     with pytest.raises(GenerationRequestError, match="openai/gpt-4o-mini"):
@@ -160,3 +183,24 @@ def test_generator_retries_then_raises_on_terminal_failure() -> None:
 
     assert delays == [0.1, 0.2]
     assert len(client.chat.completions.calls) == 3
+
+
+def test_retry_delays_are_jittered_around_the_exponential_schedule() -> None:
+    delays: list[float] = []
+    client = _FakeClient([_HttpError(status_code=503, detail="busy")] * 4)
+    embedder = OpenRouterEmbedder(
+        _settings(),
+        client=client,
+        max_retries=3,
+        retry_base_seconds=1.0,
+        sleep=delays.append,
+        rng=random.Random(7),
+    )
+
+    with pytest.raises(EmbeddingRequestError):
+        embedder.embed_texts(["текст"])
+
+    assert len(delays) == 3
+    for attempt, delay in enumerate(delays):
+        assert 0.5 * 2**attempt <= delay <= 1.5 * 2**attempt
+    assert delays != [1.0, 2.0, 4.0]
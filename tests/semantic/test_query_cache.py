@@ -0,0 +1,78 @@
+from __future__ import annotations
+
+import threading
+
+import numpy as np
+import pytest
+
+from librar.semantic.query_cache import SemanticQueryCache
+
+
+def test_cache_matches_near_identical_vectors_under_same_filters() -> None:
+    cache: SemanticQueryCache[str] = SemanticQueryCache(threshold=0.97)
+    cache.store("духовный рост", ("tester", None), np.array([1.0, 0.0, 0.0]), ["hit-a"], latency_ms=100.0)
+
+    assert cache.lookup_text("Духовный рост", ("tester", None)) == ["hit-a"]
+    assert cache.lookup_vector(np.array([2.0, 0.1, 0.0]), ("tester", None)) == ["hit-a"]
+    assert cache.lookup_vector(np.array([1.0, 0.0, 0.0]), (None, None)) is None
+    assert cache.lookup_vector(np.array([0.6, 0.8, 0.0]), ("tester", None)) is None
+    assert (cache.hits, cache.misses) == (2, 2)
+
+
+def test_cache_evicts_least_recently_used_and_expired_entries() -> None:
+    now = [0.0]
+    cache: SemanticQueryCache[str] = SemanticQueryCache(capacity=2, ttl_seconds=10.0, clock=lambda: now[0])
+    cache.store("a", None, np.array([1.0, 0.0]), ["a"], latency_ms=100.0)
+    cache.store("b", None, np.array([0.0, 1.0]), ["b"], latency_ms=100.0)
+    assert cache.lookup_text("a", None) == ["a"]
+
+    cache.store("c", None, np.array([1.0, 1.0]), ["c"], latency_ms=100.0)
+    assert cache.lookup_text("b", None) is None
+    assert len(cache) == 2
+
+    now[0] = 11.0
+    assert cache.lookup_text("a", None) is None
+    assert cache.lookup_vector(np.array([1.0, 1.0]), None) is None
+    assert len(cache) == 0
+
+
+def test_cache_admits_only_slow_queries() -> None:
+    cache: SemanticQueryCache[str] = SemanticQueryCache(min_latency_ms=50.0)
+
+    assert not cache.store("быстро", None, np.array([1.0, 0.0]), ["fast"], latency_ms=3.0)
+    assert len(cache) == 0
+    assert cache.store("медленно", None, np.array([0.0, 1.0]), ["slow"], latency_ms=80.0)
+    assert cache.lookup_text("медленно", None) == ["slow"]
+
+
+def test_cache_rejects_invalid_configuration() -> None:
+    with pytest.raises(ValueError, match="capacity"):
+        SemanticQueryCache(capacity=0)
+    with pytest.raises(ValueError, match="threshold"):
+        SemanticQueryCache(threshold=1.5)
+    with pytest.raises(ValueError, match="min_latency_ms"):
+        SemanticQueryCache(min_latency_ms=-1.0)
+
+
+def test_cache_is_safe_to_share_between_threads() -> None:
+    cache: SemanticQueryCache[int] = SemanticQueryCache(capacity=8, min_latency_ms=0.0)
+    errors: list[BaseException] = []
+
+    def _work(offset: int) -> None:
+        try:
+            for step in range(300):
+                vector = np.array([1.0, float((offset + step) % 16)])
+                cache.store(f"q{offset}-{step}", None, vector, [step], latency_ms=1.0)
+                cache.lookup_vector(vector, None)
+                cache.lookup_text(f"q{offset}-{step - 1}", None)
+        except BaseException as exc:  # pragma: no cover - failure path
+            errors.append(exc)
+
+    workers = [threading.Thread(target=_work, args=(offset,)) for offset in range(4)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+
+    assert errors == []
+    assert len(cache) == 8
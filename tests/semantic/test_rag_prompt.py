@@ -104,3 +104,15 @@ def test_generator_user_message_contains_prompt() -> None:
     user_messages = [m for m in messages if m["role"] == "user"]
     assert user_messages
     assert "1917" in user_messages[0]["content"]
+
+
+def test_generator_reuses_one_system_message_across_calls() -> None:
+    client = _FakeGeneratorClient([_ok_response("Первый."), _ok_response("Второй.")])
+    generator = OpenRouterGenerator(_settings(), client=client)
+
+    generator.generate_text(prompt="Вопрос один", model="openai/gpt-4o-mini")
+    generator.generate_text(prompt="Вопрос два", model="openai/gpt-4o-mini")
+
+    first, second = (call["messages"] for call in client.chat.completions.calls)
+    assert first[0] is second[0]
+    assert [m["role"] for m in first] == ["system", "user"]
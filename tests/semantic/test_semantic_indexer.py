@@ -2,13 +2,15 @@ from __future__ import annotations
 
 import json
 from pathlib import Path
+import threading
 
 import numpy as np
 import pytest
+import xxhash
 
 from librar.cli.index_semantic import main as index_semantic_main
 from librar.search.repository import ChunkRow, SearchRepository
-from librar.semantic.indexer import SemanticIndexer, SemanticIndexStats
+from librar.semantic.indexer import SemanticIndexer, SemanticIndexStats, _semantic_fingerprint
 from librar.semantic.semantic_repository import SemanticRepository
 
 
@@ -20,11 +22,12 @@ class _FakeEmbedder:
 
     def embed_texts(self, texts: list[str], *, stage: str = "chunks") -> np.ndarray:
         self.calls.append(list(texts))
-        vectors: list[list[float]] = []
-        for text in texts:
-            checksum = float(sum(ord(char) for char in text) % 101)
-            vectors.append([float(len(text)), float(text.count(" ") + 1), checksum])
-        return np.asarray(vectors, dtype=np.float32)
+        vectors = np.empty((len(texts), 3), dtype=np.float32)
+        for row, text in enumerate(texts):
+            # UTF-32 code units are the code points: same checksum as summing ord().
+            codepoints = np.frombuffer(text.encode("utf-32-le"), dtype=np.uint32)
+            vectors[row] = (len(text), text.count(" ") + 1, int(codepoints.sum(dtype=np.uint64)) % 101)
+        return vectors
 
 
 def _seed_book(repo: SearchRepository, source_path: str, body: str) -> None:
@@ -124,6 +127,125 @@ def test_second_run_skips_unchanged_and_only_reembeds_changed_chunks(tmp_path: P
         assert len(embedder.calls) == 2
 
 
+def test_default_batch_size_follows_embedder_max_batch_size(tmp_path: Path) -> None:
+    class _CappedEmbedder(_FakeEmbedder):
+        max_batch_size = 2
+
+    with SearchRepository(tmp_path / "semantic.db") as repo:
+        for index in range(5):
+            _seed_book(repo, f"book-{index}.txt", f"Глава {index}: путь роста души.")
+
+        embedder = _CappedEmbedder()
+        indexer = SemanticIndexer(
+            search_repository=repo,
+            semantic_repository=SemanticRepository(repo.connection),
+            embedder=embedder,
+            index_path=tmp_path / "semantic.faiss",
+        )
+        stats = indexer.index_chunks()
+
+        assert stats.embedded_chunks == 5
+        assert [len(call) for call in embedder.calls] == [2, 2, 1]
+
+        # An explicit batch size larger than the provider allows is capped.
+        capped = SemanticIndexer(
+            search_repository=repo,
+            semantic_repository=SemanticRepository(repo.connection),
+            embedder=embedder,
+            index_path=tmp_path / "semantic.faiss",
+            batch_size=64,
+        )
+        assert capped._batch_size == 2
+
+
+def test_embedding_batches_run_concurrently_and_apply_in_order(tmp_path: Path) -> None:
+    class _RendezvousEmbedder(_FakeEmbedder):
+        max_batch_size = 1
+
+        def __init__(self) -> None:
+            super().__init__()
+            # Both first batches must be in flight at once or this times out.
+            self._barrier = threading.Barrier(2, timeout=5)
+
+        def embed_texts(self, texts: list[str], *, stage: str = "chunks") -> np.ndarray:
+            if len(self.calls) < 2:
+                self._barrier.wait()
+            return super().embed_texts(texts, stage=stage)
+
+    with SearchRepository(tmp_path / "semantic.db") as repo:
+        for index in range(3):
+            _seed_book(repo, f"book-{index}.txt", f"Глава {index}: путь роста души.")
+
+        semantic_repo = SemanticRepository(repo.connection)
+        embedder = _RendezvousEmbedder()
+        indexer = SemanticIndexer(
+            search_repository=repo,
+            semantic_repository=semantic_repo,
+            embedder=embedder,
+            index_path=tmp_path / "semantic.faiss",
+            max_inflight_batches=2,
+        )
+        stats = indexer.index_chunks()
+
+        assert stats.embedded_chunks == 3
+        assert stats.errors == 0
+        assert sorted(text for call in embedder.calls for text in call) == sorted(
+            chunk.raw_text for chunk in repo.iter_chunks()
+        )
+        assert len(semantic_repo.list_chunk_states(model="test-semantic-model")) == 3
+
+
+def test_embedder_concurrency_limit_serializes_batches(tmp_path: Path) -> None:
+    class _LocalModelEmbedder(_FakeEmbedder):
+        max_batch_size = 1
+        max_concurrent_batches = 1
+
+        def __init__(self) -> None:
+            super().__init__()
+            self._active = 0
+            self.peak = 0
+            self._lock = threading.Lock()
+
+        def embed_texts(self, texts: list[str], *, stage: str = "chunks") -> np.ndarray:
+            with self._lock:
+                self._active += 1
+                self.peak = max(self.peak, self._active)
+            try:
+                return super().embed_texts(texts, stage=stage)
+            finally:
+                with self._lock:
+                    self._active -= 1
+
+    with SearchRepository(tmp_path / "semantic.db") as repo:
+        for index in range(3):
+            _seed_book(repo, f"book-{index}.txt", f"Глава {index}: путь роста души.")
+
+        embedder = _LocalModelEmbedder()
+        indexer = SemanticIndexer(
+            search_repository=repo,
+            semantic_repository=SemanticRepository(repo.connection),
+            embedder=embedder,
+            index_path=tmp_path / "semantic.faiss",
+            max_inflight_batches=4,
+        )
+
+        assert indexer.index_chunks().embedded_chunks == 3
+        assert indexer._max_inflight_batches == 1
+        assert embedder.peak == 1
+
+
+def test_semantic_fingerprint_is_stable_and_model_scoped() -> None:
+    fingerprint = _semantic_fingerprint("Туманная книга", "model-a")
+
+    assert fingerprint == _semantic_fingerprint("Туманная книга", "model-a")
+    assert len(fingerprint) == 16
+    assert fingerprint != _semantic_fingerprint("Туманная книга", "model-b")
+    assert fingerprint != _semantic_fingerprint("Туманная книга!", "model-a")
+    # Unchanged from the one-shot digest, so existing chunk states stay valid.
+    one_shot = xxhash.xxh3_64_intdigest("model-a\nТуманная книга".encode("utf-8"))
+    assert fingerprint == f"{one_shot:016x}"
+
+
 def test_index_semantic_cli_returns_structured_stats(monkeypatch: pytest.MonkeyPatch, capsys: object) -> None:
     class _StubIndexer:
         def __enter__(self) -> "_StubIndexer":
@@ -142,16 +264,17 @@ def test_index_semantic_cli_returns_structured_stats(monkeypatch: pytest.MonkeyP
                 model="stub-model",
             )
 
-    def _fake_from_db_path(*, db_path: str, index_path: str, batch_size: int) -> _StubIndexer:
+    def _fake_from_db_path(*, db_path: str, index_path: str, batch_size: int, quantize: str) -> _StubIndexer:
         assert db_path.endswith("search.db")
         assert index_path.endswith("semantic.faiss")
         assert batch_size == 16
+        assert quantize == "sq8"
         return _StubIndexer()
 
     monkeypatch.setattr(
         SemanticIndexer,
         "from_db_path",
-        classmethod(lambda cls, *, db_path, index_path, batch_size: _fake_from_db_path(db_path=db_path, index_path=index_path, batch_size=batch_size)),
+        classmethod(lambda cls, **kwargs: _fake_from_db_path(**kwargs)),
     )
 
     exit_code = index_semantic_main([
@@ -161,6 +284,8 @@ def test_index_semantic_cli_returns_structured_stats(monkeypatch: pytest.MonkeyP
         "tmp/semantic.faiss",
         "--batch-size",
         "16",
+        "--quantize",
+        "sq8",
     ])
     payload = json.loads(capsys.readouterr().out)
 
@@ -2,13 +2,18 @@ from __future__ import annotations
 
 from dataclasses import dataclass
 from pathlib import Path
+import os
+import threading
+from typing import Collection
 
 import numpy as np
 import pytest
 
 from librar.search.repository import ChunkRow, SearchRepository
+from librar.semantic import query as semantic_query
 from librar.semantic.config import SemanticSettings
 from librar.semantic.query import SemanticQueryService
+from librar.semantic.query_cache import SemanticQueryCache
 from librar.semantic.semantic_repository import SemanticRepository
 from librar.semantic.vector_store import FaissVectorStore
 
@@ -78,9 +83,18 @@ class _StubHit:
 class _StubVectorStore:
     def __init__(self, hits: list[_StubHit]) -> None:
         self._hits = hits
+        self.allowed_ids: list[Collection[int] | None] = []
 
-    def search(self, query_vector: np.ndarray, *, top_k: int = 10) -> list[_StubHit]:
-        return self._hits[:top_k]
+    def search(
+        self,
+        query_vector: np.ndarray,
+        *,
+        top_k: int = 10,
+        allowed_ids: Collection[int] | None = None,
+    ) -> list[_StubHit]:
+        self.allowed_ids.append(allowed_ids)
+        hits = self._hits if allowed_ids is None else [hit for hit in self._hits if hit.vector_id in allowed_ids]
+        return hits[:top_k]
 
 
 def test_semantic_query_returns_ranked_chunk_results(tmp_path: Path) -> None:
@@ -148,6 +162,208 @@ def test_semantic_query_returns_ranked_chunk_results(tmp_path: Path) -> None:
         assert hits[0].format_name == "txt"
 
 
+def test_semantic_query_cache_skips_embedding_and_vector_search_on_repeats(tmp_path: Path) -> None:
+    class _CountingEmbedder(_FixedEmbedder):
+        calls = 0
+
+        def embed_query(self, query: str) -> np.ndarray:
+            self.calls += 1
+            return super().embed_query(query)
+
+    class _CountingVectorStore(_StubVectorStore):
+        calls = 0
+
+        def search(
+            self,
+            query_vector: np.ndarray,
+            *,
+            top_k: int = 10,
+            allowed_ids: Collection[int] | None = None,
+        ) -> list[_StubHit]:
+            self.calls += 1
+            return super().search(query_vector, top_k=top_k, allowed_ids=allowed_ids)
+
+    with SearchRepository(tmp_path / "semantic.db") as repo:
+        _seed_book(repo, "book-a.txt", "Развитие души происходит через практику.")
+        chunk_a = _chunk_id(repo, "book-a.txt")
+        semantic_repo = SemanticRepository(repo.connection)
+        semantic_repo.upsert_index_state(
+            model="test-semantic-model",
+            dimension=3,
+            metric="ip",
+            index_path=str(tmp_path / "semantic.faiss"),
+        )
+        semantic_repo.upsert_chunk_state(chunk_id=chunk_a, vector_id=chunk_a, model="test-semantic-model", fingerprint="a")
+
+        embedder = _CountingEmbedder([1.0, 0.0, 0.0])
+        vector_store = _CountingVectorStore([_StubHit(vector_id=chunk_a, score=0.9)])
+        service = SemanticQueryService(
+            search_repository=repo,
+            semantic_repository=semantic_repo,
+            vector_store=vector_store,
+            embedder=embedder,
+            query_cache=SemanticQueryCache(min_latency_ms=0.0),
+        )
+
+        first = service.search(query="spiritual growth", limit=2)
+        # Same text: no embedding call. Different text, same vector: no vector search.
+        again = service.search(query="Spiritual growth", limit=2)
+        paraphrase = service.search(query="growth of the spirit", limit=2)
+        filtered = service.search(query="spiritual growth", limit=2, author_filter="tester")
+
+        assert [hit.chunk_id for hit in first] == [chunk_a]
+        assert again == first
+        assert paraphrase == first
+        assert [hit.chunk_id for hit in filtered] == [chunk_a]
+        # The filtered repeat misses the result cache but reuses the embedding.
+        assert embedder.calls == 2
+        assert vector_store.calls == 2
+
+
+def test_semantic_query_reuses_embeddings_of_repeated_queries(tmp_path: Path) -> None:
+    class _CountingEmbedder(_FixedEmbedder):
+        calls = 0
+
+        def embed_query(self, query: str) -> np.ndarray:
+            self.calls += 1
+            return super().embed_query(query)
+
+    index_path = tmp_path / "semantic.faiss"
+    with SearchRepository(tmp_path / "semantic.db") as repo:
+        _seed_book(repo, "book-a.txt", "Развитие души происходит через практику.")
+        chunk_a = _chunk_id(repo, "book-a.txt")
+        semantic_repo = SemanticRepository(repo.connection)
+        semantic_repo.upsert_index_state(model="test-semantic-model", dimension=3, metric="ip", index_path=str(index_path))
+        vector_store = FaissVectorStore(index_path, dimension=3, metric="ip")
+        vector_store.add_or_replace(vector_ids=[chunk_a], vectors=[[1.0, 0.0, 0.0]])
+        # Not unit length: the store must normalize a copy, not the cached vector.
+        embedder = _CountingEmbedder([2.0, 0.0, 0.0])
+        service = SemanticQueryService(
+            search_repository=repo,
+            semantic_repository=semantic_repo,
+            vector_store=vector_store,
+            embedder=embedder,
+        )
+
+        first = service.search(query="spiritual growth", limit=1)
+        again = service.search(query="  Spiritual Growth ", limit=1)
+        # A fresh service, as the bot opens per search, shares the cache.
+        other_service = SemanticQueryService(
+            search_repository=repo,
+            semantic_repository=semantic_repo,
+            vector_store=vector_store,
+            embedder=embedder,
+        )
+        from_other = other_service.search(query="spiritual growth", limit=1)
+
+        assert again == first
+        assert from_other == first
+        assert embedder.calls == 1
+        assert service._embed_query("spiritual growth").tolist() == [2.0, 0.0, 0.0]
+
+
+def test_semantic_query_cache_skips_fast_queries(tmp_path: Path) -> None:
+    with SearchRepository(tmp_path / "semantic.db") as repo:
+        _seed_book(repo, "book-a.txt", "Развитие души происходит через практику.")
+        semantic_repo = SemanticRepository(repo.connection)
+        semantic_repo.upsert_index_state(
+            model="test-semantic-model",
+            dimension=3,
+            metric="ip",
+            index_path=str(tmp_path / "semantic.faiss"),
+        )
+        cache: SemanticQueryCache = SemanticQueryCache(min_latency_ms=10_000.0)
+        service = SemanticQueryService(
+            search_repository=repo,
+            semantic_repository=semantic_repo,
+            vector_store=_StubVectorStore([_StubHit(vector_id=_chunk_id(repo, "book-a.txt"), score=0.9)]),
+            embedder=_FixedEmbedder([1.0, 0.0, 0.0]),
+            query_cache=cache,
+        )
+
+        assert len(service.search(query="spiritual growth", limit=2)) == 1
+        assert len(cache) == 0
+
+
+def test_semantic_query_fetches_chunks_in_windows_until_limit(
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    with SearchRepository(tmp_path / "semantic.db") as repo:
+        _seed_book(repo, "book-a.txt", "Развитие души происходит через практику.")
+        chunk_a = _chunk_id(repo, "book-a.txt")
+        semantic_repo = SemanticRepository(repo.connection)
+        semantic_repo.upsert_index_state(
+            model="test-semantic-model",
+            dimension=3,
+            metric="ip",
+            index_path=str(tmp_path / "semantic.faiss"),
+        )
+        # A wide candidate pool where most ids have no chunk row.
+        stub_hits = [_StubHit(vector_id=chunk_a, score=0.9)] + [
+            _StubHit(vector_id=10_000 + offset, score=0.5) for offset in range(1_200)
+        ]
+        fetched: list[int] = []
+        real_fetch = repo.fetch_chunks_by_ids
+
+        def _counting_fetch(chunk_ids: list[int]):
+            fetched.append(len(chunk_ids))
+            return real_fetch(chunk_ids)
+
+        monkeypatch.setattr(repo, "fetch_chunks_by_ids", _counting_fetch)
+        service = SemanticQueryService(
+            search_repository=repo,
+            semantic_repository=semantic_repo,
+            vector_store=_StubVectorStore(stub_hits),
+            embedder=_FixedEmbedder([1.0, 0.0, 0.0]),
+        )
+
+        hits = service.search(query="spiritual growth", limit=1, candidate_limit=len(stub_hits))
+        assert [hit.chunk_id for hit in hits] == [chunk_a]
+        assert fetched == [500]
+
+        assert service.search(query="spiritual growth", limit=2, candidate_limit=len(stub_hits)) == hits
+        assert fetched == [500, 500, 500, 201]
+
+
+def test_filtered_semantic_query_searches_only_matching_vectors(tmp_path: Path) -> None:
+    with SearchRepository(tmp_path / "semantic.db") as repo:
+        _seed_book(repo, "tolstoy.txt", "Развитие души происходит через практику.", author="Лев Толстой")
+        _seed_book(repo, "other.fb2", "Техническое руководство.", author="Другой автор", format_name="fb2")
+        chunk_a = _chunk_id(repo, "tolstoy.txt")
+        chunk_b = _chunk_id(repo, "other.fb2")
+        semantic_repo = SemanticRepository(repo.connection)
+        semantic_repo.upsert_index_state(
+            model="test-semantic-model",
+            dimension=3,
+            metric="ip",
+            index_path=str(tmp_path / "semantic.faiss"),
+        )
+        for chunk_id in (chunk_a, chunk_b):
+            semantic_repo.upsert_chunk_state(
+                chunk_id=chunk_id,
+                vector_id=chunk_id,
+                model="test-semantic-model",
+                fingerprint=str(chunk_id),
+            )
+        vector_store = _StubVectorStore([_StubHit(vector_id=chunk_b, score=0.9), _StubHit(vector_id=chunk_a, score=0.5)])
+        service = SemanticQueryService(
+            search_repository=repo,
+            semantic_repository=semantic_repo,
+            vector_store=vector_store,
+            embedder=_FixedEmbedder([1.0, 0.0, 0.0]),
+        )
+
+        # Cyrillic case folding happens in Python, not in SQLite's ASCII lower().
+        hits = service.search(query="spiritual growth", limit=5, author_filter="ТОЛСТОЙ")
+        assert [hit.chunk_id for hit in hits] == [chunk_a]
+        assert vector_store.allowed_ids == [[chunk_a]]
+
+        # A filter nothing matches never reaches the vector store.
+        assert service.search(query="spiritual growth", limit=5, format_filter="epub") == []
+        assert len(vector_store.allowed_ids) == 1
+
+
 def test_semantic_query_fails_if_index_not_initialized(tmp_path: Path) -> None:
     db_path = tmp_path / "semantic.db"
 
@@ -283,3 +499,75 @@ def test_semantic_from_db_path_fails_on_model_mismatch(tmp_path: Path) -> None:
             index_path=index_path,
             settings=settings,
         )
+
+
+@pytest.mark.parametrize("warmup_on_start", [True, False])
+def test_semantic_from_db_path_warms_up_embedder_when_enabled(
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+    warmup_on_start: bool,
+) -> None:
+    warmed = threading.Event()
+
+    class _WarmupEmbedder(_FixedEmbedder):
+        def __init__(self, settings: SemanticSettings) -> None:
+            super().__init__([1.0, 0.0, 0.0])
+
+        def embed_query(self, query: str) -> np.ndarray:
+            warmed.set()
+            raise RuntimeError("warmup failures are ignored")
+
+    monkeypatch.setattr(semantic_query, "OpenRouterEmbedder", _WarmupEmbedder)
+    db_path = tmp_path / "semantic.db"
+    index_path = tmp_path / "semantic.faiss"
+    with SearchRepository(db_path) as repo:
+        SemanticRepository(repo.connection).upsert_index_state(
+            model="test-semantic-model",
+            dimension=3,
+            metric="ip",
+            index_path=str(index_path),
+        )
+    settings = SemanticSettings(api_key="test-key", model="test-semantic-model", warmup_on_start=warmup_on_start)
+
+    with SemanticQueryService.from_db_path(db_path=db_path, index_path=index_path, settings=settings) as first:
+        if warmup_on_start:
+            assert warmed.wait(timeout=5.0)
+        else:
+            assert not warmed.is_set()
+        warmed.clear()
+        # Later services reuse the warmed embedder instead of warming their own.
+        with SemanticQueryService.from_db_path(db_path=db_path, index_path=index_path, settings=settings) as second:
+            assert second._embedder is first._embedder
+        assert not warmed.wait(timeout=0.2)
+
+
+def test_semantic_from_db_path_shares_the_query_cache_until_the_index_changes(
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    monkeypatch.setattr(semantic_query, "OpenRouterEmbedder", lambda settings: _FixedEmbedder([1.0, 0.0, 0.0]))
+    db_path = tmp_path / "semantic.db"
+    index_path = tmp_path / "semantic.faiss"
+    with SearchRepository(db_path) as repo:
+        SemanticRepository(repo.connection).upsert_index_state(
+            model="test-semantic-model",
+            dimension=3,
+            metric="ip",
+            index_path=str(index_path),
+        )
+    writer = FaissVectorStore(index_path, dimension=3, metric="ip")
+    writer.add_or_replace(vector_ids=[1], vectors=[[1.0, 0.0, 0.0]])
+    writer.save()
+    settings = SemanticSettings(api_key="test-key", model="test-semantic-model", enable_query_cache=True)
+
+    with SemanticQueryService.from_db_path(db_path=db_path, index_path=index_path, settings=settings) as first:
+        with SemanticQueryService.from_db_path(db_path=db_path, index_path=index_path, settings=settings) as second:
+            assert first.query_cache is not None
+            assert second.query_cache is first.query_cache
+
+    writer.add_or_replace(vector_ids=[2], vectors=[[0.0, 1.0, 0.0]])
+    writer.save()
+    os.utime(index_path, ns=(1, 1))  # a distinct mtime even on coarse filesystems
+    with SemanticQueryService.from_db_path(db_path=db_path, index_path=index_path, settings=settings) as reloaded:
+        assert reloaded.query_cache is not None
+        assert reloaded.query_cache is not first.query_cache
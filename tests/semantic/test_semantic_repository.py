@@ -3,7 +3,7 @@ from __future__ import annotations
 from pathlib import Path
 
 from librar.search.repository import ChunkRow, SearchRepository
-from librar.semantic.semantic_repository import SemanticRepository
+from librar.semantic.semantic_repository import SemanticChunkState, SemanticRepository
 
 
 def _seed_chunk(repo: SearchRepository, source_path: str, chunk_no: int) -> int:
@@ -68,48 +68,100 @@ def test_semantic_index_state_persists_across_reopen(tmp_path: Path) -> None:
         assert state.index_path == ".librar-semantic.faiss"
 
 
-def test_chunk_state_upsert_and_cleanup(tmp_path: Path) -> None:
-    db_path = tmp_path / "semantic.db"
-
-    with SearchRepository(db_path) as repo:
-        _seed_chunk(repo, "book-a.txt", 0)
-        _seed_chunk(repo, "book-b.txt", 0)
-        chunk_a = _first_chunk_id(repo, "book-a.txt")
-        chunk_b = _first_chunk_id(repo, "book-b.txt")
+def test_chunk_state_upsert_and_cleanup(search_repo: SearchRepository) -> None:
+    _seed_chunk(search_repo, "book-a.txt", 0)
+    _seed_chunk(search_repo, "book-b.txt", 0)
+    chunk_a = _first_chunk_id(search_repo, "book-a.txt")
+    chunk_b = _first_chunk_id(search_repo, "book-b.txt")
 
-        semantic = SemanticRepository(repo.connection)
-        semantic.upsert_chunk_state(
-            chunk_id=chunk_a,
-            vector_id=100,
-            model="openai/text-embedding-3-small",
-            fingerprint="a-v1",
-        )
-        semantic.upsert_chunk_state(
-            chunk_id=chunk_b,
-            vector_id=101,
-            model="openai/text-embedding-3-small",
-            fingerprint="b-v1",
-        )
+    semantic = SemanticRepository(search_repo.connection)
+    semantic.upsert_chunk_state(
+        chunk_id=chunk_a,
+        vector_id=100,
+        model="openai/text-embedding-3-small",
+        fingerprint="a-v1",
+    )
+    semantic.upsert_chunk_state(
+        chunk_id=chunk_b,
+        vector_id=101,
+        model="openai/text-embedding-3-small",
+        fingerprint="b-v1",
+    )
 
-        updated = semantic.get_chunk_state(chunk_id=chunk_a, model="openai/text-embedding-3-small")
-        assert updated is not None
-        assert updated.vector_id == 100
+    updated = semantic.get_chunk_state(chunk_id=chunk_a, model="openai/text-embedding-3-small")
+    assert updated is not None
+    assert updated.vector_id == 100
 
-        semantic.upsert_chunk_state(
-            chunk_id=chunk_a,
-            vector_id=200,
-            model="openai/text-embedding-3-small",
-            fingerprint="a-v2",
-        )
-        updated_again = semantic.get_chunk_state(chunk_id=chunk_a, model="openai/text-embedding-3-small")
-        assert updated_again is not None
-        assert updated_again.vector_id == 200
-        assert updated_again.fingerprint == "a-v2"
+    semantic.upsert_chunk_state(
+        chunk_id=chunk_a,
+        vector_id=200,
+        model="openai/text-embedding-3-small",
+        fingerprint="a-v2",
+    )
+    updated_again = semantic.get_chunk_state(chunk_id=chunk_a, model="openai/text-embedding-3-small")
+    assert updated_again is not None
+    assert updated_again.vector_id == 200
+    assert updated_again.fingerprint == "a-v2"
+
+    removed = semantic.delete_chunk_states_not_in(
+        model="openai/text-embedding-3-small",
+        chunk_ids={chunk_a},
+    )
+    assert removed == 1
+    states = semantic.list_chunk_states(model="openai/text-embedding-3-small")
+    assert [state.chunk_id for state in states] == [chunk_a]
+
+
+def test_bulk_chunk_state_upsert_inserts_and_updates(search_repo: SearchRepository) -> None:
+    _seed_chunk(search_repo, "book-a.txt", 0)
+    _seed_chunk(search_repo, "book-b.txt", 0)
+    chunk_a = _first_chunk_id(search_repo, "book-a.txt")
+    chunk_b = _first_chunk_id(search_repo, "book-b.txt")
+    semantic = SemanticRepository(search_repo.connection)
+    semantic.upsert_chunk_state(chunk_id=chunk_a, vector_id=chunk_a, model="m", fingerprint="a-v1")
+
+    semantic.upsert_chunk_states_bulk(
+        [
+            SemanticChunkState(chunk_id=chunk_a, vector_id=chunk_a, model="m", fingerprint="a-v2"),
+            SemanticChunkState(chunk_id=chunk_b, vector_id=chunk_b, model="m", fingerprint="b-v1"),
+        ]
+    )
 
-        removed = semantic.delete_chunk_states_not_in(
-            model="openai/text-embedding-3-small",
-            chunk_ids={chunk_a},
-        )
-        assert removed == 1
-        states = semantic.list_chunk_states(model="openai/text-embedding-3-small")
-        assert [state.chunk_id for state in states] == [chunk_a]
+    states = semantic.list_chunk_states(model="m")
+    assert [(state.chunk_id, state.fingerprint) for state in states] == [(chunk_a, "a-v2"), (chunk_b, "b-v1")]
+    assert not search_repo.connection.in_transaction
+
+
+def test_bulk_chunk_state_lookup_spans_in_clause_batches(search_repo: SearchRepository) -> None:
+    chunk_ids = []
+    for index in range(3):
+        _seed_chunk(search_repo, f"book-{index}.txt", 0)
+        chunk_ids.append(_first_chunk_id(search_repo, f"book-{index}.txt"))
+    semantic = SemanticRepository(search_repo.connection)
+    for chunk_id in chunk_ids[:2]:
+        semantic.upsert_chunk_state(chunk_id=chunk_id, vector_id=chunk_id, model="m", fingerprint=f"fp-{chunk_id}")
+    semantic.upsert_chunk_state(chunk_id=chunk_ids[2], vector_id=chunk_ids[2], model="other", fingerprint="x")
+
+    # Unknown ids pad the request past one 500-id IN (...) batch.
+    requested = chunk_ids + list(range(10_000, 10_600))
+    states = semantic.get_chunk_states_bulk(model="m", chunk_ids=requested)
+
+    assert sorted(states) == sorted(chunk_ids[:2])
+    assert states[chunk_ids[0]].fingerprint == f"fp-{chunk_ids[0]}"
+
+
+def test_delete_chunk_states_not_in_handles_more_ids_than_host_parameters(search_repo: SearchRepository) -> None:
+    chunk_ids = []
+    for index in range(3):
+        _seed_chunk(search_repo, f"book-{index}.txt", 0)
+        chunk_ids.append(_first_chunk_id(search_repo, f"book-{index}.txt"))
+    semantic = SemanticRepository(search_repo.connection)
+    for chunk_id in chunk_ids:
+        semantic.upsert_chunk_state(chunk_id=chunk_id, vector_id=chunk_id, model="m", fingerprint="fp")
+
+    # Past SQLite's default limit of 32766 host parameters.
+    keep = {chunk_ids[0], *range(100_000, 140_000)}
+    assert semantic.delete_chunk_states_not_in(model="m", chunk_ids=keep) == 2
+    assert [state.chunk_id for state in semantic.list_chunk_states(model="m")] == [chunk_ids[0]]
+    # The keep-set table is dropped again.
+    assert semantic.delete_chunk_states_not_in(model="m", chunk_ids={chunk_ids[0]}) == 0
@@ -2,11 +2,24 @@ from __future__ import annotations
 
 from pathlib import Path
 
+import logging
+import os
+
 import pytest
 
+from librar.semantic import vector_store
 from librar.semantic.vector_store import FaissVectorStore, VectorStoreError
 
 
+_PROC_MAPS = Path("/proc/self/maps")
+
+
+def _mapped_files() -> list[str]:
+    """Paths of the files mapped into this process (Linux only)."""
+    fields = (line.split(maxsplit=5) for line in _PROC_MAPS.read_text().splitlines())
+    return [parts[5] for parts in fields if len(parts) == 6]
+
+
 def test_vector_store_create_save_reload_and_search(tmp_path: Path) -> None:
     index_path = tmp_path / "semantic.faiss"
 
@@ -39,6 +52,245 @@ def test_vector_store_replace_existing_id_keeps_total_size(tmp_path: Path) -> No
     assert hits[0].vector_id == 10
 
 
+def test_vector_store_replaces_many_ids_in_one_call(tmp_path: Path) -> None:
+    store = FaissVectorStore(tmp_path / "semantic.faiss", dimension=3, metric="ip")
+    store.add_or_replace(
+        vector_ids=[10, 11, 12, 13],
+        vectors=[[1.0, 0.0, 0.0], [0.0, 1.0, 0.0], [0.0, 0.0, 1.0], [1.0, 1.0, 0.0]],
+    )
+    store.add_or_replace(
+        vector_ids=[13, 10, 14],
+        vectors=[[0.0, 0.0, 1.0], [0.0, 1.0, 1.0], [1.0, 0.0, 1.0]],
+    )
+
+    assert store.ntotal == 5
+    top = store.search([0.0, 0.0, 1.0], top_k=5)
+    assert top[0].vector_id in {12, 13}
+    assert {hit.vector_id for hit in top} == {10, 11, 12, 13, 14}
+    with pytest.raises(ValueError, match="duplicates"):
+        store.add_or_replace(vector_ids=[1, 1], vectors=[[1.0, 0.0, 0.0], [1.0, 0.0, 0.0]])
+
+
+def test_vector_store_normalizes_a_copy_of_the_callers_vectors(tmp_path: Path) -> None:
+    import numpy as np
+
+    vectors = np.array([[3.0, 4.0, 0.0], [0.0, 0.0, 2.0]], dtype=np.float32)
+    store = FaissVectorStore(tmp_path / "semantic.faiss", dimension=3, metric="ip")
+    store.add_or_replace(vector_ids=[10, 11], vectors=vectors)
+
+    assert vectors.tolist() == [[3.0, 4.0, 0.0], [0.0, 0.0, 2.0]]
+    assert store.search([3.0, 4.0, 0.0], top_k=1)[0].score == pytest.approx(1.0)
+
+
+def test_vector_store_replaces_ids_loaded_from_disk(tmp_path: Path) -> None:
+    index_path = tmp_path / "semantic.faiss"
+    store = FaissVectorStore(index_path, dimension=3, metric="ip")
+    store.add_or_replace(vector_ids=[10, 11], vectors=[[1.0, 0.0, 0.0], [0.0, 1.0, 0.0]])
+    store.save()
+
+    reloaded = FaissVectorStore(index_path, dimension=3, metric="ip")
+    reloaded.add_or_replace(vector_ids=[11, 12], vectors=[[0.0, 0.0, 1.0], [1.0, 1.0, 0.0]])
+
+    assert reloaded.ntotal == 3
+    assert reloaded.search([0.0, 0.0, 1.0], top_k=1)[0].vector_id == 11
+
+
+def test_read_only_store_searches_mapped_index_and_survives_writer_save(tmp_path: Path) -> None:
+    index_path = tmp_path / "semantic.faiss"
+    writer = FaissVectorStore(index_path, dimension=3, metric="ip")
+    writer.add_or_replace(vector_ids=[10, 11], vectors=[[1.0, 0.0, 0.0], [0.0, 1.0, 0.0]])
+    writer.save()
+
+    reader = FaissVectorStore(index_path, dimension=3, metric="ip", read_only=True)
+    assert reader.read_only
+    assert [hit.vector_id for hit in reader.search([1.0, 0.0, 0.0], top_k=2)] == [10, 11]
+    with pytest.raises(VectorStoreError, match="read-only"):
+        reader.add_or_replace(vector_ids=[12], vectors=[[0.0, 0.0, 1.0]])
+    with pytest.raises(VectorStoreError, match="read-only"):
+        reader.save()
+
+    # save() swaps in a new file; the open mapping keeps serving the old one.
+    writer.add_or_replace(vector_ids=[12], vectors=[[0.0, 0.0, 1.0]])
+    writer.compact()
+    assert reader.ntotal == 2
+    assert sorted(hit.vector_id for hit in reader.search([0.0, 0.0, 1.0], top_k=3)) == [10, 11]
+    assert FaissVectorStore(index_path, dimension=3, metric="ip", read_only=True).ntotal == 3
+
+
+@pytest.mark.skipif(not _PROC_MAPS.exists(), reason="needs /proc/self/maps")
+@pytest.mark.parametrize("hnsw_min_vectors", [vector_store.HNSW_MIN_VECTORS, 3])
+def test_read_only_store_maps_the_saved_codes_instead_of_copying_them(
+    tmp_path: Path,
+    caplog: pytest.LogCaptureFixture,
+    hnsw_min_vectors: int,
+) -> None:
+    index_path = tmp_path / "semantic.faiss"
+    writer = FaissVectorStore(index_path, dimension=3, metric="ip", hnsw_min_vectors=hnsw_min_vectors)
+    writer.add_or_replace(
+        vector_ids=[10, 11, 12],
+        vectors=[[1.0, 0.0, 0.0], [0.0, 1.0, 0.0], [0.0, 0.0, 1.0]],
+    )
+    writer.save()
+
+    with caplog.at_level(logging.WARNING, logger=vector_store.__name__):
+        reader = FaissVectorStore(index_path, dimension=3, metric="ip", read_only=True)
+    assert caplog.records == []
+    served_path = reader.hnsw_path if reader.uses_hnsw else index_path
+    assert reader.uses_hnsw == (hnsw_min_vectors == 3)
+    assert str(served_path.resolve()) in _mapped_files()
+    assert [hit.vector_id for hit in reader.search([0.0, 1.0, 0.0], top_k=1)] == [11]
+
+
+def test_read_only_store_falls_back_to_plain_read_when_mmap_fails(
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+    caplog: pytest.LogCaptureFixture,
+) -> None:
+    index_path = tmp_path / "semantic.faiss"
+    writer = FaissVectorStore(index_path, dimension=3, metric="ip")
+    writer.add_or_replace(vector_ids=[10], vectors=[[1.0, 0.0, 0.0]])
+    writer.save()
+
+    import faiss
+
+    real_read_index = faiss.read_index
+
+    def _read_index(path: str, *flags: int):
+        if flags:
+            raise RuntimeError("mmap not supported for this index type")
+        return real_read_index(path)
+
+    monkeypatch.setattr(faiss, "read_index", _read_index)
+    with caplog.at_level(logging.WARNING, logger=vector_store.__name__):
+        reader = FaissVectorStore(index_path, dimension=3, metric="ip", read_only=True)
+    assert [hit.vector_id for hit in reader.search([1.0, 0.0, 0.0], top_k=1)] == [10]
+    assert [record.getMessage() for record in caplog.records] == [
+        f"Cannot memory-map FAISS index '{index_path}', reading it into RAM instead: "
+        "mmap not supported for this index type"
+    ]
+    if _PROC_MAPS.exists():
+        assert str(index_path.resolve()) not in _mapped_files()
+
+
+def test_large_index_saves_hnsw_graph_used_by_read_only_stores(tmp_path: Path) -> None:
+    index_path = tmp_path / "semantic.faiss"
+    writer = FaissVectorStore(index_path, dimension=3, metric="ip", hnsw_min_vectors=3)
+    writer.add_or_replace(vector_ids=[10, 11], vectors=[[1.0, 0.0, 0.0], [0.0, 1.0, 0.0]])
+    writer.save()
+    assert not writer.hnsw_path.exists()
+
+    writer.add_or_replace(vector_ids=[12, 10], vectors=[[0.0, 0.0, 1.0], [1.0, 1.0, 0.0]])
+    writer.save()
+    assert writer.hnsw_path.exists()
+
+    reader = FaissVectorStore(index_path, dimension=3, metric="ip", read_only=True)
+    assert reader.uses_hnsw
+    assert reader.ntotal == 3
+    assert [hit.vector_id for hit in reader.search([0.0, 0.0, 1.0], top_k=1)] == [12]
+    assert reader.search([1.0, 1.0, 0.0], top_k=1)[0].vector_id == 10
+
+    # A graph older than the flat index (e.g. a save interrupted before the
+    # graph was rewritten) is ignored.
+    stale_ns = index_path.stat().st_mtime_ns - 1_000_000_000
+    os.utime(writer.hnsw_path, ns=(stale_ns, stale_ns))
+    assert not FaissVectorStore(index_path, dimension=3, metric="ip", read_only=True).uses_hnsw
+
+
+@pytest.mark.parametrize("exact_subset_max", [vector_store.EXACT_SUBSET_MAX, 0])
+def test_search_restricted_to_allowed_ids(
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+    exact_subset_max: int,
+) -> None:
+    # 0 forces the FAISS id-selector path instead of exact subset scoring.
+    monkeypatch.setattr(vector_store, "EXACT_SUBSET_MAX", exact_subset_max)
+    index_path = tmp_path / "semantic.faiss"
+    writer = FaissVectorStore(index_path, dimension=3, metric="ip", hnsw_min_vectors=3)
+    writer.add_or_replace(
+        vector_ids=[10, 11, 12],
+        vectors=[[1.0, 0.0, 0.0], [0.9, 0.1, 0.0], [0.0, 1.0, 0.0]],
+    )
+    writer.save()
+
+    for store in (writer, FaissVectorStore(index_path, dimension=3, metric="ip", read_only=True)):
+        hits = store.search([1.0, 0.0, 0.0], top_k=5, allowed_ids={11, 12, 99})
+        assert [hit.vector_id for hit in hits] == [11, 12]
+        assert hits[0].score > hits[1].score
+        assert store.search([1.0, 0.0, 0.0], top_k=1, allowed_ids=[12, 11])[0].vector_id == 11
+        assert store.search([1.0, 0.0, 0.0], top_k=5, allowed_ids=[]) == []
+
+
+@pytest.mark.parametrize("exact_subset_max", [vector_store.EXACT_SUBSET_MAX, 0])
+def test_small_saves_write_a_delta_that_reloads_and_shadows_the_index(
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+    exact_subset_max: int,
+) -> None:
+    monkeypatch.setattr(vector_store, "EXACT_SUBSET_MAX", exact_subset_max)
+    index_path = tmp_path / "semantic.faiss"
+    writer = FaissVectorStore(index_path, dimension=3, metric="ip", compact_ratio=0.5)
+    writer.add_or_replace(
+        vector_ids=[10, 11, 12, 13],
+        vectors=[[1.0, 0.0, 0.0], [0.0, 1.0, 0.0], [0.0, 0.0, 1.0], [1.0, 1.0, 1.0]],
+    )
+    writer.save()
+    base_bytes = index_path.read_bytes()
+
+    # Replace one id and add one: 2 changes <= 0.5 * 5 vectors stay in the delta.
+    writer.add_or_replace(vector_ids=[10, 14], vectors=[[0.0, 1.0, 1.0], [1.0, 0.0, 0.1]])
+    writer.save()
+    assert writer.delta_path.exists()
+    assert index_path.read_bytes() == base_bytes
+
+    for store in (
+        FaissVectorStore(index_path, dimension=3, metric="ip"),
+        FaissVectorStore(index_path, dimension=3, metric="ip", read_only=True),
+    ):
+        assert store.ntotal == 5
+        assert [hit.vector_id for hit in store.search([1.0, 0.0, 0.0], top_k=2)] == [14, 13]
+        assert store.search([0.0, 1.0, 1.0], top_k=1)[0].vector_id == 10
+        assert [hit.vector_id for hit in store.search([0.0, 0.0, 1.0], top_k=5, allowed_ids=[10, 11])] == [10, 11]
+
+    writer.compact()
+    assert not writer.delta_path.exists()
+    assert FaissVectorStore(index_path, dimension=3, metric="ip", read_only=True).ntotal == 5
+
+
+def test_delta_older_than_index_is_ignored(tmp_path: Path) -> None:
+    index_path = tmp_path / "semantic.faiss"
+    writer = FaissVectorStore(index_path, dimension=3, metric="ip", compact_ratio=1.0)
+    writer.add_or_replace(vector_ids=[10], vectors=[[1.0, 0.0, 0.0]])
+    writer.save()
+    writer.add_or_replace(vector_ids=[10], vectors=[[0.0, 1.0, 0.0]])
+    writer.save()
+
+    # As if a compaction wrote the index and crashed before removing the delta.
+    stale_ns = index_path.stat().st_mtime_ns - 1_000_000_000
+    os.utime(writer.delta_path, ns=(stale_ns, stale_ns))
+
+    reloaded = FaissVectorStore(index_path, dimension=3, metric="ip")
+    assert reloaded.search([1.0, 0.0, 0.0], top_k=1)[0].score == pytest.approx(1.0)
+
+
+def test_sq8_store_writes_a_quantized_graph(tmp_path: Path) -> None:
+    import faiss
+    import numpy as np
+
+    rng = np.random.default_rng(7)
+    vectors = rng.standard_normal((300, 16)).astype(np.float32)
+    index_path = tmp_path / "semantic.faiss"
+    writer = FaissVectorStore(index_path, dimension=16, metric="ip", hnsw_min_vectors=100, quantize="sq8")
+    writer.add_or_replace(vector_ids=list(range(300)), vectors=vectors)
+    writer.save()
+
+    reader = FaissVectorStore(index_path, dimension=16, metric="ip", read_only=True)
+    assert reader.uses_hnsw
+    assert isinstance(faiss.downcast_index(faiss.read_index(str(writer.hnsw_path)).index), faiss.IndexHNSWSQ)
+    # The writable flat index stays exact fp32.
+    assert writer.search(vectors[42], top_k=1)[0].score == pytest.approx(1.0)
+    assert reader.search(vectors[42], top_k=1)[0].vector_id == 42
+
+
 def test_vector_store_reports_corrupted_index_file(tmp_path: Path) -> None:
     broken_path = tmp_path / "broken.faiss"
     broken_path.write_bytes(b"this-is-not-a-faiss-index")
@@ -0,0 +1,63 @@
+from __future__ import annotations
+
+from pathlib import Path
+import sqlite3
+
+from librar.cli.build_timeline import main as build_timeline_main
+from librar.search.repository import ChunkRow, SearchRepository
+
+
+_BOOK_TEXTS = {
+    "war.txt": ["В 1914–1918 годах шла война.", "Около 1917 года всё изменилось."],
+    "age.txt": ["В XIX веке и в 1840-е годы.", "Без дат."],
+    "none.txt": ["Текст без дат."],
+}
+
+
+def _build_library(db_path: Path) -> None:
+    with SearchRepository(db_path) as repo:
+        for source_path, texts in _BOOK_TEXTS.items():
+            repo.replace_book_chunks(
+                source_path=source_path,
+                title=source_path,
+                author="tester",
+                format_name="txt",
+                fingerprint=f"fp-{source_path}",
+                mtime_ns=1,
+                chunks=[
+                    ChunkRow(
+                        chunk_no=chunk_no,
+                        raw_text=text,
+                        lemma_text=text.lower(),
+                        page=1,
+                        chapter=None,
+                        item_id=None,
+                        char_start=0,
+                        char_end=len(text),
+                    )
+                    for chunk_no, text in enumerate(texts)
+                ],
+            )
+
+
+def _events(db_path: Path) -> list[tuple]:
+    with sqlite3.connect(db_path) as connection:
+        return connection.execute(
+            """
+            SELECT book_id, chunk_id, year_from, year_to, decade, century, source_fragment, is_approximate
+            FROM timeline_events ORDER BY id
+            """
+        ).fetchall()
+
+
+def test_parallel_build_stores_the_same_events_as_serial(tmp_path: Path) -> None:
+    serial_db, parallel_db = tmp_path / "serial.db", tmp_path / "parallel.db"
+    _build_library(serial_db)
+    _build_library(parallel_db)
+
+    assert build_timeline_main(["--db-path", str(serial_db)]) == 0
+    assert build_timeline_main(["--db-path", str(parallel_db), "--jobs", "2"]) == 0
+
+    serial = _events(serial_db)
+    assert [row[6] for row in serial] == ["1914–1918", "1917", "1840-е годы", "XIX веке"]
+    assert _events(parallel_db) == serial
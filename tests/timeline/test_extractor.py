@@ -2,6 +2,10 @@
 
 from __future__ import annotations
 
+import dataclasses
+
+import pytest
+
 from librar.timeline.extractor import TemporalSpan, extract_temporal_spans
 
 
@@ -53,6 +57,15 @@ def test_non_year_numbers_produce_no_spans() -> None:
     assert spans == []
 
 
+def test_digits_glued_to_cyrillic_letters_are_not_a_year() -> None:
+    assert extract_temporal_spans("Шифр б1917 и код 1917ф.") == []
+
+
+def test_out_of_range_four_digit_number_does_not_hide_the_next_year() -> None:
+    spans = extract_temporal_spans("Тираж 3000–1917 года.")
+    assert [(s.year_from, s.year_to) for s in spans] == [(1917, 1917)]
+
+
 # ---------------------------------------------------------------------------
 # Decades
 # ---------------------------------------------------------------------------
@@ -66,6 +79,11 @@ def test_extracts_full_decade() -> None:
     assert decade_spans[0].year_to == 1849
 
 
+def test_extracts_decade_in_oblique_case() -> None:
+    spans = extract_temporal_spans("В 1840-х годах и в 1870-ых.")
+    assert [(s.source_fragment, s.decade) for s in spans] == [("1840-х годах", 1840), ("1870-ых", 1870)]
+
+
 def test_decade_confidence_is_moderate() -> None:
     spans = extract_temporal_spans("В 1900-е годах.")
     decade_spans = [s for s in spans if s.decade == 1900]
@@ -93,6 +111,16 @@ def test_extracts_roman_century_xx() -> None:
     assert century_spans[0].year_to == 2000
 
 
+def test_extracts_lowercase_roman_century() -> None:
+    spans = extract_temporal_spans("в xviii веке и в городе")
+    assert [s.century for s in spans] == [18]
+
+
+def test_turkish_i_variants_in_numerals() -> None:
+    assert [s.century for s in extract_temporal_spans("ı в.")] == [1]
+    assert extract_temporal_spans("В XİX веке.") == []
+
+
 def test_century_is_marked_approximate() -> None:
     spans = extract_temporal_spans("В XIX веке.")
     assert all(s.is_approximate for s in spans if s.century)
@@ -133,6 +161,15 @@ def test_range_takes_priority_over_single_year() -> None:
     assert not single_1918
 
 
+
+def test_spans_are_grouped_by_kind_in_priority_order() -> None:
+    spans = extract_temporal_spans("В 1905 году, в 1840-е годы, в 1914–1918 и в XIX веке.")
+    assert [s.source_fragment for s in spans] == ["1914–1918", "1840-е годы", "1905", "XIX веке"]
+
+def test_centuries_interleaved_with_years_are_all_kept() -> None:
+    spans = extract_temporal_spans("В 1801 году, в XIX веке, в 1901 году и в XX веке.")
+    assert [s.source_fragment for s in spans] == ["1801", "1901", "XIX веке", "XX веке"]
+
 # ---------------------------------------------------------------------------
 # TemporalSpan fields
 # ---------------------------------------------------------------------------
@@ -157,3 +194,15 @@ def test_empty_text_returns_empty_list() -> None:
 
 def test_no_temporal_text_returns_empty_list() -> None:
     assert extract_temporal_spans("Это текст без дат и годов.") == []
+
+
+def test_repeated_text_returns_fresh_lists_of_shared_frozen_spans() -> None:
+    text = "В 1917 году, в XIX веке."
+    first = extract_temporal_spans(text)
+    second = extract_temporal_spans(text)
+
+    assert first == second
+    assert first is not second
+    assert all(a is b for a, b in zip(first, second))
+    with pytest.raises(dataclasses.FrozenInstanceError):
+        first[0].year_from = 1918  # type: ignore[misc]